@@ -6,9 +6,33 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
 
+from core.capture import RequestCaptureMiddleware, create_capture_log
 from core.config import settings
 from core.logging import app_logger
-from routers import health, recommend
+from core.metrics import MetricsMiddleware
+from core.profiling import ProfilingMiddleware, profiler
+from core.tracing import TracingMiddleware, create_trace_exporter
+from routers import admin, analytics, health, metrics, recommend, search
+
+
+def warm_up():
+    """Load the catalog, recommendation models, search and facet indexes, database tables and fallback playlists."""
+    from models.feedback import create_db_and_tables
+    from services.facets import catalog_facets
+    from services.mood_weights import mood_refitter
+    from services.playlist import playlist_generator
+    from services.recommender import recommendation_engine
+    from services.search import catalog_search
+    from services.seen_filter import seen_filters
+    
+    create_db_and_tables()
+    recommendation_engine.data_loader.ensure_loaded()
+    recommendation_engine._ensure_initialized()
+    catalog_facets.ensure_index()
+    mood_refitter.refit()
+    seen_filters.rebuild()
+    playlist_generator.precompute_fallbacks()
+    catalog_search.ensure_index()
 
 
 @asynccontextmanager
@@ -24,10 +48,34 @@ async def lifespan(app: FastAPI):
     # Create data directory if it doesn't exist
     os.makedirs(settings.data_dir, exist_ok=True)
     
+    # Load data, models and tables now rather than on the first request
+    if not settings.lazy_startup:
+        warm_up()
+    
+    # Refit mood tag weights from feedback in the background
+    from services.mood_weights import mood_refitter
+    mood_refitter.start()
+    
+    # Archive feedback past the retention window in the background
+    from services.feedback_archive import feedback_archiver
+    feedback_archiver.start()
+    
     yield
     
     # Shutdown
+    if capture_log:
+        capture_log.close()
+    if trace_exporter:
+        trace_exporter.close()
+    profiler.stop()
+    mood_refitter.stop()
+    feedback_archiver.stop()
+    from services.recommender import recommendation_engine
+    recommendation_engine.stop_shards()
     app_logger.info("Shutting down application")
+    
+    # Flush messages still queued for the background log writer
+    await app_logger.complete()
 
 
 # Create FastAPI app
@@ -49,9 +97,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Record sanitized recommendation/feedback requests for replay (opt-in)
+capture_log = create_capture_log()
+if capture_log:
+    app.add_middleware(RequestCaptureMiddleware, capture_log=capture_log)
+    app_logger.info(f"Capturing requests to {capture_log.path}")
+
+# Trace a sample of requests to a local trace file (opt-in)
+trace_exporter = create_trace_exporter()
+if trace_exporter:
+    app.add_middleware(TracingMiddleware, exporter=trace_exporter)
+    app_logger.info(f"Tracing {settings.tracing_sample_rate:.0%} of requests to {trace_exporter.path}")
+
+# Profile requests on demand (idle unless an admin starts a session)
+app.add_middleware(ProfilingMiddleware, controller=profiler)
+
+# Record request latency metrics and optional Server-Timing headers
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(health.router)
+app.include_router(metrics.router)
+app.include_router(admin.router)
 app.include_router(recommend.router)
+app.include_router(analytics.router)
+app.include_router(search.router)
 
 # Mount static files for images
 if os.path.exists("static"):
@@ -0,0 +1,176 @@
+"""Seeded synthetic catalog generator for benchmarks.
+
+Produces workouts, recipes and courses catalogs with the same schema as the
+bundled CSVs. Tags, difficulties and durations are drawn from the mood
+profiles in ``MoodMapper`` so scoring behaves as it would on real data.
+"""
+
+import argparse
+import os
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from core.config import settings
+from services.mood_mapper import mood_mapper
+
+DOMAIN_FILES = {
+    "workouts": settings.workouts_file,
+    "recipes": settings.recipes_file,
+    "courses": settings.courses_file,
+}
+
+# Extra vocabulary so items do not only carry mood-preferred tags
+FILLER_TAGS = {
+    "workouts": ["morning", "evening", "bodyweight", "outdoor", "home", "core", "balance",
+                 "flexibility", "endurance", "mobility", "partner", "equipment-free"],
+    "recipes": ["vegan", "vegetarian", "gluten-free", "breakfast", "lunch", "dinner", "snack",
+                "spicy", "sweet", "savory", "one-pot", "meal-prep"],
+    "courses": ["beginner-friendly", "career", "communication", "technology", "health",
+                "finance", "language", "history", "science", "leadership", "design", "music"],
+}
+
+CATEGORIES = {
+    "workouts": ["HIIT", "Yoga", "Stretching", "Dance", "Strength", "Cardio", "Pilates",
+                 "Meditation", "Walking", "Recovery"],
+    "recipes": ["spinach,banana,protein powder,almond milk", "pasta,cheese,milk,butter",
+                "bread,avocado,lemon,salt,pepper", "quinoa,vegetables,chickpeas,tahini",
+                "oats,berries,honey,yogurt", "rice,chicken,ginger,garlic,soy sauce",
+                "lentils,tomato,onion,cumin", "eggs,spinach,feta,olive oil"],
+    "courses": ["Productivity", "Mindfulness", "Stress Management", "Creative Writing",
+                "Philosophy", "Art", "Personal Finance", "Public Speaking", "Nutrition",
+                "Photography"],
+}
+
+TITLE_WORDS = {
+    "workouts": ["Blast", "Flow", "Burn", "Session", "Circuit", "Routine", "Reset", "Boost"],
+    "recipes": ["Bowl", "Smoothie", "Toast", "Salad", "Stew", "Wrap", "Soup", "Bites"],
+    "courses": ["Basics", "Masterclass", "Workshop", "Essentials", "Bootcamp", "Primer"],
+}
+
+ADJECTIVES = ["Quick", "Gentle", "Power", "Morning", "Evening", "Mindful", "Creative",
+              "Cozy", "Bright", "Simple", "Deep", "Fresh"]
+
+DIFFICULTIES = ["beginner", "intermediate", "advanced"]
+
+# Share of tag slots drawn from the mood's preferred tags
+PREFERRED_TAG_SHARE = 0.7
+TAGS_PER_ITEM = 5
+
+
+def _domain_vocabulary(domain_key: str) -> List[str]:
+    """Get every tag the mood profiles use for a domain, plus filler tags."""
+    vocabulary = []
+    for preferences in mood_mapper.mood_preferences.values():
+        vocabulary.extend(preferences.get(f"{domain_key}_tags", []))
+    vocabulary.extend(FILLER_TAGS[f"{domain_key}s"])
+    return list(dict.fromkeys(vocabulary))
+
+
+def _generate_tags(rng: np.random.Generator, moods: np.ndarray, domain_key: str) -> List[str]:
+    """Generate comma separated tags for each row, biased by its mood."""
+    vocabulary = np.array(_domain_vocabulary(domain_key))
+    rows = len(moods)
+    tag_matrix = vocabulary[rng.integers(0, len(vocabulary), size=(rows, TAGS_PER_ITEM))]
+    use_preferred = rng.random((rows, TAGS_PER_ITEM)) < PREFERRED_TAG_SHARE
+    
+    for mood, preferences in mood_mapper.mood_preferences.items():
+        preferred = np.array(preferences.get(f"{domain_key}_tags", []))
+        mask = moods == mood
+        if not len(preferred) or not mask.any():
+            continue
+        picks = preferred[rng.integers(0, len(preferred), size=(int(mask.sum()), TAGS_PER_ITEM))]
+        tag_matrix[mask] = np.where(use_preferred[mask], picks, tag_matrix[mask])
+    
+    return [",".join(dict.fromkeys(row)) for row in tag_matrix.tolist()]
+
+
+def _generate_durations(rng: np.random.Generator, moods: np.ndarray) -> np.ndarray:
+    """Generate durations around each mood's preferred time range."""
+    durations = np.zeros(len(moods), dtype=np.int64)
+    for mood in mood_mapper.mood_preferences:
+        mask = moods == mood
+        if not mask.any():
+            continue
+        preference = mood_mapper.get_mood_preferences(mood)["duration_preference"]
+        time_range = mood_mapper.time_preferences[preference]
+        samples = rng.normal(time_range["optimal"], (time_range["max"] - time_range["min"]) / 4,
+                             size=int(mask.sum()))
+        durations[mask] = np.clip(np.round(samples), max(1, time_range["min"]), time_range["max"])
+    return durations
+
+
+def _generate_difficulties(rng: np.random.Generator, moods: np.ndarray) -> np.ndarray:
+    """Generate difficulties, mostly matching each mood's preference."""
+    difficulties = np.array(DIFFICULTIES)[rng.integers(0, len(DIFFICULTIES), size=len(moods))]
+    matches = rng.random(len(moods)) < 0.8
+    for mood in mood_mapper.mood_preferences:
+        mask = (moods == mood) & matches
+        if not mask.any():
+            continue
+        preferred = np.array(mood_mapper.get_mood_preferences(mood)["difficulty_preference"])
+        difficulties[mask] = preferred[rng.integers(0, len(preferred), size=int(mask.sum()))]
+    return difficulties
+
+
+def generate_domain(domain: str, rows: int, seed: int = 42) -> pd.DataFrame:
+    """Generate a synthetic catalog for one domain."""
+    rng = np.random.default_rng([seed, list(DOMAIN_FILES).index(domain)])
+    domain_key = domain.rstrip('s')
+    moods = np.array(list(mood_mapper.mood_preferences))[
+        rng.integers(0, len(mood_mapper.mood_preferences), size=rows)
+    ]
+    
+    adjectives = np.array(ADJECTIVES)[rng.integers(0, len(ADJECTIVES), size=rows)]
+    categories = np.array(CATEGORIES[domain])[rng.integers(0, len(CATEGORIES[domain]), size=rows)]
+    nouns = np.array(TITLE_WORDS[domain])[rng.integers(0, len(TITLE_WORDS[domain]), size=rows)]
+    ids = np.arange(1, rows + 1)
+    
+    data = {"id": ids}
+    if domain == "recipes":
+        data["title"] = [f"{adj} {noun} #{i}" for adj, noun, i in zip(adjectives, nouns, ids)]
+        data["ingredients"] = categories
+        data["cook_time_min"] = _generate_durations(rng, moods)
+    else:
+        data["title"] = [f"{adj} {cat} {noun} #{i}"
+                         for adj, cat, noun, i in zip(adjectives, categories, nouns, ids)]
+        data["topic" if domain == "courses" else "type"] = categories
+        data["duration_min"] = _generate_durations(rng, moods)
+        data["difficulty"] = _generate_difficulties(rng, moods)
+    
+    data["mood_tag"] = moods
+    data["tags"] = _generate_tags(rng, moods, domain_key)
+    data["image"] = [f"/images/{domain}/{domain_key}_{i % 50}.jpg" for i in ids]
+    data["description"] = [f"A {mood} {domain_key} to fit your day" for mood in moods]
+    
+    return pd.DataFrame(data)
+
+
+def generate_catalog(rows: int, seed: int = 42) -> Dict[str, pd.DataFrame]:
+    """Generate synthetic catalogs for all domains."""
+    return {domain: generate_domain(domain, rows, seed) for domain in DOMAIN_FILES}
+
+
+def write_catalog(output_dir: str, rows: int, seed: int = 42) -> str:
+    """Generate a synthetic catalog and write it as CSV files."""
+    os.makedirs(output_dir, exist_ok=True)
+    for domain, df in generate_catalog(rows, seed).items():
+        df.to_csv(os.path.join(output_dir, DOMAIN_FILES[domain]), index=False)
+    return output_dir
+
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Generate a synthetic catalog")
+    parser.add_argument("--rows", type=int, default=1000, help="Rows per domain")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--output", default="benchmarks/catalogs", help="Output directory")
+    args = parser.parse_args()
+    
+    output_dir = write_catalog(os.path.join(args.output, str(args.rows)), args.rows, args.seed)
+    print(f"Wrote {args.rows} rows per domain to {output_dir}")
+
+
+if __name__ == "__main__":
+    main()
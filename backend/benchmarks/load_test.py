@@ -0,0 +1,245 @@
+"""In-process HTTP load test for the ASGI app.
+
+Drives ``app`` through httpx's ASGI transport, so no server process or
+network is involved. Reports throughput and latency percentiles per
+endpoint, plus event-loop lag measured while the load is running.
+
+Usage:
+    python -m benchmarks.load_test --concurrency 16 --requests 2000
+    python -m benchmarks.load_test --duration 30 --mix recommend=6,feedback=2,similar=1,quick=1
+
+Feedback requests write to the configured database; point DATABASE_URL at a
+scratch SQLite file when running against a real deployment's settings.
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.stats import compare_to_baseline, read_results, summarize, write_results
+from core.config import settings
+
+DEFAULT_MIX = {"recommend": 5, "feedback": 2, "similar": 2, "quick": 1}
+
+ENDPOINTS = ["recommend", "feedback", "similar", "quick", "metadata"]
+
+DOMAINS = ["workout", "recipe", "course"]
+
+
+def _catalog_item_ids() -> List[str]:
+    """Get item IDs from the loaded catalog for similar/feedback requests."""
+    from services.data_loader import data_loader
+    item_ids = []
+    for df in data_loader.get_all_data().values():
+        if not df.empty:
+            item_ids.extend(df['item_id'].tolist())
+    return item_ids or ["workout_1"]
+
+
+def build_request_factories(item_ids: List[str]) -> Dict[str, Callable]:
+    """Build request factories returning (method, url, json body) per endpoint."""
+    
+    def recommend(rng: random.Random) -> Tuple[str, str, Optional[Dict]]:
+        interests = rng.choice([["lifestyle"], ["learning"], ["lifestyle", "learning"]])
+        return "POST", "/api/recommend", {
+            "mood": rng.choice(settings.mood_options),
+            "available_minutes": rng.choice(settings.available_time_options),
+            "interests": interests,
+            "limit": settings.default_recommendation_limit,
+            "user_session": f"load_{rng.randrange(1000)}"
+        }
+    
+    def feedback(rng: random.Random) -> Tuple[str, str, Optional[Dict]]:
+        item_id = rng.choice(item_ids)
+        return "POST", "/api/feedback", {
+            "item_id": item_id,
+            "domain": item_id.split("_")[0],
+            "action": rng.choice(["like", "dislike"]),
+            "user_session": f"load_{rng.randrange(1000)}"
+        }
+    
+    def similar(rng: random.Random) -> Tuple[str, str, Optional[Dict]]:
+        return "GET", f"/api/similar/{rng.choice(item_ids)}?limit=5", None
+    
+    def quick(rng: random.Random) -> Tuple[str, str, Optional[Dict]]:
+        minutes = rng.choice(settings.available_time_options)
+        domain = rng.choice(DOMAINS + [None])
+        url = f"/api/quick-suggestions?available_minutes={minutes}"
+        return "GET", url + (f"&domain={domain}" if domain else ""), None
+    
+    def metadata(rng: random.Random) -> Tuple[str, str, Optional[Dict]]:
+        return "GET", "/api/metadata", None
+    
+    return {"recommend": recommend, "feedback": feedback, "similar": similar, "quick": quick,
+            "metadata": metadata}
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    """Parse a request mix such as ``recommend=5,feedback=1``."""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint in mix: {name}")
+        mix[name.strip()] = int(weight or 1)
+    return mix
+
+
+async def _monitor_loop_lag(lags: List[float], stop: asyncio.Event, interval: float = 0.01):
+    """Record how late the event loop wakes up from a fixed sleep."""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, loop.time() - start - interval))
+
+
+async def run_load_test(app, mix: Optional[Dict[str, int]] = None, concurrency: int = 8,
+                        total_requests: Optional[int] = 500, duration: Optional[float] = None,
+                        seed: int = 42) -> Dict:
+    """Run a load test against an ASGI app and return per-endpoint statistics."""
+    mix = mix or DEFAULT_MIX
+    factories = build_request_factories(_catalog_item_ids())
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    
+    latencies: Dict[str, List[float]] = {name: [] for name in names}
+    statuses: Dict[str, Dict[str, int]] = {name: {} for name in names}
+    lags: List[float] = []
+    issued = 0
+    stop = asyncio.Event()
+    
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+        start = time.perf_counter()
+        deadline = start + duration if duration else None
+        
+        async def worker(worker_id: int):
+            nonlocal issued
+            rng = random.Random(seed * 1000 + worker_id)
+            while True:
+                if deadline is not None and time.perf_counter() >= deadline:
+                    return
+                if deadline is None and issued >= total_requests:
+                    return
+                issued += 1
+                
+                name = rng.choices(names, weights)[0]
+                method, url, body = factories[name](rng)
+                request_start = time.perf_counter()
+                try:
+                    response = await client.request(method, url, json=body)
+                    status = str(response.status_code)
+                except Exception as e:
+                    status = type(e).__name__
+                latencies[name].append(time.perf_counter() - request_start)
+                statuses[name][status] = statuses[name].get(status, 0) + 1
+        
+        monitor = asyncio.create_task(_monitor_loop_lag(lags, stop))
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await monitor
+    
+    endpoints = {}
+    for name in names:
+        count = len(latencies[name])
+        endpoints[name] = {
+            "requests": count,
+            "rps": round(count / elapsed, 2) if elapsed else 0.0,
+            "statuses": statuses[name],
+            "latency": summarize(latencies[name])
+        }
+    
+    all_latencies = [value for values in latencies.values() for value in values]
+    return {
+        "config": {
+            "mix": mix,
+            "concurrency": concurrency,
+            "total_requests": total_requests,
+            "duration": duration,
+            "seed": seed
+        },
+        "elapsed_s": round(elapsed, 3),
+        "overall": {
+            "requests": len(all_latencies),
+            "rps": round(len(all_latencies) / elapsed, 2) if elapsed else 0.0,
+            "latency": summarize(all_latencies)
+        },
+        "endpoints": endpoints,
+        "event_loop_lag": summarize(lags)
+    }
+
+
+def print_report(results: Dict):
+    """Print throughput and latency percentiles per endpoint."""
+    print(f"{'endpoint':<12}{'requests':>10}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}"
+          f"{'p99 ms':>10}{'max ms':>10}  statuses")
+    rows = list(results["endpoints"].items()) + [("overall", results["overall"])]
+    for name, stats in rows:
+        latency = stats["latency"]
+        if not latency.get("runs"):
+            continue
+        print(f"{name:<12}{stats['requests']:>10}{stats['rps']:>10.1f}"
+              f"{latency['p50_ms']:>10.2f}{latency['p95_ms']:>10.2f}"
+              f"{latency['p99_ms']:>10.2f}{latency['max_ms']:>10.2f}  {stats.get('statuses', '')}")
+    
+    lag = results["event_loop_lag"]
+    if lag.get("runs"):
+        print(f"\nEvent loop lag: p50={lag['p50_ms']:.2f} ms  p99={lag['p99_ms']:.2f} ms  "
+              f"max={lag['max_ms']:.2f} ms")
+
+
+def report_regressions(results: Dict, baseline: Dict, tolerance: float) -> bool:
+    """Print endpoints whose p99 latency regressed against a baseline run."""
+    regressions = compare_to_baseline(
+        {name: {"p99": stats["latency"]} for name, stats in results["endpoints"].items()},
+        {name: {"p99": stats["latency"]} for name, stats in baseline["endpoints"].items()},
+        tolerance,
+        metric="p99_ms"
+    )
+    for regression in regressions:
+        print(f"REGRESSION {regression['group']}: p99 {regression['baseline_ms']:.2f} ms -> "
+              f"{regression['current_ms']:.2f} ms (x{regression['ratio']})")
+    if not regressions:
+        print("No regressions against baseline")
+    return bool(regressions)
+
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="In-process load test of the API")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients")
+    parser.add_argument("--requests", type=int, default=500, help="Total requests to issue")
+    parser.add_argument("--duration", type=float, help="Run for N seconds instead")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX,
+                        help="Endpoint weights, e.g. recommend=5,feedback=2,similar=2,quick=1,metadata=1")
+    parser.add_argument("--seed", type=int, default=42, help="Request generator seed")
+    parser.add_argument("--output", help="Write results as JSON")
+    parser.add_argument("--baseline", help="Baseline results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed slowdown over the baseline before failing")
+    args = parser.parse_args()
+    
+    from app import app
+    
+    results = asyncio.run(run_load_test(
+        app, args.mix, args.concurrency, args.requests, args.duration, args.seed
+    ))
+    print_report(results)
+    
+    if args.output:
+        write_results(args.output, results)
+        print(f"\nResults written to {args.output}")
+    
+    if args.baseline and report_regressions(results, read_results(args.baseline), args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
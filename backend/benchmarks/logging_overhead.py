@@ -0,0 +1,94 @@
+"""Benchmark how much request latency logging adds.
+
+Runs the in-process load test under several logging configurations and
+compares per-endpoint latency against a run with logging disabled:
+
+- off: no sinks at all (baseline)
+- sync: the previous setup, synchronous sinks and every message logged
+- queued: background log writer with per-event sampling (the default)
+- queued_json: as queued, with structured JSON output
+
+Usage:
+    python -m benchmarks.logging_overhead --requests 1000 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import tempfile
+from typing import Dict
+
+from benchmarks.load_test import run_load_test
+from benchmarks.stats import write_results
+from core.config import settings
+from core.logging import logger, setup_logging
+
+MODES = ["off", "sync", "queued", "queued_json"]
+
+MIX = {"recommend": 3, "feedback": 1}
+
+
+def configure(mode: str, log_dir: str, console: bool):
+    """Apply the logging configuration for a benchmark mode."""
+    if mode == "off":
+        logger.remove()
+        return
+    
+    setup_logging(log_dir, enqueue=mode != "sync", json_output=mode == "queued_json",
+                  console=console)
+    if mode == "sync":
+        settings.log_sample_rates = {}
+
+
+async def run_mode(app, mode: str, log_dir: str, requests: int, concurrency: int,
+                   console: bool) -> Dict:
+    """Run the load test under one logging configuration."""
+    sample_rates = dict(settings.log_sample_rates)
+    configure(mode, log_dir, console)
+    try:
+        results = await run_load_test(app, MIX, concurrency, requests)
+        await logger.complete()
+    finally:
+        settings.log_sample_rates = sample_rates
+    return results
+
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Measure logging overhead on request latency")
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per mode")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients")
+    parser.add_argument("--console", action="store_true", help="Include the stdout sink")
+    parser.add_argument("--output", help="Write results as JSON")
+    args = parser.parse_args()
+    
+    from app import app
+    
+    results = {}
+    with tempfile.TemporaryDirectory() as log_dir:
+        # Warm up models and caches so the first mode is not penalized
+        logger.remove()
+        asyncio.run(run_load_test(app, MIX, args.concurrency, 50))
+        
+        for mode in MODES:
+            results[mode] = asyncio.run(
+                run_mode(app, mode, log_dir, args.requests, args.concurrency, args.console)
+            )
+        logger.remove()
+    setup_logging()
+    
+    print(f"{'mode':<12}{'endpoint':<12}{'p50 ms':>10}{'p99 ms':>10}{'+p50 ms':>10}{'+p99 ms':>10}")
+    for mode in MODES:
+        for endpoint in MIX:
+            latency = results[mode]["endpoints"][endpoint]["latency"]
+            baseline = results["off"]["endpoints"][endpoint]["latency"]
+            print(f"{mode:<12}{endpoint:<12}{latency['p50_ms']:>10.3f}{latency['p99_ms']:>10.3f}"
+                  f"{latency['p50_ms'] - baseline['p50_ms']:>10.3f}"
+                  f"{latency['p99_ms'] - baseline['p99_ms']:>10.3f}")
+    
+    if args.output:
+        write_results(args.output, results)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
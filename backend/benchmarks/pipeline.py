@@ -0,0 +1,169 @@
+"""Per-stage microbenchmarks of the recommendation pipeline.
+
+Generates a synthetic catalog per size and times each stage separately:
+load, preprocess, content model build, scoring, enrichment, curation and
+serialization. With ``--shards N`` scoring is also timed scattered across N
+scoring processes (``scoring_sharded``), checking it returns the same items.
+Results are written as JSON and can be compared against a stored baseline.
+
+Usage:
+    python -m benchmarks.pipeline --sizes 1000 10000 --output results.json
+    python -m benchmarks.pipeline --sizes 1000000 --shards 4
+    python -m benchmarks.pipeline --baseline benchmarks/baseline.json
+"""
+
+import argparse
+import os
+import platform
+import sys
+import tempfile
+from datetime import datetime, timezone
+from typing import Dict, List, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from benchmarks.catalog_generator import write_catalog
+from benchmarks.stats import StageTimer, compare_to_baseline, read_results, write_results
+from services.data_loader import DataLoader
+from services.playlist import PlaylistGenerator
+from services.recommender import RecommendationEngine
+
+# (mood, available_minutes, interests) combinations exercised per repeat
+SCENARIOS: List[Tuple[str, int, List[str]]] = [
+    ("energized", 60, ["lifestyle", "learning"]),
+    ("calm", 30, ["lifestyle"]),
+    ("tired", 10, ["learning"]),
+]
+
+PLAYLIST_LIMIT = 6
+
+
+def run_size(rows: int, seed: int, repeat: int, workdir: str, shards: int = 0) -> Dict[str, Dict]:
+    """Benchmark every pipeline stage on a catalog of the given size."""
+    catalog_dir = write_catalog(os.path.join(workdir, str(rows)), rows, seed)
+    timer = StageTimer()
+    
+    loader = DataLoader(data_dir=catalog_dir, autoload=False)
+    with timer.measure("load"):
+        loader.version = loader._compute_version()
+        loader._read_data_files()
+    with timer.measure("preprocess"):
+        loader._preprocess_data()
+    loader._loaded = True
+    
+    engine = RecommendationEngine(loader=loader)
+    with timer.measure("model_build"):
+        engine._build_content_models()
+        engine._initialized = True
+    
+    generator = PlaylistGenerator(loader=loader, engine=engine)
+    for _ in range(repeat):
+        for mood, minutes, interests in SCENARIOS:
+            with timer.measure("scoring"):
+                recommendations = engine.get_recommendations(
+                    mood=mood,
+                    available_minutes=minutes,
+                    interests=interests,
+                    limit=PLAYLIST_LIMIT * 2
+                )
+            with timer.measure("enrichment"):
+                enriched = generator._enrich_recommendations(recommendations)
+            with timer.measure("curation"):
+                playlist = generator._curate_playlist(enriched, mood, minutes, PLAYLIST_LIMIT)
+            with timer.measure("serialization"):
+                body = JSONResponse(content=jsonable_encoder({
+                    "playlist": playlist,
+                    "total_duration": sum(item['duration_min'] for item in playlist),
+                    "mood": mood,
+                    "available_minutes": minutes,
+                    "interests": interests
+                })).body
+            if not body:
+                raise AssertionError(f"Empty response body for {mood}/{minutes}/{interests}")
+    
+    if shards > 1:
+        sharded = RecommendationEngine(loader=loader)
+        sharded.item_features = engine.item_features
+        sharded._initialized = True
+        with timer.measure("shard_startup"):
+            sharded.start_shards(shards)
+        for _ in range(repeat):
+            for mood, minutes, interests in SCENARIOS:
+                with timer.measure("scoring_sharded"):
+                    recommendations = sharded.get_recommendations(
+                        mood=mood,
+                        available_minutes=minutes,
+                        interests=interests,
+                        limit=PLAYLIST_LIMIT * 2
+                    )
+                if recommendations != engine.get_recommendations(mood, minutes, interests, PLAYLIST_LIMIT * 2):
+                    raise AssertionError(f"Sharded scoring differs for {mood}/{minutes}/{interests}")
+        sharded.stop_shards()
+    
+    return timer.summary()
+
+
+def run(sizes: List[int], seed: int, repeat: int, shards: int = 0) -> Dict:
+    """Run the benchmark for every catalog size."""
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for rows in sizes:
+            print(f"Benchmarking {rows} rows per domain...", file=sys.stderr)
+            results[str(rows)] = run_size(rows, seed, repeat, workdir, shards)
+    
+    return {
+        "meta": {
+            "seed": seed,
+            "repeat": repeat,
+            "shards": shards,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created_at": datetime.now(timezone.utc).isoformat()
+        },
+        "results": results
+    }
+
+
+def print_report(results: Dict):
+    """Print a per-stage table of median timings."""
+    for size, stages in results["results"].items():
+        print(f"\n{size} rows per domain")
+        for stage, stats in stages.items():
+            print(f"  {stage:<16} p50={stats['p50_ms']:>10.3f} ms  "
+                  f"max={stats['max_ms']:>10.3f} ms  runs={stats['runs']}")
+
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark the recommendation pipeline")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="Rows per domain for each run (1k to 1M)")
+    parser.add_argument("--seed", type=int, default=42, help="Catalog generator seed")
+    parser.add_argument("--repeat", type=int, default=5, help="Repeats of the request stages")
+    parser.add_argument("--shards", type=int, default=0, help="Also time scoring across N shards")
+    parser.add_argument("--output", default="benchmark_results.json", help="Results file")
+    parser.add_argument("--baseline", help="Baseline results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed slowdown over the baseline before failing")
+    args = parser.parse_args()
+    
+    results = run(args.sizes, args.seed, args.repeat, args.shards)
+    write_results(args.output, results)
+    print_report(results)
+    print(f"\nResults written to {args.output}")
+    
+    if args.baseline:
+        baseline = read_results(args.baseline)
+        regressions = compare_to_baseline(results["results"], baseline["results"], args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression['group']} rows / {regression['stage']}: "
+                  f"{regression['baseline_ms']:.3f} ms -> {regression['current_ms']:.3f} ms "
+                  f"(x{regression['ratio']})")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Deterministic replay of captured requests against the ASGI app.
+
+Re-issues a capture log (see ``core.capture``) in recording order, either
+honouring the original inter-arrival times scaled by ``--speed`` or as fast
+as possible with a fixed number of concurrent clients. Per-endpoint latency
+is reported in the same format as the load test so builds can be compared.
+
+Usage:
+    python -m benchmarks.replay logs/capture.jsonl --speed 1
+    python -m benchmarks.replay logs/capture.jsonl --speed 10
+    python -m benchmarks.replay logs/capture.jsonl --fast --concurrency 16
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.load_test import print_report, report_regressions
+from benchmarks.stats import read_results, summarize, write_results
+from core.capture import read_capture_log
+
+ENDPOINT_NAMES = {"/api/recommend": "recommend", "/api/feedback": "feedback"}
+
+
+async def replay(app, records: List[Dict], speed: Optional[float] = 1.0,
+                 concurrency: int = 8) -> Dict:
+    """Replay captured requests and return per-endpoint statistics.
+    
+    With a ``speed`` each request is issued at its original offset divided by
+    the speed; with ``speed=None`` requests are issued back to back by
+    ``concurrency`` clients.
+    """
+    latencies: Dict[str, List[float]] = {}
+    statuses: Dict[str, Dict[str, int]] = {}
+    mismatches = 0
+    
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://replay") as client:
+        
+        async def issue(record: Dict):
+            nonlocal mismatches
+            name = ENDPOINT_NAMES.get(record["p"], record["p"])
+            request_start = time.perf_counter()
+            try:
+                response = await client.request(record["m"], record["p"], json=record["b"])
+                status = str(response.status_code)
+                if record.get("s") and response.status_code != record["s"]:
+                    mismatches += 1
+            except Exception as e:
+                status = type(e).__name__
+            latencies.setdefault(name, []).append(time.perf_counter() - request_start)
+            endpoint_statuses = statuses.setdefault(name, {})
+            endpoint_statuses[status] = endpoint_statuses.get(status, 0) + 1
+        
+        start = time.perf_counter()
+        if speed:
+            origin = records[0]["t"] if records else 0.0
+            tasks = []
+            for record in records:
+                delay = (record["t"] - origin) / speed - (time.perf_counter() - start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                tasks.append(asyncio.create_task(issue(record)))
+            await asyncio.gather(*tasks)
+        else:
+            position = 0
+            
+            async def worker():
+                nonlocal position
+                while position < len(records):
+                    record = records[position]
+                    position += 1
+                    await issue(record)
+            
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    
+    endpoints = {}
+    for name, values in latencies.items():
+        endpoints[name] = {
+            "requests": len(values),
+            "rps": round(len(values) / elapsed, 2) if elapsed else 0.0,
+            "statuses": statuses[name],
+            "latency": summarize(values)
+        }
+    
+    all_latencies = [value for values in latencies.values() for value in values]
+    return {
+        "config": {"records": len(records), "speed": speed, "concurrency": concurrency},
+        "elapsed_s": round(elapsed, 3),
+        "status_mismatches": mismatches,
+        "overall": {
+            "requests": len(all_latencies),
+            "rps": round(len(all_latencies) / elapsed, 2) if elapsed else 0.0,
+            "latency": summarize(all_latencies)
+        },
+        "endpoints": endpoints,
+        "event_loop_lag": {"runs": 0}
+    }
+
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Replay a request capture log")
+    parser.add_argument("log", help="Capture log written by the capture middleware")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="Replay speed relative to the original timing")
+    parser.add_argument("--fast", action="store_true",
+                        help="Ignore original timing and replay as fast as possible")
+    parser.add_argument("--concurrency", type=int, default=8,
+                        help="Concurrent clients when replaying with --fast")
+    parser.add_argument("--limit", type=int, help="Replay only the first N records")
+    parser.add_argument("--output", help="Write results as JSON")
+    parser.add_argument("--baseline", help="Baseline results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed slowdown over the baseline before failing")
+    args = parser.parse_args()
+    
+    records = list(read_capture_log(args.log))[:args.limit]
+    
+    from app import app
+    
+    results = asyncio.run(replay(app, records, None if args.fast else args.speed,
+                                 args.concurrency))
+    print_report(results)
+    print(f"\nReplayed {len(records)} requests in {results['elapsed_s']} s "
+          f"({results['status_mismatches']} status mismatches)")
+    
+    if args.output:
+        write_results(args.output, results)
+        print(f"Results written to {args.output}")
+    
+    if args.baseline and report_regressions(results, read_results(args.baseline), args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
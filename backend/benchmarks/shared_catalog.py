@@ -0,0 +1,134 @@
+"""Benchmark per-worker memory and startup with and without a shared catalog.
+
+Starts N worker processes the way ``uvicorn --workers N`` would, each loading
+the catalog and recommendation models and serving one request, and reports
+per-worker startup time and the total proportional set size (PSS) of all
+workers while they are alive together. PSS splits shared pages between the
+processes mapping them, so its sum is the real memory cost of the fleet.
+
+- csv: every worker reads the CSV files and builds its own models
+- shared: workers attach a snapshot published once by the parent
+
+Usage:
+    python -m benchmarks.shared_catalog --rows 100000 --workers 1 2 4
+"""
+
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+from typing import Dict, List
+
+MODES = ["csv", "shared"]
+
+
+def _memory_kb() -> Dict[str, int]:
+    """Read this process's resident and proportional set size (Linux)."""
+    memory = {}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in ("Rss", "Pss"):
+                    memory[key.lower()] = int(value.split()[0])
+    except OSError:
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        memory = {"rss": rss, "pss": rss}
+    return memory
+
+
+def _worker(data_dir: str, snapshot_dir: str, barrier, results):
+    """Load the catalog like an API worker, then report startup time and memory."""
+    from core.config import settings
+    settings.catalog_snapshot_dir = snapshot_dir or None
+    settings.model_artifact_path = ""
+
+    from services.data_loader import DataLoader
+    from services.recommender import RecommendationEngine
+
+    start = time.perf_counter()
+    engine = RecommendationEngine(loader=DataLoader(data_dir=data_dir))
+    engine._ensure_initialized()
+    startup = time.perf_counter() - start
+    engine.get_recommendations("calm", 60, ["lifestyle", "learning"])
+
+    # Measure once every worker is up, as they would be in production
+    barrier.wait()
+    results.put({"startup_s": startup, **_memory_kb()})
+    barrier.wait()
+
+
+def run_workers(workers: int, data_dir: str, snapshot_dir: str) -> Dict:
+    """Run a group of workers side by side and aggregate their measurements."""
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(workers)
+    results = context.Queue()
+    processes = [
+        context.Process(target=_worker, args=(data_dir, snapshot_dir, barrier, results))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    measurements = [results.get() for _ in range(workers)]
+    for process in processes:
+        process.join()
+
+    return {
+        "startup_s_max": round(max(m["startup_s"] for m in measurements), 4),
+        "rss_mb_total": round(sum(m["rss"] for m in measurements) / 1024, 1),
+        "pss_mb_total": round(sum(m["pss"] for m in measurements) / 1024, 1),
+    }
+
+
+def run(rows: int, worker_counts: List[int], seed: int) -> Dict:
+    """Benchmark every mode and worker count on one synthetic catalog."""
+    from benchmarks.catalog_generator import write_catalog
+    from services.catalog_store import publish_snapshot
+    from services.data_loader import DataLoader
+
+    results = {mode: {} for mode in MODES}
+    with tempfile.TemporaryDirectory() as workdir:
+        data_dir = write_catalog(os.path.join(workdir, "catalog"), rows, seed)
+
+        # The parent publishes the snapshot once, before starting workers
+        loader = DataLoader(data_dir=data_dir, autoload=False)
+        loader._read_data_files()
+        loader._preprocess_data()
+        snapshot_dir = os.path.join(workdir, "snapshots")
+        publish_snapshot(loader.processed_data, loader.version, snapshot_dir)
+        del loader
+
+        for workers in worker_counts:
+            results["csv"][workers] = run_workers(workers, data_dir, "")
+            results["shared"][workers] = run_workers(workers, data_dir, snapshot_dir)
+    return results
+
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Compare worker memory with a shared catalog")
+    parser.add_argument("--rows", type=int, default=100000, help="Rows per domain")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Worker counts")
+    parser.add_argument("--seed", type=int, default=42, help="Catalog generator seed")
+    parser.add_argument("--output", help="Write results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.rows, args.workers, args.seed)
+
+    print(f"{'mode':<8}{'workers':>8}{'startup s':>12}{'PSS MB':>10}{'RSS MB':>10}")
+    for mode in MODES:
+        for workers, stats in results[mode].items():
+            print(f"{mode:<8}{workers:>8}{stats['startup_s_max']:>12.3f}"
+                  f"{stats['pss_mb_total']:>10.1f}{stats['rss_mb_total']:>10.1f}")
+
+    if args.output:
+        from benchmarks.stats import write_results
+        write_results(args.output, {mode: {str(k): v for k, v in groups.items()}
+                                    for mode, groups in results.items()})
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Benchmark application import and startup time.
+
+Every measurement runs in a fresh interpreter so nothing is cached between
+runs. Reports, for eager startup (warm-up in the lifespan) and lazy startup
+(LAZY_STARTUP=true, warm-up on the first request):
+
+- import: time to ``import app``
+- startup: time for the lifespan startup to complete
+- first_request: latency of the first /api/recommend request
+
+plus the import time of each top-level package, from ``python -X importtime``.
+
+Usage:
+    python -m benchmarks.startup --repeat 5 --output startup_results.json
+    python -m benchmarks.startup --baseline benchmarks/startup_baseline.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List
+
+from benchmarks.stats import compare_to_baseline, read_results, summarize, write_results
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODES = {"eager": "false", "lazy": "true"}
+
+RESULT_MARKER = "STARTUP_RESULT "
+
+STARTUP_SCRIPT = f"""
+import json, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+client = TestClient(app.app)
+begin = time.perf_counter()
+client.__enter__()
+ready = time.perf_counter()
+client.post("/api/recommend", json={{"mood": "happy", "available_minutes": 30, "interests": ["lifestyle"]}})
+done = time.perf_counter()
+client.__exit__(None, None, None)
+print("{RESULT_MARKER}" + json.dumps({{
+    "import": imported - start, "startup": ready - begin, "first_request": done - ready
+}}))
+"""
+
+
+def _run(args: List[str], env: Dict[str, str]) -> subprocess.CompletedProcess:
+    """Run a Python snippet in a fresh interpreter from the backend directory."""
+    return subprocess.run(
+        [sys.executable] + args, cwd=BACKEND_DIR, env={**os.environ, **env},
+        capture_output=True, text=True, check=True
+    )
+
+
+def measure_startup(lazy: str) -> Dict[str, float]:
+    """Time import, startup and the first request in one fresh process."""
+    result = _run(["-c", STARTUP_SCRIPT], {"LAZY_STARTUP": lazy})
+    for line in result.stdout.splitlines():
+        if line.startswith(RESULT_MARKER):
+            return json.loads(line[len(RESULT_MARKER):])
+    raise RuntimeError(f"No startup result in output:\n{result.stdout}\n{result.stderr}")
+
+
+def parse_importtime(output: str) -> Dict[str, int]:
+    """Sum the self import time in microseconds of each top-level package."""
+    packages: Dict[str, int] = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        package = name.strip().split(".")[0]
+        packages[package] = packages.get(package, 0) + int(self_us)
+    return packages
+
+
+def measure_imports(module: str = "app") -> Dict[str, int]:
+    """Get the per-package import time of a module in a fresh process."""
+    result = _run(["-X", "importtime", "-c", f"import {module}"], {})
+    return parse_importtime(result.stderr)
+
+
+def run_benchmark(repeat: int) -> Dict:
+    """Measure every startup mode ``repeat`` times."""
+    results = {"modes": {}}
+    for mode, lazy in MODES.items():
+        runs = [measure_startup(lazy) for _ in range(repeat)]
+        results["modes"][mode] = {
+            phase: summarize([run[phase] for run in runs])
+            for phase in ["import", "startup", "first_request"]
+        }
+    results["imports_us"] = measure_imports()
+    return results
+
+
+def print_report(results: Dict, top: int):
+    """Print startup phases and the slowest imported packages."""
+    print(f"{'mode':<8}{'phase':<16}{'p50 ms':>10}{'max ms':>10}")
+    for mode, phases in results["modes"].items():
+        for phase, stats in phases.items():
+            print(f"{mode:<8}{phase:<16}{stats['p50_ms']:>10.1f}{stats['max_ms']:>10.1f}")
+
+    imports = sorted(results["imports_us"].items(), key=lambda item: item[1], reverse=True)
+    print(f"\nImport time of app by package (total {sum(results['imports_us'].values()) / 1000:.1f} ms)")
+    for package, micros in imports[:top]:
+        print(f"  {package:<28}{micros / 1000:>10.1f} ms")
+
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Measure import and startup time")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh processes per mode")
+    parser.add_argument("--top", type=int, default=15, help="Packages to list by import time")
+    parser.add_argument("--output", help="Write results as JSON")
+    parser.add_argument("--baseline", help="Baseline results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed slowdown over the baseline before failing")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.repeat)
+    print_report(results, args.top)
+
+    if args.output:
+        write_results(args.output, results)
+        print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        regressions = compare_to_baseline(
+            results["modes"], read_results(args.baseline)["modes"], args.tolerance
+        )
+        for regression in regressions:
+            print(f"REGRESSION {regression['group']} {regression['stage']}: "
+                  f"{regression['baseline_ms']:.1f} ms -> {regression['current_ms']:.1f} ms "
+                  f"(x{regression['ratio']})")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
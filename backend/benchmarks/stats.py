@@ -0,0 +1,84 @@
+"""Timing helpers shared by the benchmark tools."""
+
+import json
+import time
+from contextlib import contextmanager
+from typing import Dict, List
+
+import numpy as np
+
+
+def summarize(durations: List[float]) -> Dict:
+    """Summarize durations in seconds as millisecond statistics."""
+    if not durations:
+        return {"runs": 0}
+    
+    values = np.asarray(durations, dtype=float) * 1000
+    return {
+        "runs": int(len(values)),
+        "mean_ms": round(float(values.mean()), 4),
+        "p50_ms": round(float(np.percentile(values, 50)), 4),
+        "p95_ms": round(float(np.percentile(values, 95)), 4),
+        "p99_ms": round(float(np.percentile(values, 99)), 4),
+        "min_ms": round(float(values.min()), 4),
+        "max_ms": round(float(values.max()), 4)
+    }
+
+
+class StageTimer:
+    """Collects wall-clock durations per named stage."""
+    
+    def __init__(self):
+        """Initialize the timer."""
+        self.durations: Dict[str, List[float]] = {}
+    
+    @contextmanager
+    def measure(self, stage: str):
+        """Time the enclosed block under a stage name."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durations.setdefault(stage, []).append(time.perf_counter() - start)
+    
+    def summary(self) -> Dict[str, Dict]:
+        """Get statistics for every stage."""
+        return {stage: summarize(values) for stage, values in self.durations.items()}
+
+
+def compare_to_baseline(current: Dict[str, Dict], baseline: Dict[str, Dict],
+                        tolerance: float = 0.25, metric: str = "p50_ms") -> List[Dict]:
+    """Compare nested stage statistics and list those slower than the baseline.
+    
+    Both arguments map a group name (catalog size, endpoint...) to a mapping of
+    stage name to statistics as produced by ``summarize``.
+    """
+    regressions = []
+    for group, stages in current.items():
+        for stage, stats in stages.items():
+            reference = baseline.get(group, {}).get(stage, {}).get(metric)
+            value = stats.get(metric)
+            if not reference or value is None:
+                continue
+            ratio = value / reference
+            if ratio > 1 + tolerance:
+                regressions.append({
+                    "group": group,
+                    "stage": stage,
+                    "baseline_ms": reference,
+                    "current_ms": value,
+                    "ratio": round(ratio, 3)
+                })
+    return regressions
+
+
+def write_results(path: str, results: Dict):
+    """Write benchmark results as JSON."""
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def read_results(path: str) -> Dict:
+    """Read benchmark results written by ``write_results``."""
+    with open(path) as f:
+        return json.load(f)
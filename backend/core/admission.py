@@ -0,0 +1,142 @@
+"""Admission control for expensive requests.
+
+At most ``admission_max_in_flight`` full computations run at once. Further
+requests wait for a slot for up to ``admission_max_queue_wait`` seconds,
+counted from when the request arrived, and at most ``admission_max_queue``
+of them wait at a time. A request that finds the queue full, or whose wait
+runs out, is shed: the caller serves a cheap degraded response instead of
+queuing behind work that already saturates the CPU.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from core.config import settings
+from core.metrics import registry, register_queue
+
+ADMISSION_QUEUE_WAIT = registry.histogram(
+    "admission_queue_wait_seconds", "Time admitted requests waited for a slot.", ["endpoint"]
+)
+ADMISSION_SHED = registry.counter(
+    "admission_shed_total", "Requests shed by admission control, by reason.", ["endpoint", "reason"]
+)
+DEGRADED_RESPONSES = registry.counter(
+    "degraded_responses_total", "Degraded responses served, by source.", ["endpoint", "source"]
+)
+
+# Where a degraded response came from: the request's own mood/time bucket,
+# a shorter time bucket of the same mood, or nothing cached yet
+DEGRADED_SOURCES = ("bucket", "nearest_bucket", "empty")
+
+
+class AdmissionController:
+    """Bounds in-flight work and the time requests wait for it."""
+    
+    def __init__(self, name: str, max_in_flight: Optional[int] = None,
+                 max_queue: Optional[int] = None, max_queue_wait: Optional[float] = None):
+        """Initialize the controller; ``max_in_flight`` of 0 admits everything."""
+        self.name = name
+        self.max_in_flight = max_in_flight if max_in_flight is not None else settings.admission_max_in_flight
+        self.max_queue = max_queue if max_queue is not None else settings.admission_max_queue
+        self.max_queue_wait = (max_queue_wait if max_queue_wait is not None
+                               else settings.admission_max_queue_wait)
+        self.in_flight = 0
+        self.waiting = 0
+        self._condition = threading.Condition()
+        register_queue(f"{name}_in_flight", lambda: self.in_flight)
+        register_queue(f"{name}_waiting", lambda: self.waiting)
+    
+    @property
+    def enabled(self) -> bool:
+        """Check whether admission is bounded at all."""
+        return self.max_in_flight > 0
+    
+    def queue_full(self) -> bool:
+        """Check, without waiting, whether a new request would be shed."""
+        with self._condition:
+            return (self.enabled and self.in_flight >= self.max_in_flight
+                    and self.waiting >= self.max_queue)
+    
+    def acquire(self, arrived: Optional[float] = None) -> bool:
+        """Wait for a slot until the request's queue wait runs out.
+        
+        ``arrived`` is the ``time.monotonic()`` at which the request arrived,
+        so time spent queued before this call counts against the wait.
+        """
+        if not self.enabled:
+            return True
+        arrived = time.monotonic() if arrived is None else arrived
+        deadline = arrived + self.max_queue_wait
+        
+        with self._condition:
+            if self.in_flight >= self.max_in_flight:
+                if self.waiting >= self.max_queue:
+                    self.shed("queue_full")
+                    return False
+                self.waiting += 1
+                try:
+                    while self.in_flight >= self.max_in_flight:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self.shed("queue_wait")
+                            return False
+                        self._condition.wait(remaining)
+                finally:
+                    self.waiting -= 1
+            self.in_flight += 1
+        
+        ADMISSION_QUEUE_WAIT.observe(time.monotonic() - arrived, endpoint=self.name)
+        return True
+    
+    def release(self):
+        """Free a slot taken by ``acquire``."""
+        if not self.enabled:
+            return
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify()
+    
+    @contextmanager
+    def admit(self, arrived: Optional[float] = None):
+        """Yield whether the request was admitted, holding its slot if so."""
+        admitted = self.acquire(arrived)
+        try:
+            yield admitted
+        finally:
+            if admitted:
+                self.release()
+    
+    def shed(self, reason: str):
+        """Count a shed request."""
+        ADMISSION_SHED.inc(endpoint=self.name, reason=reason)
+    
+    def record_degraded(self, source: str):
+        """Count a degraded response served in place of a full one."""
+        DEGRADED_RESPONSES.inc(endpoint=self.name, source=source)
+    
+    def stats(self) -> Dict:
+        """Get the current load and shed counts."""
+        with self._condition:
+            stats = {
+                "enabled": self.enabled,
+                "in_flight": self.in_flight,
+                "waiting": self.waiting,
+                "max_in_flight": self.max_in_flight,
+                "max_queue": self.max_queue,
+                "max_queue_wait": self.max_queue_wait
+            }
+        stats["shed"] = {
+            reason: int(ADMISSION_SHED.get(endpoint=self.name, reason=reason))
+            for reason in ("queue_full", "queue_wait")
+        }
+        stats["degraded"] = {
+            source: int(DEGRADED_RESPONSES.get(endpoint=self.name, source=source))
+            for source in DEGRADED_SOURCES
+        }
+        return stats
+
+
+# Global instance
+recommend_admission = AdmissionController("recommend")
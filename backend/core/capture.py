@@ -0,0 +1,124 @@
+"""Opt-in capture of recommendation and feedback requests for replay."""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterator, Optional
+
+from core.config import settings
+
+# Request body fields kept per captured path; everything else is dropped
+CAPTURED_FIELDS = {
+    "/api/recommend": ["mood", "available_minutes", "interests", "limit", "user_session"],
+    "/api/feedback": ["item_id", "domain", "action", "user_session"],
+}
+
+
+def anonymize_session(user_session: Optional[str]) -> Optional[str]:
+    """Replace a session ID with a stable pseudonym."""
+    if not user_session:
+        return None
+    return "s_" + hashlib.sha1(str(user_session).encode()).hexdigest()[:12]
+
+
+def sanitize_body(path: str, body: bytes) -> Optional[Dict]:
+    """Keep only whitelisted request fields and pseudonymize the session."""
+    try:
+        payload = json.loads(body or b"null")
+    except ValueError:
+        return None
+    
+    if not isinstance(payload, dict):
+        return None
+    
+    sanitized = {field: payload[field] for field in CAPTURED_FIELDS[path] if field in payload}
+    if "user_session" in sanitized:
+        sanitized["user_session"] = anonymize_session(sanitized["user_session"])
+    return sanitized
+
+
+class CaptureLog:
+    """Append-only JSON lines log of captured requests."""
+    
+    def __init__(self, path: str):
+        """Open the log for appending."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a", buffering=1)
+    
+    def record(self, timestamp: float, method: str, path: str,
+               body: Optional[Dict], status: Optional[int]):
+        """Append one captured request."""
+        line = json.dumps(
+            {"t": round(timestamp, 6), "m": method, "p": path, "b": body, "s": status},
+            separators=(",", ":")
+        )
+        with self._lock:
+            self._file.write(line + "\n")
+    
+    def close(self):
+        """Close the underlying file."""
+        with self._lock:
+            self._file.close()
+
+
+def read_capture_log(path: str) -> Iterator[Dict]:
+    """Read captured requests in recording order."""
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+class RequestCaptureMiddleware:
+    """ASGI middleware that records sanitized requests to a capture log."""
+    
+    def __init__(self, app, capture_log: CaptureLog):
+        """Wrap an ASGI app."""
+        self.app = app
+        self.capture_log = capture_log
+    
+    async def __call__(self, scope, receive, send):
+        """Handle an ASGI call, capturing bodies of selected endpoints."""
+        if scope["type"] != "http" or scope["path"] not in CAPTURED_FIELDS:
+            await self.app(scope, receive, send)
+            return
+        
+        timestamp = time.time()
+        chunks = []
+        status = {}
+        
+        async def capturing_receive():
+            message = await receive()
+            if message["type"] == "http.request":
+                chunks.append(message.get("body", b""))
+            return message
+        
+        async def capturing_send(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+        
+        try:
+            await self.app(scope, capturing_receive, capturing_send)
+        finally:
+            self.capture_log.record(
+                timestamp,
+                scope["method"],
+                scope["path"],
+                sanitize_body(scope["path"], b"".join(chunks)),
+                status.get("code")
+            )
+
+
+def create_capture_log() -> Optional[CaptureLog]:
+    """Create the capture log if request capture is enabled."""
+    if not settings.capture_enabled:
+        return None
+    return CaptureLog(settings.capture_path)
@@ -1,7 +1,7 @@
 """Configuration settings for the application."""
 
 import os
-from typing import List
+from typing import Dict, List, Optional
 
 from pydantic_settings import BaseSettings
 
@@ -19,9 +19,25 @@ class Settings(BaseSettings):
     
     # Database configuration
     database_url: str = "sqlite:///./feedback.db"
+    # Feedback older than the retention window moves to columnar archive
+    # files every archive interval (0 disables; python -m services.feedback_archive)
+    feedback_retention_days: int = 30
+    feedback_archive_dir: str = "data/feedback_archive"
+    feedback_archive_interval: float = 3600.0
+    # Pages (4 KiB each) handed back to the filesystem after each archive run
+    feedback_archive_vacuum_pages: int = 2000
     
     # Logging configuration
     log_level: str = "INFO"
+    log_enqueue: bool = True
+    log_json: bool = False
+    # Share of high-volume messages kept, per event type
+    log_sample_rates: Dict[str, float] = {
+        "playlist_generated": 0.1,
+        "feedback_recorded": 0.1,
+        "fallback_used": 0.1,
+        "playlist_degraded": 0.1
+    }
     
     # Application metadata
     app_name: str = "Smart Lifestyle & Learning Recommender"
@@ -33,18 +49,107 @@ class Settings(BaseSettings):
     workouts_file: str = "workouts.csv"
     recipes_file: str = "recipes.csv"
     courses_file: str = "courses.csv"
+    # Prebuilt scoring features (python -m services.recommender), used when
+    # they match the catalog so the server never imports scikit-learn
+    model_artifact_path: str = "data/content_models.json"
+    # Content models are built from the CSV files in chunks of this many rows,
+    # hashing feature terms into a fixed number of columns, with domains built
+    # in parallel processes (0 uses one per domain, up to the CPU count)
+    model_build_chunk_size: int = 50000
+    model_hash_features: int = 16384
+    model_build_workers: int = 0
+    
+    # Shared catalog snapshot published by python -m services.catalog_store;
+    # workers memory-map it instead of each loading the CSV files
+    catalog_snapshot_dir: Optional[str] = None
+    catalog_snapshot_check_interval: float = 5.0
+    
+    # Startup settings: data, models and tables load at application startup
+    # unless lazy, in which case they load on first use (serverless cold starts)
+    lazy_startup: bool = False
     
     # Recommendation settings
     default_recommendation_limit: int = 6
     max_recommendation_limit: int = 20
     content_weight: float = 0.7
     collaborative_weight: float = 0.3
+    # Mood tag weights are refitted from feedback every N seconds (0 disables);
+    # the prior strength is how many votes the hand-written preferences count for
+    mood_refit_interval: float = 300.0
+    mood_weight_prior_strength: float = 10.0
+    # Partition each domain across N scoring processes (0 or 1 scores in process);
+    # concurrent requests are all sent at once and each shard scores them in turn
+    scoring_shards: int = 0
+    scoring_shard_timeout: float = 30.0
+    # The first /api/recommend call ranks this many candidates and keeps them
+    # for "show more" pages, for ranked_list_ttl seconds (least recently used
+    # lists are evicted beyond ranked_list_max_entries)
+    ranked_list_depth: int = 100
+    ranked_list_ttl: float = 900.0
+    ranked_list_max_entries: int = 5000
+    # Per-session tag profiles from feedback rerank that session's candidates;
+    # votes halve in weight every half-life seconds
+    session_profile_weight: float = 0.2
+    session_profile_half_life: float = 3600.0
+    session_profile_max_bytes: int = 32 * 1024 * 1024
+    # Per-session Bloom filters keep served and disliked items out of later
+    # results; each generation holds this many items at this error rate
+    seen_filter_capacity: int = 500
+    seen_filter_error_rate: float = 0.01
+    seen_filter_max_bytes: int = 32 * 1024 * 1024
+    # Admission control: at most this many /api/recommend computations run at
+    # once (0 disables); others wait up to max_queue_wait seconds, max_queue at
+    # a time, before a cached degraded playlist is served instead
+    admission_max_in_flight: int = 4
+    admission_max_queue: int = 16
+    admission_max_queue_wait: float = 0.25
+    # Multi-day plans: /api/plan builds up to plan_max_days playlists in one
+    # pass; days with different moods are scored on up to plan_workers threads
+    plan_max_days: int = 14
+    plan_workers: int = 4
+    # Offline precomputation (python -m services.batch_precompute): sessions
+    # with feedback in the last N days get playlists for their top moods at
+    # every time option, computed in chunks of sessions on worker processes
+    # (0 uses one per CPU); /api/recommend serves each stored playlist once
+    precompute_active_days: int = 7
+    precompute_moods_per_session: int = 2
+    precompute_workers: int = 0
+    precompute_chunk_size: int = 50
+    precompute_serving_enabled: bool = True
     
     # Mood and time settings
     available_time_options: List[int] = [5, 10, 30, 60, 120]
     mood_options: List[str] = ["energized", "calm", "stressed", "happy", "tired"]
     interest_options: List[str] = ["lifestyle", "learning"]
     
+    # Analytics settings
+    analytics_max_days: int = 90
+    
+    # Search settings: /api/search ranks items by BM25 over an inverted index
+    # of titles, descriptions and tags; tokenized queries are cached LRU
+    search_max_limit: int = 50
+    search_max_query_length: int = 200
+    search_query_cache_size: int = 1024
+    
+    # HTTP caching settings
+    http_cache_max_age: int = 60
+    
+    # Observability settings
+    metrics_enabled: bool = True
+    server_timing_enabled: bool = False
+    tracing_enabled: bool = False
+    tracing_sample_rate: float = 0.01
+    tracing_path: str = "logs/traces.json"
+    
+    # Admin and profiling settings (admin endpoints are disabled without a token)
+    admin_token: Optional[str] = None
+    profile_dir: str = "logs/profiles"
+    profile_sample_interval: float = 0.005
+    
+    # Request capture settings (for replay benchmarks)
+    capture_enabled: bool = False
+    capture_path: str = "logs/capture.jsonl"
+    
     class Config:
         env_file = ".env"
         case_sensitive = False
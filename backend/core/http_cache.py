@@ -0,0 +1,44 @@
+"""HTTP caching helpers for conditional GET on read endpoints."""
+
+import hashlib
+from typing import Dict
+
+from fastapi import Request, Response
+
+from core.config import settings
+from core.metrics import record_cache
+
+
+def make_etag(*parts) -> str:
+    """Build a strong ETag from the catalog version and request parameters."""
+    key = "|".join(str(part) for part in parts)
+    return f'"{hashlib.sha1(key.encode()).hexdigest()}"'
+
+
+def cache_headers(etag: str) -> Dict[str, str]:
+    """Get caching headers for a response with the given ETag."""
+    return {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={settings.http_cache_max_age}"
+    }
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """Check whether the client's If-None-Match matches the current ETag."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        matched = False
+    elif header.strip() == "*":
+        matched = True
+    else:
+        # If-None-Match uses weak comparison, so ignore any W/ prefix
+        candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+        matched = etag in candidates
+    
+    record_cache("http_etag", matched)
+    return matched
+
+
+def not_modified_response(etag: str) -> Response:
+    """Build an empty 304 response carrying the caching headers."""
+    return Response(status_code=304, headers=cache_headers(etag))
@@ -1,50 +1,104 @@
 """Logging configuration for the application."""
 
+import json
+import os
+import random
 import sys
+from typing import Optional
+
 from loguru import logger
 
 from .config import settings
 
+TEXT_FORMAT = "{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} | {message}"
+CONSOLE_FORMAT = (
+    "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | "
+    "<level>{level: <8}</level> | "
+    "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> | "
+    "<level>{message}</level>"
+)
+
+
+def json_format(record) -> str:
+    """Format a record as one line of JSON."""
+    payload = {
+        "time": record["time"].isoformat(),
+        "level": record["level"].name,
+        "logger": record["name"],
+        "function": record["function"],
+        "line": record["line"],
+        "message": record["message"],
+    }
+    # Every sink renders into the same shared ``extra``; skip the line an
+    # earlier sink left there
+    payload.update((key, value) for key, value in record["extra"].items() if key != "_json")
+    if record["exception"]:
+        payload["exception"] = repr(record["exception"].value)
+    record["extra"]["_json"] = json.dumps(payload, default=str)
+    return "{extra[_json]}\n"
 
-def setup_logging():
-    """Configure logging for the application."""
+
+def setup_logging(log_dir: str = "logs", enqueue: Optional[bool] = None,
+                  json_output: Optional[bool] = None, console: bool = True):
+    """Configure logging for the application.
+    
+    With ``enqueue`` the sinks write, rotate and compress on a background
+    thread, so request handlers only pay for formatting the message.
+    """
+    enqueue = settings.log_enqueue if enqueue is None else enqueue
+    json_output = settings.log_json if json_output is None else json_output
     
     # Remove default logger
     logger.remove()
     
     # Add console logger with custom format
-    logger.add(
-        sys.stdout,
-        level=settings.log_level,
-        format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | "
-               "<level>{level: <8}</level> | "
-               "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> | "
-               "<level>{message}</level>",
-        colorize=True,
-    )
+    if console:
+        logger.add(
+            sys.stdout,
+            level=settings.log_level,
+            format=json_format if json_output else CONSOLE_FORMAT,
+            colorize=not json_output,
+            enqueue=enqueue,
+        )
     
     # Add file logger for errors
     logger.add(
-        "logs/error.log",
+        os.path.join(log_dir, "error.log"),
         level="ERROR",
-        format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} | {message}",
+        format=json_format if json_output else TEXT_FORMAT,
         rotation="10 MB",
         retention="30 days",
         compression="zip",
+        enqueue=enqueue,
     )
     
     # Add file logger for all logs
     logger.add(
-        "logs/app.log",
+        os.path.join(log_dir, "app.log"),
         level="INFO",
-        format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} | {message}",
+        format=json_format if json_output else TEXT_FORMAT,
         rotation="50 MB",
         retention="7 days",
         compression="zip",
+        enqueue=enqueue,
     )
     
     return logger
 
 
+def log_event(event: str, level: str, message: str, *args, **kwargs):
+    """Log a high-volume message type, subject to per-event sampling.
+    
+    The sampling decision is made before anything is formatted, and the
+    message uses loguru's ``{}`` placeholders so arguments are only
+    formatted for records that are actually emitted.
+    """
+    rate = settings.log_sample_rates.get(event, 1.0)
+    if rate < 1.0 and random.random() >= rate:
+        return
+    
+    logger.bind(event=event, sample_rate=rate).opt(depth=1).log(level, message, *args, **kwargs)
+
+
 # Initialize logging
 app_logger = setup_logging()
@@ -0,0 +1,343 @@
+"""In-process metrics with Prometheus text exposition and Server-Timing."""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from core.config import settings
+from core.tracing import span
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUILD_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+
+def _escape(value) -> str:
+    """Escape a label value."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames: Sequence[str], values: Sequence[str],
+                   extra: Optional[Tuple[str, str]] = None) -> str:
+    """Format a Prometheus label set."""
+    pairs = list(zip(labelnames, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value."""
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    """Base class for labelled metrics."""
+    
+    kind = "untyped"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        """Initialize the metric."""
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], object] = {}
+    
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        """Get the label value tuple for a set of labels."""
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+    
+    def render(self) -> List[str]:
+        """Render the metric in Prometheus text format."""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_sample(key, value))
+        return lines
+    
+    def _render_sample(self, key: Tuple[str, ...], value) -> List[str]:
+        """Render one labelled sample."""
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"]
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter."""
+    
+    kind = "counter"
+    
+    def inc(self, amount: float = 1.0, **labels):
+        """Increment the counter."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+    
+    def get(self, **labels) -> float:
+        """Get the current value."""
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, or be computed at scrape time."""
+    
+    kind = "gauge"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        """Initialize the gauge."""
+        super().__init__(name, documentation, labelnames)
+        self._functions: Dict[Tuple[str, ...], Callable[[], float]] = {}
+    
+    def set(self, value: float, **labels):
+        """Set the gauge."""
+        with self._lock:
+            self._values[self._key(labels)] = value
+    
+    def inc(self, amount: float = 1.0, **labels):
+        """Increment the gauge."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+    
+    def dec(self, amount: float = 1.0, **labels):
+        """Decrement the gauge."""
+        self.inc(-amount, **labels)
+    
+    def set_function(self, function: Callable[[], float], **labels):
+        """Compute the gauge value when metrics are scraped."""
+        with self._lock:
+            self._functions[self._key(labels)] = function
+    
+    def render(self) -> List[str]:
+        """Render the gauge, evaluating callback values."""
+        with self._lock:
+            functions = list(self._functions.items())
+        for key, function in functions:
+            try:
+                value = float(function())
+            except Exception:
+                continue
+            with self._lock:
+                self._values[key] = value
+        return super().render()
+
+
+class Histogram(_Metric):
+    """Cumulative histogram of observed values."""
+    
+    kind = "histogram"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        """Initialize the histogram."""
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+    
+    def observe(self, value: float, **labels):
+        """Record an observation."""
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {"counts": [0] * len(self.buckets), "sum": 0.0}
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["counts"][index] += 1
+                    break
+            state["sum"] += value
+    
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the enclosed block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+    
+    def count(self, **labels) -> int:
+        """Get the number of observations."""
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return sum(state["counts"]) if state else 0
+    
+    def _render_sample(self, key: Tuple[str, ...], state) -> List[str]:
+        """Render buckets, sum and count for one label set."""
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, state["counts"]):
+            cumulative += count
+            labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(state['sum'])}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together."""
+    
+    def __init__(self):
+        """Initialize the registry."""
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+    
+    def _register(self, metric: _Metric) -> _Metric:
+        """Register a metric, returning an existing one with the same name."""
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+    
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Create or get a counter."""
+        return self._register(Counter(name, documentation, labelnames))
+    
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """Create or get a gauge."""
+        return self._register(Gauge(name, documentation, labelnames))
+    
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """Create or get a histogram."""
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+    
+    def render(self) -> str:
+        """Render all metrics in Prometheus text format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Global registry and application metrics
+registry = MetricsRegistry()
+
+REQUEST_LATENCY = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.",
+    ["method", "route", "status"]
+)
+REQUESTS_IN_FLIGHT = registry.gauge(
+    "http_requests_in_flight", "HTTP requests currently being handled."
+)
+STAGE_LATENCY = registry.histogram(
+    "recommendation_stage_duration_seconds", "Recommendation pipeline stage latency.",
+    ["stage"]
+)
+CACHE_REQUESTS = registry.counter(
+    "cache_requests_total", "Cache lookups by cache and result.", ["cache", "result"]
+)
+CACHE_HIT_RATIO = registry.gauge(
+    "cache_hit_ratio", "Share of cache lookups that were hits.", ["cache"]
+)
+MODEL_BUILD_DURATION = registry.histogram(
+    "model_build_duration_seconds", "Content model build duration by domain.",
+    ["domain"], buckets=BUILD_BUCKETS
+)
+DB_WRITE_LATENCY = registry.histogram(
+    "db_write_duration_seconds", "Database write latency by operation.", ["operation"]
+)
+QUEUE_DEPTH = registry.gauge(
+    "queue_depth", "Items waiting or in progress per internal queue.", ["queue"]
+)
+
+# Per-request stage durations for the Server-Timing header
+_server_timing: ContextVar[Optional[Dict[str, float]]] = ContextVar("server_timing", default=None)
+
+
+def record_cache(cache: str, hit: bool):
+    """Record a cache lookup."""
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+    CACHE_HIT_RATIO.set_function(lambda: _hit_ratio(cache), cache=cache)
+
+
+def _hit_ratio(cache: str) -> float:
+    """Compute the hit ratio of a cache."""
+    hits = CACHE_REQUESTS.get(cache=cache, result="hit")
+    total = hits + CACHE_REQUESTS.get(cache=cache, result="miss")
+    return hits / total if total else 0.0
+
+
+def register_queue(queue: str, depth: Callable[[], float]):
+    """Report the depth of an internal queue at scrape time."""
+    QUEUE_DEPTH.set_function(depth, queue=queue)
+
+
+@contextmanager
+def track_stage(stage: str):
+    """Time a pipeline stage for metrics, tracing and the Server-Timing header."""
+    start = time.perf_counter()
+    try:
+        with span(stage):
+            yield
+    finally:
+        duration = time.perf_counter() - start
+        STAGE_LATENCY.observe(duration, stage=stage)
+        timings = _server_timing.get()
+        if timings is not None:
+            timings[stage] = timings.get(stage, 0.0) + duration
+
+
+def _threadpool_depth(attribute: str) -> float:
+    """Get a statistic of the anyio worker thread limiter."""
+    import anyio.to_thread
+    
+    statistics = anyio.to_thread.current_default_thread_limiter().statistics()
+    return getattr(statistics, attribute)
+
+
+register_queue("threadpool_busy", lambda: _threadpool_depth("borrowed_tokens"))
+register_queue("threadpool_waiting", lambda: _threadpool_depth("tasks_waiting"))
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency and Server-Timing headers."""
+    
+    def __init__(self, app):
+        """Wrap an ASGI app."""
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        """Handle an ASGI call, timing the request."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        start = time.perf_counter()
+        timings: Dict[str, float] = {}
+        token = _server_timing.set(timings)
+        status = {"code": 500}
+        server_timing = settings.server_timing_enabled
+        
+        async def timed_send(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                if server_timing:
+                    entries = [f"{stage};dur={duration * 1000:.2f}"
+                               for stage, duration in timings.items()]
+                    entries.append(f"app;dur={(time.perf_counter() - start) * 1000:.2f}")
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"server-timing", ", ".join(entries).encode())
+                    ]
+            await send(message)
+        
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, timed_send)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            _server_timing.reset(token)
+            route = scope.get("route")
+            REQUEST_LATENCY.observe(
+                time.perf_counter() - start,
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=str(status["code"])
+            )
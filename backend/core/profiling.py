@@ -0,0 +1,283 @@
+"""On-demand profiling of request handling.
+
+An admin starts a profiling session for the next N requests or T seconds,
+using either cProfile around each request or a statistical stack sampler.
+When the session ends, a flame-graph-compatible collapsed stack file and a
+top-functions summary are written to ``settings.profile_dir``. While no
+session is active the middleware does a single attribute check.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from core.config import settings
+from core.logging import app_logger
+
+PROFILE_MODES = ["cprofile", "sampler"]
+TOP_FUNCTIONS = 30
+
+
+def _frame_label(code) -> str:
+    """Format a code object as a flame graph frame."""
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _pstats_label(function) -> str:
+    """Format a pstats function key as a flame graph frame."""
+    filename, line, name = function
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+def pstats_to_collapsed(stats: pstats.Stats) -> List[str]:
+    """Approximate collapsed stacks from cProfile caller/callee statistics.
+    
+    cProfile keeps one level of callers, so time is pushed down the call graph
+    in proportion to each edge's cumulative time, as flameprof does. Values
+    are microseconds of self time.
+    """
+    children: Dict = {}
+    roots = []
+    for function, (_, _, _, _, callers) in stats.stats.items():
+        if not callers:
+            roots.append(function)
+        for caller, edge in callers.items():
+            children.setdefault(caller, []).append((function, edge[3]))
+    
+    # Ignore paths below 0.1% of the profile so the output stays readable
+    total = sum(stats.stats[root][3] for root in roots)
+    threshold = total * 0.001
+    collapsed: Counter = Counter()
+    
+    def walk(function, path: List[str], scale: float, on_path: set):
+        self_time = stats.stats[function][2]
+        path = path + [_pstats_label(function)]
+        collapsed[";".join(path)] += self_time * scale * 1_000_000
+        for child, edge_cumulative in children.get(function, []):
+            child_cumulative = stats.stats[child][3]
+            if child in on_path or child_cumulative <= 0 or scale * edge_cumulative < threshold:
+                continue
+            walk(child, path, scale * edge_cumulative / child_cumulative, on_path | {child})
+    
+    for root in roots:
+        walk(root, [], 1.0, {root})
+    return [f"{stack} {int(value)}" for stack, value in collapsed.items() if int(value) > 0]
+
+
+class StackSampler:
+    """Background thread sampling Python stacks of other threads."""
+    
+    def __init__(self, interval: float, should_sample):
+        """Initialize the sampler."""
+        self.interval = interval
+        self.should_sample = should_sample
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+    
+    def start(self):
+        """Start sampling."""
+        self._thread.start()
+    
+    def stop(self):
+        """Stop sampling and wait for the thread."""
+        self._stop.set()
+        self._thread.join()
+    
+    def _run(self):
+        """Sample stacks until stopped."""
+        own_ident = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            if not self.should_sample():
+                continue
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+    
+    def top_functions(self, limit: int = TOP_FUNCTIONS) -> List[tuple]:
+        """Get the functions with the most self samples."""
+        self_counts: Counter = Counter()
+        for stack, count in self.stacks.items():
+            self_counts[stack.rsplit(";", 1)[-1]] += count
+        return self_counts.most_common(limit)
+
+
+class ProfilingSession:
+    """One profiling session bounded by a request count or a duration."""
+    
+    def __init__(self, mode: str, requests: Optional[int], seconds: Optional[float]):
+        """Initialize the session."""
+        self.mode = mode
+        self.requests = requests
+        self.seconds = seconds
+        self.started_at = datetime.now(timezone.utc)
+        self.deadline = time.monotonic() + seconds if seconds else None
+        self.profiled_requests = 0
+        self.in_flight = 0
+        self.busy = False
+        self.profile = cProfile.Profile() if mode == "cprofile" else None
+        self.sampler = (StackSampler(settings.profile_sample_interval, lambda: self.in_flight > 0)
+                        if mode == "sampler" else None)
+    
+    def expired(self) -> bool:
+        """Check whether the session has reached its bounds."""
+        if self.requests is not None and self.profiled_requests >= self.requests:
+            return True
+        return self.deadline is not None and time.monotonic() >= self.deadline
+    
+    def describe(self) -> Dict:
+        """Describe the session."""
+        return {
+            "mode": self.mode,
+            "requests": self.requests,
+            "seconds": self.seconds,
+            "started_at": self.started_at.isoformat(),
+            "profiled_requests": self.profiled_requests
+        }
+
+
+class ProfilerController:
+    """Starts, tracks and finishes profiling sessions."""
+    
+    def __init__(self):
+        """Initialize the controller."""
+        self.session: Optional[ProfilingSession] = None
+        self.last_result: Optional[Dict] = None
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+    
+    def start(self, mode: str, requests: Optional[int] = None,
+              seconds: Optional[float] = None) -> Dict:
+        """Start a profiling session."""
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Mode must be one of: {PROFILE_MODES}")
+        if not requests and not seconds:
+            raise ValueError("Either requests or seconds is required")
+        
+        with self._lock:
+            if self.session is not None:
+                raise RuntimeError("A profiling session is already running")
+            session = ProfilingSession(mode, requests, seconds)
+            if session.sampler:
+                session.sampler.start()
+            self.session = session
+            if seconds:
+                self._timer = threading.Timer(seconds, self.stop)
+                self._timer.daemon = True
+                self._timer.start()
+        
+        app_logger.info(f"Profiling started: mode={mode}, requests={requests}, seconds={seconds}")
+        return session.describe()
+    
+    def stop(self) -> Optional[Dict]:
+        """Finish the current session and write its output."""
+        with self._lock:
+            session = self.session
+            if session is None:
+                return self.last_result
+            self.session = None
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+        
+        if session.sampler:
+            session.sampler.stop()
+        self.last_result = self._write_output(session)
+        app_logger.info(f"Profiling finished: {self.last_result['files']}")
+        return self.last_result
+    
+    def _write_output(self, session: ProfilingSession) -> Dict:
+        """Write collapsed stacks and a top-functions summary."""
+        os.makedirs(settings.profile_dir, exist_ok=True)
+        stamp = session.started_at.strftime("%Y%m%dT%H%M%S")
+        prefix = os.path.join(settings.profile_dir, f"{stamp}-{session.mode}")
+        files = {"collapsed": f"{prefix}.collapsed", "summary": f"{prefix}-summary.txt"}
+        
+        if session.profile is not None:
+            files["pstats"] = f"{prefix}.prof"
+            session.profile.dump_stats(files["pstats"])
+            if session.profiled_requests:
+                stats = pstats.Stats(session.profile)
+                collapsed = pstats_to_collapsed(stats)
+                summary = io.StringIO()
+                pstats.Stats(session.profile, stream=summary).sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+                summary_text = summary.getvalue()
+            else:
+                collapsed, summary_text = [], "No requests were profiled\n"
+        else:
+            collapsed = [f"{stack} {count}" for stack, count in session.sampler.stacks.items()]
+            total = sum(session.sampler.stacks.values()) or 1
+            summary_text = f"{session.sampler.samples} samples\n\n" + "".join(
+                f"{count:>8} {count / total:>7.1%}  {function}\n"
+                for function, count in session.sampler.top_functions()
+            )
+        
+        with open(files["collapsed"], "w") as f:
+            f.write("\n".join(collapsed) + ("\n" if collapsed else ""))
+        with open(files["summary"], "w") as f:
+            f.write(summary_text)
+        
+        return {**session.describe(), "files": files}
+    
+    def status(self) -> Dict:
+        """Get the current session and the last result."""
+        session = self.session
+        return {
+            "active": session.describe() if session else None,
+            "last_result": self.last_result
+        }
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling requests while a session is active."""
+    
+    def __init__(self, app, controller: "ProfilerController"):
+        """Wrap an ASGI app."""
+        self.app = app
+        self.controller = controller
+    
+    async def __call__(self, scope, receive, send):
+        """Handle an ASGI call, profiling it when a session wants it."""
+        session = self.controller.session
+        if session is None or scope["type"] != "http" or scope["path"].startswith("/api/admin"):
+            await self.app(scope, receive, send)
+            return
+        
+        # cProfile can only follow one request at a time on the event loop thread
+        use_profile = session.profile is not None and not session.busy
+        if session.profile is not None and not use_profile:
+            await self.app(scope, receive, send)
+            return
+        
+        session.in_flight += 1
+        if use_profile:
+            session.busy = True
+            session.profile.enable()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            if use_profile:
+                session.profile.disable()
+                session.busy = False
+            session.in_flight -= 1
+            session.profiled_requests += 1
+            if session.expired() and self.controller.session is session:
+                self.controller.stop()
+
+
+# Global instance
+profiler = ProfilerController()
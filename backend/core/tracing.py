@@ -0,0 +1,231 @@
+"""Lightweight per-request tracing with a local Chrome trace exporter.
+
+Spans are only recorded inside a sampled request; everywhere else ``span``
+returns a shared no-op context manager, so instrumented code costs one
+context variable lookup when tracing is off. Finished traces are appended
+to a file in the Chrome Trace Event format, which opens directly in
+Perfetto (ui.perfetto.dev) or chrome://tracing.
+"""
+
+import functools
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from core.config import settings
+
+
+class _NoopSpan:
+    """Span used when the current request is not traced."""
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        return False
+    
+    def set_attribute(self, key: str, value):
+        """Ignore attributes."""
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Trace:
+    """Spans collected for one sampled request."""
+    
+    def __init__(self, name: str):
+        """Start a trace."""
+        self.trace_id = uuid.uuid4().hex
+        self.name = name
+        self.spans: List[Dict] = []
+        self._lock = threading.Lock()
+    
+    def add(self, span: Dict):
+        """Add a finished span."""
+        with self._lock:
+            self.spans.append(span)
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+_current_span_id: ContextVar[Optional[str]] = ContextVar("current_span_id", default=None)
+
+
+class Span:
+    """Timed span recorded into the current trace."""
+    
+    def __init__(self, trace: Trace, name: str, attributes: Dict):
+        """Create a span."""
+        self.trace = trace
+        self.name = name
+        self.attributes = attributes
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = None
+        self._token = None
+        self._start = 0.0
+        self._start_perf = 0.0
+    
+    def __enter__(self):
+        self.parent_id = _current_span_id.get()
+        self._token = _current_span_id.set(self.span_id)
+        self._start = time.time()
+        self._start_perf = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self._start_perf
+        _current_span_id.reset(self._token)
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        self.trace.add({
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start": self._start,
+            "duration": duration,
+            "thread": threading.get_ident(),
+            "attributes": self.attributes
+        })
+        return False
+    
+    def set_attribute(self, key: str, value):
+        """Attach an attribute to the span."""
+        self.attributes[key] = value
+
+
+def span(name: str, **attributes):
+    """Open a span in the current trace, or a no-op when not tracing."""
+    trace = _current_trace.get()
+    if trace is None:
+        return _NOOP_SPAN
+    return Span(trace, name, attributes)
+
+
+def traced(name: Optional[str] = None):
+    """Decorate a function so each call is recorded as a span."""
+    
+    def decorator(function):
+        span_name = name or function.__qualname__
+        
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            trace = _current_trace.get()
+            if trace is None:
+                return function(*args, **kwargs)
+            with Span(trace, span_name, {}):
+                return function(*args, **kwargs)
+        
+        return wrapper
+    
+    return decorator
+
+
+class ChromeTraceExporter:
+    """Appends finished traces to a Chrome Trace Event format file."""
+    
+    def __init__(self, path: str):
+        """Open the trace file, starting the JSON array if it is new."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, "a")
+        if is_new:
+            # The closing bracket is optional in the trace event format,
+            # which keeps the file append-only
+            self._file.write("[\n")
+            self._file.flush()
+    
+    def export(self, trace: Trace):
+        """Write every span of a trace as a complete event."""
+        pid = os.getpid()
+        track = int(trace.trace_id[:8], 16)
+        lines = []
+        for span_data in trace.spans:
+            lines.append(json.dumps({
+                "name": span_data["name"],
+                "cat": trace.name,
+                "ph": "X",
+                "ts": round(span_data["start"] * 1_000_000, 3),
+                "dur": round(span_data["duration"] * 1_000_000, 3),
+                "pid": pid,
+                "tid": track,
+                "args": {
+                    "trace_id": trace.trace_id,
+                    "span_id": span_data["span_id"],
+                    "parent_id": span_data["parent_id"],
+                    "thread": span_data["thread"],
+                    **{key: str(value) for key, value in span_data["attributes"].items()}
+                }
+            }, separators=(",", ":")) + ",\n")
+        with self._lock:
+            self._file.write("".join(lines))
+            self._file.flush()
+    
+    def close(self):
+        """Close the trace file."""
+        with self._lock:
+            self._file.close()
+
+
+def should_sample(force: bool = False) -> bool:
+    """Decide whether to trace a request."""
+    if not settings.tracing_enabled:
+        return False
+    return force or random.random() < settings.tracing_sample_rate
+
+
+class TracingMiddleware:
+    """ASGI middleware that starts a trace for sampled requests."""
+    
+    def __init__(self, app, exporter: ChromeTraceExporter):
+        """Wrap an ASGI app."""
+        self.app = app
+        self.exporter = exporter
+    
+    async def __call__(self, scope, receive, send):
+        """Handle an ASGI call, tracing it when sampled."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        headers = dict(scope.get("headers", []))
+        if not should_sample(force=headers.get(b"x-trace-sample") == b"1"):
+            await self.app(scope, receive, send)
+            return
+        
+        trace = Trace(f"{scope['method']} {scope['path']}")
+        trace_token = _current_trace.set(trace)
+        root = Span(trace, trace.name, {"http.method": scope["method"], "http.path": scope["path"]})
+        
+        async def traced_send(message):
+            if message["type"] == "http.response.start":
+                root.set_attribute("http.status", message["status"])
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-trace-id", trace.trace_id.encode())
+                ]
+            await send(message)
+        
+        try:
+            with root:
+                await self.app(scope, receive, traced_send)
+        finally:
+            _current_trace.reset(trace_token)
+            route = scope.get("route")
+            if route is not None:
+                root.set_attribute("http.route", route.path)
+            self.exporter.export(trace)
+
+
+def create_trace_exporter() -> Optional[ChromeTraceExporter]:
+    """Create the trace exporter if tracing is enabled."""
+    if not settings.tracing_enabled:
+        return None
+    return ChromeTraceExporter(settings.tracing_path)
@@ -1,19 +1,22 @@
 """Database models for user feedback."""
 
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime, timezone
+from typing import Dict, Optional, Tuple
 
-from sqlmodel import Field, SQLModel, create_engine, Session
+from sqlalchemy.dialects.sqlite import insert
+from sqlmodel import Field, SQLModel, create_engine, Session, delete, select
 from core.config import settings
 
 
 class FeedbackBase(SQLModel):
     """Base feedback model."""
-    item_id: str = Field(index=True)
-    domain: str = Field(index=True)  # workout, recipe, course
-    action: str = Field(index=True)  # like, dislike
-    user_session: Optional[str] = Field(default=None, index=True)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    # Raw rows are only scanned by time (reads go through the rollups),
+    # so created_at is the one index every insert has to maintain
+    item_id: str
+    domain: str  # workout, recipe, course
+    action: str  # like, dislike
+    user_session: Optional[str] = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), index=True)
 
 
 class Feedback(FeedbackBase, table=True):
@@ -31,20 +34,142 @@ class FeedbackRead(FeedbackBase):
     id: int
 
 
-# Database setup
+class FeedbackItemDaily(SQLModel, table=True):
+    """Likes and dislikes per item per day, maintained with every insert."""
+    item_id: str = Field(primary_key=True)
+    day: date = Field(primary_key=True, index=True)
+    domain: str = Field(index=True)
+    likes: int = 0
+    dislikes: int = 0
+
+
+class FeedbackDomainDaily(SQLModel, table=True):
+    """Likes and dislikes per domain per day, maintained with every insert."""
+    domain: str = Field(primary_key=True)
+    day: date = Field(primary_key=True, index=True)
+    likes: int = 0
+    dislikes: int = 0
+
+
+class PrecomputedPlaylist(SQLModel, table=True):
+    """A session's playlist computed offline for one mood/time/interests request."""
+    key: str = Field(primary_key=True)
+    user_session: str = Field(index=True)
+    catalog_version: Optional[str] = None
+    payload: str  # JSON playlist response and the ranked candidates left for paging
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+def _increment(row, action: str, count: int = 1):
+    """Add votes to a rollup row."""
+    if action == "like":
+        row.likes += count
+    else:
+        row.dislikes += count
+
+
+def _upsert_votes(session: Session, model, values: Dict, action: str):
+    """Add one vote to a rollup row, creating it if missing, in a single statement."""
+    votes = {"likes": int(action == "like"), "dislikes": int(action != "like")}
+    statement = insert(model).values(**values, **votes)
+    session.exec(statement.on_conflict_do_update(
+        index_elements=list(model.__table__.primary_key.columns),
+        set_={column: getattr(model.__table__.c, column) + getattr(statement.excluded, column)
+              for column in votes}
+    ))
+
+
+def add_to_rollups(session: Session, feedback: Feedback):
+    """Count a new feedback row in the rollups, in the caller's transaction.
+    
+    The counts are incremented by the database, so concurrent writers never
+    overwrite each other's votes.
+    """
+    day = feedback.created_at.date()
+    _upsert_votes(session, FeedbackItemDaily,
+                  {"item_id": feedback.item_id, "day": day, "domain": feedback.domain}, feedback.action)
+    _upsert_votes(session, FeedbackDomainDaily,
+                  {"domain": feedback.domain, "day": day}, feedback.action)
+
+
+def drop_precomputed(session: Session, user_session: str):
+    """Drop a session's precomputed playlists, in the caller's transaction."""
+    session.exec(delete(PrecomputedPlaylist).where(PrecomputedPlaylist.user_session == user_session))
+
+
+def rebuild_rollups(session: Session) -> int:
+    """Recompute the rollups from the raw feedback rows; returns rows read."""
+    items: Dict[Tuple[str, date], FeedbackItemDaily] = {}
+    domains: Dict[Tuple[str, date], FeedbackDomainDaily] = {}
+    rows = 0
+    for item_id, domain, action, created_at in session.exec(
+        select(Feedback.item_id, Feedback.domain, Feedback.action, Feedback.created_at)
+    ):
+        day = created_at.date()
+        item_row = items.get((item_id, day))
+        if item_row is None:
+            item_row = items[(item_id, day)] = FeedbackItemDaily(item_id=item_id, day=day, domain=domain)
+        _increment(item_row, action)
+        domain_row = domains.get((domain, day))
+        if domain_row is None:
+            domain_row = domains[(domain, day)] = FeedbackDomainDaily(domain=domain, day=day)
+        _increment(domain_row, action)
+        rows += 1
+    
+    for model in (FeedbackItemDaily, FeedbackDomainDaily):
+        for row in session.exec(select(model)):
+            session.delete(row)
+    session.add_all(list(items.values()) + list(domains.values()))
+    session.commit()
+    return rows
+
+
+# Database setup (tables are created at application startup or on first use)
 engine = create_engine(settings.database_url, echo=False)
+_tables_created = False
+
+
+# Indexes of earlier versions that no query uses any more
+LEGACY_INDEXES = ["ix_feedback_item_id", "ix_feedback_domain", "ix_feedback_action",
+                  "ix_feedback_user_session"]
+
+
+def _migrate_indexes():
+    """Drop unused indexes from existing tables and add the ones they lack."""
+    with engine.begin() as connection:
+        for name in LEGACY_INDEXES:
+            connection.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
+        for index in Feedback.__table__.indexes:
+            index.create(connection, checkfirst=True)
 
 
 def create_db_and_tables():
-    """Create database and tables."""
-    SQLModel.metadata.create_all(engine)
+    """Create database and tables, backfilling the rollups of existing feedback."""
+    global _tables_created
+    with engine.begin() as connection:
+        if engine.dialect.name == "sqlite":
+            # Only takes effect on a new database: archiving then frees pages
+            # with a bounded incremental vacuum instead of rewriting the file
+            connection.exec_driver_sql("PRAGMA auto_vacuum=INCREMENTAL")
+        SQLModel.metadata.create_all(connection)
+    if not _tables_created:
+        _migrate_indexes()
+        with Session(engine) as session:
+            has_rollups = session.exec(select(FeedbackDomainDaily.domain).limit(1)).first()
+            has_feedback = session.exec(select(Feedback.id).limit(1)).first()
+            if has_feedback is not None and has_rollups is None:
+                rebuild_rollups(session)
+    _tables_created = True
+
+
+def ensure_tables():
+    """Create the tables on first use, once per process."""
+    if not _tables_created:
+        create_db_and_tables()
 
 
 def get_session():
     """Get database session."""
+    ensure_tables()
     with Session(engine) as session:
         yield session
-
-
-# Initialize database
-create_db_and_tables()
@@ -0,0 +1,76 @@
+"""Admin-only operational endpoints."""
+
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from pydantic import BaseModel, Field
+
+from core.config import settings
+from core.profiling import PROFILE_MODES, profiler
+
+
+def require_admin(x_admin_token: Optional[str] = Header(default=None)):
+    """Require the configured admin token."""
+    if not settings.admin_token:
+        raise HTTPException(status_code=404, detail="Admin endpoints are disabled")
+    
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, settings.admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+router = APIRouter(prefix="/api/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+
+class ProfileRequest(BaseModel):
+    """Request model for starting a profiling session."""
+    mode: str = Field(default="sampler", description=f"Profiler: {', '.join(PROFILE_MODES)}")
+    requests: Optional[int] = Field(default=None, description="Profile the next N requests")
+    seconds: Optional[float] = Field(default=None, description="Profile for T seconds")
+
+
+@router.post("/profile")
+async def start_profiling(request: ProfileRequest):
+    """Start profiling the next N requests or T seconds."""
+    if request.mode not in PROFILE_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid mode. Must be one of: {PROFILE_MODES}"
+        )
+    
+    if request.requests is None and request.seconds is None:
+        raise HTTPException(status_code=400, detail="Either requests or seconds is required")
+    
+    if request.requests is not None and not 1 <= request.requests <= 1000:
+        raise HTTPException(status_code=400, detail="Requests must be between 1 and 1000")
+    
+    if request.seconds is not None and not 0 < request.seconds <= 300:
+        raise HTTPException(status_code=400, detail="Seconds must be between 0 and 300")
+    
+    try:
+        session = profiler.start(request.mode, request.requests, request.seconds)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    
+    return {"status": "started", "session": session}
+
+
+@router.get("/profile")
+async def get_profiling_status():
+    """Get the active profiling session and the last result."""
+    return profiler.status()
+
+
+@router.delete("/profile")
+async def stop_profiling():
+    """Stop the active profiling session and write its output."""
+    return {"status": "stopped", "result": profiler.stop()}
+
+
+@router.get("/memory")
+async def get_memory_report():
+    """Get the memory held by the loaded catalog, per domain and column."""
+    # Lazy import so importing the app does not load pandas
+    from services.data_loader import data_loader
+    
+    return data_loader.memory_report()
@@ -0,0 +1,59 @@
+"""Feedback analytics endpoints."""
+
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException
+from sqlmodel import Session
+
+from core.config import settings
+from core.logging import app_logger
+from models.feedback import get_session
+
+router = APIRouter(prefix="/api", tags=["analytics"])
+
+
+@router.get("/analytics")
+async def get_analytics(
+    days: int = 7,
+    domain: Optional[str] = None,
+    mood: Optional[str] = None,
+    limit: int = 10,
+    session: Session = Depends(get_session)
+):
+    """Get feedback totals per domain and day and the most liked items."""
+    
+    if days < 1 or days > settings.analytics_max_days:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Days must be between 1 and {settings.analytics_max_days}"
+        )
+    
+    if domain and domain not in ["workout", "recipe", "course"]:
+        raise HTTPException(
+            status_code=400,
+            detail="Domain must be one of: workout, recipe, course"
+        )
+    
+    if mood and mood not in settings.mood_options:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid mood. Must be one of: {settings.mood_options}"
+        )
+    
+    if limit < 1 or limit > 100:
+        raise HTTPException(
+            status_code=400,
+            detail="Limit must be between 1 and 100"
+        )
+    
+    try:
+        # Lazy import to avoid startup issues
+        from services import analytics
+        
+        return analytics.get_analytics(session, days, domain, mood, limit)
+        
+    except Exception as e:
+        app_logger.error("Error getting analytics: {}", e)
+        raise HTTPException(
+            status_code=500,
+            detail="Error getting analytics"
+        )
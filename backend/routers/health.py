@@ -1,11 +1,18 @@
 """Health check and metadata endpoints."""
 
-from fastapi import APIRouter
+import json
+from typing import Dict
+
+from fastapi import APIRouter, Request, Response
+from core.admission import recommend_admission
 from core.config import settings
-from services.data_loader import data_loader
+from core.http_cache import cache_headers, is_not_modified, make_etag, not_modified_response
 
 router = APIRouter(prefix="/api", tags=["health"])
 
+# Serialized /metadata response for the current catalog version
+_metadata_body: Dict = {}
+
 
 @router.get("/health")
 async def health_check():
@@ -13,17 +20,33 @@ async def health_check():
     return {
         "status": "ok",
         "version": settings.app_version,
-        "app_name": settings.app_name
+        "app_name": settings.app_name,
+        "admission": recommend_admission.stats()
     }
 
 
 @router.get("/metadata")
-async def get_metadata():
+async def get_metadata(request: Request):
     """Get system metadata including data counts and available options."""
-    metadata = data_loader.get_metadata()
+    # Lazy import so importing the app does not load pandas
+    from services.data_loader import data_loader
+    
+    etag = make_etag("metadata", data_loader.current_version(), settings.app_version)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
     
+    # Serialize once per catalog version; every later request reuses the bytes
+    if _metadata_body.get("etag") != etag:
+        _metadata_body["body"] = json.dumps(_build_metadata(data_loader.get_metadata())).encode()
+        _metadata_body["etag"] = etag
+    
+    return Response(_metadata_body["body"], media_type="application/json", headers=cache_headers(etag))
+
+
+def _build_metadata(summary: Dict) -> Dict:
+    """Build the metadata response from the catalog summary."""
     return {
-        "data_summary": metadata,
+        "data_summary": summary,
         "configuration": {
             "mood_options": settings.mood_options,
             "time_options": settings.available_time_options,
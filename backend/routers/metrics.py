@@ -0,0 +1,20 @@
+"""Prometheus metrics endpoint."""
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from core.config import settings
+from core.metrics import registry
+
+router = APIRouter(prefix="/api", tags=["metrics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Expose application metrics in Prometheus text format."""
+    if not settings.metrics_enabled:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    
+    return PlainTextResponse(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
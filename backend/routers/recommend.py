@@ -1,13 +1,22 @@
 """Recommendation and feedback endpoints."""
 
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException
+import time
+from typing import Dict, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
 from sqlmodel import Session
 
+from core.admission import recommend_admission
 from core.config import settings
-from core.logging import app_logger
-from models.feedback import Feedback, FeedbackCreate, get_session
+from core.http_cache import cache_headers, is_not_modified, make_etag, not_modified_response
+from core.logging import app_logger, log_event
+from core.metrics import DB_WRITE_LATENCY, track_stage
+from core.tracing import span
+from models.feedback import Feedback, FeedbackCreate, add_to_rollups, drop_precomputed, get_session
+from routers.search import facet_filters
 # from services.playlist import playlist_generator
 
 
@@ -21,6 +30,9 @@ class RecommendationRequest(BaseModel):
     interests: List[str] = Field(..., description="User interests (lifestyle, learning)")
     limit: Optional[int] = Field(default=6, description="Number of recommendations")
     user_session: Optional[str] = Field(default=None, description="User session ID")
+    filters: Optional[Dict[str, List[str]]] = Field(
+        default=None, description="Facet filters: facet name to accepted values"
+    )
 
     class Config:
         schema_extra = {
@@ -29,6 +41,27 @@ class RecommendationRequest(BaseModel):
                 "available_minutes": 60,
                 "interests": ["lifestyle", "learning"],
                 "limit": 6,
+                "user_session": "user_123",
+                "filters": {"difficulty": ["beginner", "intermediate"]}
+            }
+        }
+
+
+class PlanRequest(RecommendationRequest):
+    """Request model for multi-day plans."""
+    days: int = Field(default=7, description="Number of days to plan")
+    day_moods: Optional[List[str]] = Field(
+        default=None, description="Mood of each day, overriding mood"
+    )
+    
+    class Config:
+        schema_extra = {
+            "example": {
+                "mood": "calm",
+                "available_minutes": 30,
+                "interests": ["lifestyle", "learning"],
+                "limit": 3,
+                "days": 7,
                 "user_session": "user_123"
             }
         }
@@ -52,11 +85,14 @@ class FeedbackRequest(BaseModel):
         }
 
 
-@router.post("/recommend")
-async def get_recommendations(request: RecommendationRequest):
-    """Get personalized recommendations based on mood, time, and interests."""
-    
-    # Validate inputs
+def _catalog_version() -> Optional[str]:
+    """Get the current catalog snapshot version."""
+    from services.data_loader import data_loader
+    return data_loader.current_version()
+
+
+def _validate_request(request: RecommendationRequest):
+    """Reject a request with an invalid mood, time, interests, limit or filters."""
     if request.mood not in settings.mood_options:
         raise HTTPException(
             status_code=400,
@@ -81,32 +117,215 @@ async def get_recommendations(request: RecommendationRequest):
             detail=f"Limit must be between 1 and {settings.max_recommendation_limit}"
         )
     
+    # Lazy import to avoid startup issues
+    from services.facets import validate_filters
+    
+    error = validate_filters(request.filters)
+    if error:
+        raise HTTPException(
+            status_code=400,
+            detail=error
+        )
+
+
+def _may_be_precomputed(request: RecommendationRequest) -> bool:
+    """Check whether a playlist may have been precomputed for a request."""
+    return settings.precompute_serving_enabled and bool(request.user_session) and not request.filters
+
+
+def _take_precomputed(request: RecommendationRequest) -> Optional[Dict]:
+    """Take the playlist precomputed for a session's request, if one is stored."""
+    # Lazy import to avoid startup issues
+    from services.batch_precompute import take_precomputed
+    
+    return take_precomputed(
+        request.user_session, request.mood, request.available_minutes, request.interests,
+        request.limit or settings.default_recommendation_limit
+    )
+
+
+def _generate_admitted(request: RecommendationRequest, arrived: float) -> Optional[Dict]:
+    """Generate a playlist once admitted, or get None if the request was shed."""
+    from services.playlist import playlist_generator
+    
+    with recommend_admission.admit(arrived) as admitted:
+        if not admitted:
+            return None
+        return playlist_generator.generate_playlist(
+            mood=request.mood,
+            available_minutes=request.available_minutes,
+            interests=request.interests,
+            limit=request.limit or settings.default_recommendation_limit,
+            user_session=request.user_session,
+            filters=request.filters
+        )
+
+
+@router.post("/recommend")
+async def get_recommendations(request: RecommendationRequest):
+    """Get personalized recommendations based on mood, time, and interests."""
+    arrived = time.monotonic()
+    
+    # Validate inputs
+    _validate_request(request)
+    
     try:
         # Lazy import to avoid startup issues
         from services.playlist import playlist_generator
 
-        # Generate playlist
-        result = playlist_generator.generate_playlist(
+        # Serve a playlist precomputed offline, looked up by key off the event
+        # loop; else generate one, off the event loop and within the admission
+        # limits (a full queue sheds the request without taking a thread)
+        precomputed = None
+        if _may_be_precomputed(request):
+            precomputed = await run_in_threadpool(_take_precomputed, request)
+        if precomputed is not None:
+            result = precomputed
+        elif not recommend_admission.enabled:
+            result = _generate_admitted(request, arrived)
+        elif recommend_admission.queue_full():
+            recommend_admission.shed("queue_full")
+            result = None
+        else:
+            result = await run_in_threadpool(_generate_admitted, request, arrived)
+        
+        if result is None:
+            result, source = playlist_generator.get_degraded_playlist(
+                mood=request.mood,
+                available_minutes=request.available_minutes,
+                interests=request.interests,
+                limit=request.limit or settings.default_recommendation_limit,
+                filters=request.filters
+            )
+            recommend_admission.record_degraded(source)
+            log_event(
+                "playlist_degraded", "WARNING",
+                "Served degraded playlist ({}) for mood={}, time={}",
+                source, request.mood, request.available_minutes
+            )
+        else:
+            log_event(
+                "playlist_generated", "INFO",
+                "Generated playlist for mood={}, time={}, interests={}",
+                request.mood, request.available_minutes, request.interests
+            )
+        
+        with track_stage("serialization"):
+            return JSONResponse(content=jsonable_encoder(result))
+        
+    except Exception as e:
+        app_logger.error("Error generating recommendations: {}", e)
+        raise HTTPException(
+            status_code=500,
+            detail="Error generating recommendations"
+        )
+
+
+@router.get("/recommend/more")
+async def get_more_recommendations(cursor: str, limit: int = 6):
+    """Get the next page of a ranked list from a cursor returned by /recommend."""
+    
+    if limit < 1 or limit > settings.max_recommendation_limit:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Limit must be between 1 and {settings.max_recommendation_limit}"
+        )
+    
+    try:
+        # Lazy import to avoid startup issues
+        from services.playlist import playlist_generator
+
+        page = playlist_generator.get_page(cursor, limit)
+        
+    except Exception as e:
+        app_logger.error("Error getting recommendation page: {}", e)
+        raise HTTPException(
+            status_code=500,
+            detail="Error getting recommendation page"
+        )
+    
+    if page is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Cursor not found or expired; request new recommendations"
+        )
+    
+    with track_stage("serialization"):
+        return JSONResponse(content=jsonable_encoder(page))
+
+
+def _plan_admitted(request: PlanRequest, arrived: float) -> Optional[Dict]:
+    """Generate a plan once admitted, or get None if the request was shed."""
+    from services.playlist import playlist_generator
+    
+    with recommend_admission.admit(arrived) as admitted:
+        if not admitted:
+            return None
+        return playlist_generator.generate_plan(
             mood=request.mood,
             available_minutes=request.available_minutes,
             interests=request.interests,
+            days=request.days,
             limit=request.limit or settings.default_recommendation_limit,
-            user_session=request.user_session
+            user_session=request.user_session,
+            filters=request.filters,
+            day_moods=request.day_moods
         )
-        
-        app_logger.info(
-            f"Generated playlist for mood={request.mood}, "
-            f"time={request.available_minutes}, interests={request.interests}"
+
+
+@router.post("/plan")
+async def get_plan(request: PlanRequest):
+    """Get a playlist per day for several days, with no item repeated."""
+    arrived = time.monotonic()
+    
+    # Validate inputs
+    _validate_request(request)
+    
+    if request.days < 1 or request.days > settings.plan_max_days:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Days must be between 1 and {settings.plan_max_days}"
         )
-        
-        return result
+    
+    if request.day_moods is not None and (
+        len(request.day_moods) != request.days
+        or not all(mood in settings.mood_options for mood in request.day_moods)
+    ):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Day moods must give one mood per day from: {settings.mood_options}"
+        )
+    
+    try:
+        # A plan takes one admission slot, like a single playlist
+        if recommend_admission.enabled and recommend_admission.queue_full():
+            recommend_admission.shed("queue_full")
+            result = None
+        else:
+            result = await run_in_threadpool(_plan_admitted, request, arrived)
         
     except Exception as e:
-        app_logger.error(f"Error generating recommendations: {e}")
+        app_logger.error("Error generating plan: {}", e)
         raise HTTPException(
             status_code=500,
-            detail="Error generating recommendations"
+            detail="Error generating plan"
         )
+    
+    # No cached plans exist to degrade to, so shed plans are retried
+    if result is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Service busy; retry shortly",
+            headers={"Retry-After": "1"}
+        )
+    
+    log_event(
+        "plan_generated", "INFO",
+        "Generated {}-day plan for mood={}, time={}, interests={}",
+        request.days, request.mood, request.available_minutes, request.interests
+    )
+    with track_stage("serialization"):
+        return JSONResponse(content=jsonable_encoder(result))
 
 
 @router.post("/feedback")
@@ -132,19 +351,31 @@ async def submit_feedback(
             user_session=request.user_session
         )
         
-        session.add(feedback)
-        session.commit()
+        with DB_WRITE_LATENCY.time(operation="feedback_insert"), span("db.feedback_insert"):
+            session.add(feedback)
+            add_to_rollups(session, feedback)
+            if request.user_session:
+                drop_precomputed(session, request.user_session)
+            session.commit()
         session.refresh(feedback)
         
-        app_logger.info(
-            f"Feedback recorded: {request.action} for {request.item_id} "
-            f"by session {request.user_session}"
+        # Lazy import to avoid startup issues
+        from services.seen_filter import seen_filters
+        from services.session_profiles import record_feedback
+        record_feedback(request.user_session, request.item_id, request.action, request.domain)
+        if request.user_session:
+            seen_filters.record_feedback(request.user_session, request.item_id, request.action)
+        
+        log_event(
+            "feedback_recorded", "INFO",
+            "Feedback recorded: {} for {} by session {}",
+            request.action, request.item_id, request.user_session
         )
         
         return {"status": "ok", "message": "Feedback recorded successfully"}
         
     except Exception as e:
-        app_logger.error(f"Error recording feedback: {e}")
+        app_logger.error("Error recording feedback: {}", e)
         session.rollback()
         raise HTTPException(
             status_code=500,
@@ -153,7 +384,8 @@ async def submit_feedback(
 
 
 @router.get("/similar/{item_id}")
-async def get_similar_items(item_id: str, limit: int = 5):
+async def get_similar_items(item_id: str, request: Request, response: Response,
+                            limit: int = 5):
     """Get items similar to a given item."""
     
     if limit < 1 or limit > 20:
@@ -162,11 +394,17 @@ async def get_similar_items(item_id: str, limit: int = 5):
             detail="Limit must be between 1 and 20"
         )
     
+    # Answer conditional requests before touching the catalog
+    etag = make_etag("similar", _catalog_version(), item_id, limit)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+    
     try:
         # Lazy import to avoid startup issues
         from services.playlist import playlist_generator
 
         similar_items = playlist_generator.get_similar_items(item_id, limit)
+        response.headers.update(cache_headers(etag))
         
         return {
             "item_id": item_id,
@@ -175,7 +413,7 @@ async def get_similar_items(item_id: str, limit: int = 5):
         }
         
     except Exception as e:
-        app_logger.error(f"Error getting similar items: {e}")
+        app_logger.error("Error getting similar items: {}", e)
         raise HTTPException(
             status_code=500,
             detail="Error getting similar items"
@@ -184,10 +422,13 @@ async def get_similar_items(item_id: str, limit: int = 5):
 
 @router.get("/quick-suggestions")
 async def get_quick_suggestions(
+    request: Request,
+    response: Response,
     available_minutes: int,
-    domain: Optional[str] = None
+    domain: Optional[str] = None,
+    filters: Dict[str, List[str]] = Depends(facet_filters)
 ):
-    """Get quick suggestions for a specific time constraint."""
+    """Get quick suggestions for a specific time constraint and facet filters."""
     
     if available_minutes not in settings.available_time_options:
         raise HTTPException(
@@ -201,23 +442,41 @@ async def get_quick_suggestions(
             detail="Domain must be one of: workout, recipe, course"
         )
     
+    # Lazy import to avoid startup issues
+    from services.facets import validate_filters
+    
+    error = validate_filters(filters)
+    if error:
+        raise HTTPException(
+            status_code=400,
+            detail=error
+        )
+    
+    # Answer conditional requests before touching the catalog
+    etag = make_etag("quick-suggestions", _catalog_version(), available_minutes, domain,
+                     sorted(filters.items()))
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+    
     try:
         # Lazy import to avoid startup issues
         from services.playlist import playlist_generator
 
         suggestions = playlist_generator.get_quick_suggestions(
-            available_minutes, domain
+            available_minutes, domain, filters
         )
+        response.headers.update(cache_headers(etag))
         
         return {
             "available_minutes": available_minutes,
             "domain": domain,
+            "filters": filters,
             "suggestions": suggestions,
             "count": len(suggestions)
         }
         
     except Exception as e:
-        app_logger.error(f"Error getting quick suggestions: {e}")
+        app_logger.error("Error getting quick suggestions: {}", e)
         raise HTTPException(
             status_code=500,
             detail="Error getting quick suggestions"
@@ -0,0 +1,132 @@
+"""Catalog search and facet endpoints."""
+
+from typing import Dict, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+
+from core.config import settings
+from core.http_cache import cache_headers, is_not_modified, make_etag, not_modified_response
+from core.logging import app_logger
+
+router = APIRouter(prefix="/api", tags=["search"])
+
+
+def facet_filters(
+    difficulty: Optional[List[str]] = Query(None),
+    duration: Optional[List[str]] = Query(None),
+    mood_tag: Optional[List[str]] = Query(None),
+    item_type: Optional[List[str]] = Query(None, alias="type"),
+    topic: Optional[List[str]] = Query(None)
+) -> Dict[str, List[str]]:
+    """Collect facet filters from repeated query parameters, e.g. ?difficulty=beginner."""
+    filters = {
+        "difficulty": difficulty,
+        "duration": duration,
+        "mood_tag": mood_tag,
+        "type": item_type,
+        "topic": topic
+    }
+    return {facet: values for facet, values in filters.items() if values}
+
+
+@router.get("/search")
+async def search(
+    request: Request,
+    response: Response,
+    q: str = "",
+    domain: Optional[str] = None,
+    min_minutes: Optional[int] = None,
+    max_minutes: Optional[int] = None,
+    limit: int = 10
+):
+    """Search item titles, descriptions and tags, best matches first."""
+    
+    if not q.strip() or len(q) > settings.search_max_query_length:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Query must be 1 to {settings.search_max_query_length} characters"
+        )
+    
+    if domain and domain not in ["workout", "recipe", "course"]:
+        raise HTTPException(
+            status_code=400,
+            detail="Domain must be one of: workout, recipe, course"
+        )
+    
+    if (min_minutes is not None and min_minutes < 0) or (max_minutes is not None and max_minutes < 0):
+        raise HTTPException(
+            status_code=400,
+            detail="Minutes must not be negative"
+        )
+    
+    if limit < 1 or limit > settings.search_max_limit:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Limit must be between 1 and {settings.search_max_limit}"
+        )
+    
+    try:
+        # Lazy import to avoid startup issues
+        from services.data_loader import data_loader
+        from services.search import catalog_search
+        
+        # Answer conditional requests before searching
+        etag = make_etag("search", data_loader.current_version(), q, domain, min_minutes, max_minutes, limit)
+        if is_not_modified(request, etag):
+            return not_modified_response(etag)
+        
+        # The first search after a catalog change builds the index
+        results = await run_in_threadpool(
+            catalog_search.search, q, limit, domain, min_minutes, max_minutes
+        )
+        response.headers.update(cache_headers(etag))
+        return results
+        
+    except Exception as e:
+        app_logger.error("Error searching catalog: {}", e)
+        raise HTTPException(
+            status_code=500,
+            detail="Error searching catalog"
+        )
+
+
+@router.get("/facets")
+async def get_facets(
+    request: Request,
+    response: Response,
+    domain: Optional[List[str]] = Query(None),
+    filters: Dict[str, List[str]] = Depends(facet_filters)
+):
+    """Count the items matching each facet value under the other facets' filters."""
+    
+    if domain:
+        filters = dict(filters, domain=domain)
+    
+    # Lazy import to avoid startup issues
+    from services.facets import catalog_facets, validate_filters
+    
+    error = validate_filters(filters)
+    if error:
+        raise HTTPException(
+            status_code=400,
+            detail=error
+        )
+    
+    try:
+        from services.data_loader import data_loader
+        
+        # Answer conditional requests before counting
+        etag = make_etag("facets", data_loader.current_version(), sorted(filters.items()))
+        if is_not_modified(request, etag):
+            return not_modified_response(etag)
+        
+        counts = await run_in_threadpool(catalog_facets.counts, filters)
+        response.headers.update(cache_headers(etag))
+        return {"filters": filters, **counts}
+        
+    except Exception as e:
+        app_logger.error("Error counting facets: {}", e)
+        raise HTTPException(
+            status_code=500,
+            detail="Error counting facets"
+        )
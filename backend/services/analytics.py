@@ -0,0 +1,92 @@
+"""Feedback analytics read from the daily rollup tables."""
+
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from sqlmodel import Session, func, select
+
+from models.feedback import FeedbackDomainDaily, FeedbackItemDaily
+
+
+def like_rate(likes: int, dislikes: int) -> Optional[float]:
+    """Get the share of votes that were likes."""
+    total = likes + dislikes
+    return round(likes / total, 4) if total else None
+
+
+def domain_daily(session: Session, start: date, end: date,
+                 domain: Optional[str] = None) -> List[Dict]:
+    """Get likes and dislikes per domain per day in a date range."""
+    query = select(FeedbackDomainDaily).where(
+        FeedbackDomainDaily.day >= start, FeedbackDomainDaily.day <= end
+    )
+    if domain:
+        query = query.where(FeedbackDomainDaily.domain == domain)
+    rows = session.exec(query.order_by(FeedbackDomainDaily.day, FeedbackDomainDaily.domain)).all()
+    return [
+        {"day": row.day.isoformat(), "domain": row.domain, "likes": row.likes, "dislikes": row.dislikes}
+        for row in rows
+    ]
+
+
+def domain_totals(daily: List[Dict]) -> List[Dict]:
+    """Sum a daily series per domain."""
+    totals: Dict[str, Dict] = {}
+    for row in daily:
+        total = totals.setdefault(row["domain"], {"domain": row["domain"], "likes": 0, "dislikes": 0})
+        total["likes"] += row["likes"]
+        total["dislikes"] += row["dislikes"]
+    for total in totals.values():
+        total["like_rate"] = like_rate(total["likes"], total["dislikes"])
+    return sorted(totals.values(), key=lambda x: x["domain"])
+
+
+def item_totals(session: Session, start: date, end: date,
+                domain: Optional[str] = None) -> List[Dict]:
+    """Get likes and dislikes per item over a date range, most liked first."""
+    likes = func.sum(FeedbackItemDaily.likes)
+    dislikes = func.sum(FeedbackItemDaily.dislikes)
+    query = select(FeedbackItemDaily.item_id, FeedbackItemDaily.domain, likes, dislikes).where(
+        FeedbackItemDaily.day >= start, FeedbackItemDaily.day <= end
+    )
+    if domain:
+        query = query.where(FeedbackItemDaily.domain == domain)
+    rows = session.exec(
+        query.group_by(FeedbackItemDaily.item_id, FeedbackItemDaily.domain)
+        .order_by(likes.desc(), dislikes, FeedbackItemDaily.item_id)
+    ).all()
+    return [
+        {"item_id": item_id, "domain": item_domain, "likes": item_likes, "dislikes": item_dislikes,
+         "like_rate": like_rate(item_likes, item_dislikes)}
+        for item_id, item_domain, item_likes, item_dislikes in rows
+    ]
+
+
+def get_analytics(session: Session, days: int, domain: Optional[str] = None,
+                  mood: Optional[str] = None, limit: int = 10,
+                  today: Optional[date] = None) -> Dict:
+    """Summarize feedback over the last ``days`` days from the rollups."""
+    # Rollup days are UTC dates
+    end = today or datetime.now(timezone.utc).date()
+    start = end - timedelta(days=days - 1)
+    
+    daily = domain_daily(session, start, end, domain)
+    top_items = item_totals(session, start, end, domain)
+    if mood:
+        # Mood is a catalog attribute, so filter the aggregated items by their tags
+        from services.data_loader import data_loader
+        catalog = data_loader.get_items_by_ids([item["item_id"] for item in top_items])
+        top_items = [
+            item for item in top_items
+            if mood in (catalog.get(item["item_id"], {}).get('mood_tags') or [])
+        ]
+    
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "domain": domain,
+        "mood": mood,
+        "domains": domain_totals(daily),
+        "daily": daily,
+        "top_items": top_items[:limit]
+    }
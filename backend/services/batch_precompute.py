@@ -0,0 +1,326 @@
+"""Offline batch precomputation of personalized playlists.
+
+Sessions with feedback in the last ``precompute_active_days`` days get a
+playlist for each of their likely requests: the ``precompute_moods_per_session``
+moods their liked items carry most, every time option, and the interests
+covering the domains they rated. Sessions are handed in chunks to worker
+processes that load the catalog and models once, replay each session's
+feedback into a profile of their own and generate its playlists without
+marking them seen. Each chunk's playlists are written to the
+``precomputedplaylist`` table in one transaction, keyed by session, mood,
+time, interests and limit, so ``/api/recommend`` looks one up by key and
+computes online when none is stored.
+
+Sessions that already have playlists for the current catalog version are
+skipped, so an interrupted run resumes with the chunk it was computing.
+New feedback drops a session's playlists, and each one is served once,
+unless the session has since been shown one of its items.
+
+Usage:
+    python -m services.batch_precompute
+    python -m services.batch_precompute --workers 4 --active-days 3
+"""
+
+import argparse
+import copy
+import json
+import multiprocessing
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from core.config import settings
+from core.logging import app_logger
+from core.metrics import DB_WRITE_LATENCY, record_cache
+
+# Interest that covers each domain, as the recommender maps them
+DOMAIN_INTERESTS = {"workout": "lifestyle", "recipe": "lifestyle", "course": "learning"}
+
+# A session's feedback rows: item ID, domain, action and epoch seconds
+SessionRows = Tuple[str, List[Tuple[str, str, str, float]]]
+
+# Generator of the worker process, created by its initializer
+_worker_generator = None
+
+
+def precomputed_key(user_session: str, mood: str, available_minutes: int,
+                    interests: List[str], limit: int) -> str:
+    """Get the key of a session's playlist for one request."""
+    return "|".join([user_session, mood, str(available_minutes),
+                     ",".join(sorted(set(interests))), str(limit)])
+
+
+def likely_interests(domains: List[str]) -> List[str]:
+    """Get the interests covering the domains a session rated, or all of them."""
+    wanted = {DOMAIN_INTERESTS[domain] for domain in domains if domain in DOMAIN_INTERESTS}
+    return [interest for interest in settings.interest_options if interest in wanted] or \
+        list(settings.interest_options)
+
+
+def likely_moods(liked_mood_tags: List[List[str]], count: int) -> List[str]:
+    """Rank moods by how many liked items carry them, ties in option order."""
+    votes = Counter(tag for tags in liked_mood_tags for tag in tags)
+    return sorted(settings.mood_options, key=lambda mood: -votes[mood])[:count]
+
+
+def active_sessions(since: datetime, db_engine=None) -> Dict[str, List[Tuple[str, str, str, float]]]:
+    """Get the feedback rows of each session active since a time, oldest first."""
+    from sqlmodel import Session, select
+    from models.feedback import Feedback, engine as feedback_engine
+    
+    with Session(db_engine or feedback_engine) as session:
+        rows = session.exec(
+            select(Feedback.user_session, Feedback.item_id, Feedback.domain,
+                   Feedback.action, Feedback.created_at)
+            .where(Feedback.user_session.is_not(None), Feedback.created_at >= since)
+            .order_by(Feedback.id)
+        ).all()
+    
+    sessions: Dict[str, List[Tuple[str, str, str, float]]] = {}
+    for user_session, item_id, domain, action, created_at in rows:
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        sessions.setdefault(user_session, []).append((item_id, domain, action, created_at.timestamp()))
+    return sessions
+
+
+def _to_builtin(value):
+    """Convert numpy scalars for JSON encoding."""
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"Cannot encode {type(value).__name__}")
+
+
+def batch_generator():
+    """Get a playlist generator sharing the loaded models, with its own profiles and paging store."""
+    from services.playlist import PlaylistGenerator
+    from services.ranked_lists import RankedListStore
+    from services.recommender import recommendation_engine
+    from services.session_profiles import SessionProfileStore
+    
+    recommendation_engine._ensure_initialized()
+    engine = copy.copy(recommendation_engine)
+    engine.session_profiles = SessionProfileStore()
+    return PlaylistGenerator(engine=engine, store=RankedListStore())
+
+
+def _init_worker():
+    """Load the catalog and models once per worker process."""
+    global _worker_generator
+    _worker_generator = batch_generator()
+
+
+def compute_sessions(sessions: List[SessionRows], limit: int, moods_per_session: int,
+                     generator=None) -> List[Dict]:
+    """Generate the playlists of a chunk of sessions, as rows to store."""
+    generator = generator or _worker_generator
+    engine = generator.recommendation_engine
+    loader = generator.data_loader
+    items = loader.get_items_by_ids(list({row[0] for _, rows in sessions for row in rows}))
+    
+    stored = []
+    for user_session, rows in sessions:
+        liked = []
+        for item_id, _, action, created_at in rows:
+            item = items.get(item_id)
+            if item is None:
+                continue
+            engine.session_profiles.record(user_session, list(item.get('tags_list') or []),
+                                           action, now=created_at)
+            if action == "like":
+                liked.append(list(item.get('mood_tags') or []))
+        
+        interests = likely_interests([row[1] for row in rows])
+        for mood in likely_moods(liked, moods_per_session):
+            for minutes in settings.available_time_options:
+                result = generator.generate_playlist(
+                    mood, minutes, interests, limit=limit,
+                    user_session=user_session, record_served=False
+                )
+                # Remaining candidates are paged from the serving process's store
+                cursor = result.pop("next_cursor", None)
+                page = generator.ranked_lists.page(cursor, settings.ranked_list_depth) if cursor else None
+                stored.append({
+                    "key": precomputed_key(user_session, mood, minutes, interests, limit),
+                    "user_session": user_session,
+                    "catalog_version": loader.version,
+                    "payload": json.dumps({"result": result, "remaining": page[0] if page else []},
+                                          default=_to_builtin)
+                })
+        generator.ranked_lists.clear()
+    return stored
+
+
+def _chunks(sessions: List[SessionRows], size: int) -> Iterator[List[SessionRows]]:
+    """Split sessions into chunks."""
+    for start in range(0, len(sessions), size):
+        yield sessions[start:start + size]
+
+
+def _store(rows: List[Dict], user_sessions: List[str], as_of: datetime, db_engine) -> int:
+    """Write a chunk's playlists in one transaction; returns the number written.
+    
+    Sessions with feedback newer than the run's start are left out, as the
+    feedback already dropped their playlists.
+    """
+    from sqlmodel import Session, select
+    from models.feedback import Feedback, PrecomputedPlaylist
+    
+    with Session(db_engine) as session:
+        stale = set(session.exec(
+            select(Feedback.user_session)
+            .where(Feedback.user_session.in_(user_sessions), Feedback.created_at > as_of)
+            .distinct()
+        ).all())
+        rows = [row for row in rows if row["user_session"] not in stale]
+        with DB_WRITE_LATENCY.time(operation="precompute_write"):
+            for row in rows:
+                session.merge(PrecomputedPlaylist(**row))
+            session.commit()
+    return len(rows)
+
+
+def precompute_playlists(active_days: Optional[int] = None, workers: Optional[int] = None,
+                         chunk_size: Optional[int] = None, limit: Optional[int] = None,
+                         now: Optional[datetime] = None, db_engine=None) -> Dict:
+    """Precompute the playlists of every recently active session not done yet."""
+    from sqlmodel import Session, delete, select, or_
+    from models.feedback import PrecomputedPlaylist, create_db_and_tables, engine as feedback_engine
+    from services.data_loader import data_loader
+    
+    start = time.perf_counter()
+    active_days = active_days if active_days is not None else settings.precompute_active_days
+    workers = workers if workers is not None else settings.precompute_workers
+    workers = workers or os.cpu_count() or 1
+    chunk_size = chunk_size or settings.precompute_chunk_size
+    limit = limit or settings.default_recommendation_limit
+    moods_per_session = settings.precompute_moods_per_session
+    as_of = now or datetime.now(timezone.utc)
+    since = as_of - timedelta(days=active_days)
+    
+    if db_engine is None:
+        create_db_and_tables()
+        db_engine = feedback_engine
+    data_loader.ensure_loaded()
+    version = data_loader.version
+    
+    with Session(db_engine) as session:
+        # Playlists of an older catalog or of sessions gone quiet are never served
+        session.exec(delete(PrecomputedPlaylist).where(or_(
+            PrecomputedPlaylist.catalog_version != version,
+            PrecomputedPlaylist.catalog_version.is_(None),
+            PrecomputedPlaylist.created_at < since
+        )))
+        session.commit()
+        done = set(session.exec(select(PrecomputedPlaylist.user_session).distinct()).all())
+    
+    sessions = active_sessions(since, db_engine)
+    pending = sorted((user_session, rows) for user_session, rows in sessions.items()
+                     if user_session not in done)
+    chunks = list(_chunks(pending, chunk_size))
+    
+    written = 0
+    finished = 0
+    pool = None
+    try:
+        if workers > 1 and len(chunks) > 1:
+            pool = ProcessPoolExecutor(max_workers=min(workers, len(chunks)),
+                                       mp_context=multiprocessing.get_context("spawn"),
+                                       initializer=_init_worker)
+            results = pool.map(compute_sessions, chunks, [limit] * len(chunks),
+                               [moods_per_session] * len(chunks))
+        else:
+            generator = batch_generator() if chunks else None
+            results = (compute_sessions(chunk, limit, moods_per_session, generator) for chunk in chunks)
+        
+        for chunk, rows in zip(chunks, results):
+            written += _store(rows, [user_session for user_session, _ in chunk], as_of, db_engine)
+            finished += len(chunk)
+            elapsed = time.perf_counter() - start
+            app_logger.info("Precomputed {} of {} sessions, {:.1f} playlists/s",
+                            finished, len(pending), written / elapsed if elapsed else 0.0)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    
+    duration = time.perf_counter() - start
+    result = {
+        "active_sessions": len(sessions),
+        "skipped_sessions": len(sessions) - len(pending),
+        "sessions": finished,
+        "playlists": written,
+        "workers": workers if pool is not None else 1,
+        "duration_seconds": round(duration, 4),
+        "playlists_per_second": round(written / duration, 2) if duration else 0.0
+    }
+    app_logger.info("Precomputed {playlists} playlists for {sessions} sessions "
+                    "({skipped_sessions} already done) at {playlists_per_second} playlists/s", **result)
+    return result
+
+
+def take_precomputed(user_session: str, mood: str, available_minutes: int,
+                     interests: List[str], limit: int, generator=None,
+                     db_engine=None) -> Optional[Dict]:
+    """Take a session's precomputed playlist for a request, or None if none is stored.
+    
+    The playlist is removed once taken. It is only served if the session has
+    not been shown any of its items since the batch ran; its items are then
+    marked seen, as an online one's would be, and its remaining candidates
+    get a fresh cursor.
+    """
+    from sqlmodel import Session
+    from models.feedback import PrecomputedPlaylist, engine as feedback_engine, ensure_tables
+    from services.seen_filter import item_hashes
+    
+    if generator is None:
+        from services.playlist import playlist_generator as generator
+    
+    key = precomputed_key(user_session, mood, available_minutes, interests, limit)
+    try:
+        if db_engine is None:
+            ensure_tables()
+        with Session(db_engine or feedback_engine) as session:
+            row = session.get(PrecomputedPlaylist, key)
+            if row is not None:
+                with DB_WRITE_LATENCY.time(operation="precompute_take"):
+                    session.delete(row)
+                    session.commit()
+    except Exception as e:
+        app_logger.error("Error reading precomputed playlist: {}", e)
+        row = None
+    
+    payload = None
+    if row is not None and row.catalog_version == generator.data_loader.version:
+        payload = json.loads(row.payload)
+        item_ids = [item['item_id'] for item in payload["result"]["playlist"]]
+        # Items shown online after the batch ran would be repeated
+        seen = generator.recommendation_engine.seen_filters.get(user_session)
+        if seen is not None and item_ids and seen.seen.contains(*item_hashes(item_ids)).any():
+            payload = None
+    record_cache("precomputed_playlist", payload is not None)
+    if payload is None:
+        return None
+    
+    result = payload["result"]
+    generator.recommendation_engine.seen_filters.record_served(user_session, item_ids)
+    result["next_cursor"] = generator.ranked_lists.put(payload["remaining"]) if payload["remaining"] else None
+    result["precomputed"] = True
+    return result
+
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Precompute playlists of recently active sessions")
+    parser.add_argument("--active-days", type=int, help="Days of feedback that make a session active")
+    parser.add_argument("--workers", type=int, help="Worker processes (0 uses one per CPU)")
+    parser.add_argument("--chunk-size", type=int, help="Sessions per worker task and commit")
+    args = parser.parse_args()
+    
+    print(precompute_playlists(args.active_days, args.workers, args.chunk_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,393 @@
+"""Memory-mapped catalog snapshots shared by every worker process.
+
+A publisher (``python -m services.catalog_store``) writes the processed
+catalog as flat NumPy arrays into a new snapshot directory, then swaps the
+``CURRENT`` pointer file to it. Workers memory-map the arrays read-only, so
+every process shares the same page-cache pages and attaching costs the same
+whatever the catalog size. Layout::
+
+    <root>/CURRENT                      name of the live snapshot
+    <root>/<snapshot>/meta.json         version, preprocessing version, domains, rows and columns
+    <root>/<snapshot>/<domain>/...      one or more .npy files per column
+    <root>/<snapshot>/<domain>/facets/  one bitmap array per facet
+
+Numeric columns are stored as-is. Strings are stored as one UTF-8 byte
+buffer plus offsets, and list columns as CSR indices into a vocabulary.
+Facet bitmaps are stored as one row of words per value, with the values in
+meta.json.
+"""
+
+import json
+import os
+import shutil
+import time
+from collections.abc import Mapping, Sequence
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from core.config import settings
+from core.logging import app_logger
+from services.data_loader import PREPROCESS_VERSION, DataLoader, summarize_catalog
+from services.facets import DomainFacets
+
+POINTER_FILE = "CURRENT"
+
+LIST_COLUMNS = ("tags_list", "mood_tags")
+
+
+def _save(path: str, array: np.ndarray):
+    """Write one array without pickling."""
+    np.save(path, np.ascontiguousarray(array), allow_pickle=False)
+
+
+def _encode_strings(values: List[str]):
+    """Encode strings as a UTF-8 buffer and an offsets array."""
+    encoded = [value.encode("utf-8") for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def _write_domain(df: pd.DataFrame, directory: str) -> Dict[str, str]:
+    """Write every column of a processed domain and return the column kinds."""
+    os.makedirs(directory)
+    columns = {}
+    for column in df.columns:
+        base = os.path.join(directory, column)
+        values = df[column]
+        if column in LIST_COLUMNS:
+            lists = [value if isinstance(value, list) else [] for value in values]
+            vocabulary = sorted({tag for tags in lists for tag in tags})
+            index = {tag: i for i, tag in enumerate(vocabulary)}
+            indptr = np.zeros(len(lists) + 1, dtype=np.int64)
+            np.cumsum([len(tags) for tags in lists], out=indptr[1:])
+            data, offsets = _encode_strings(vocabulary)
+            _save(base + ".vocab.npy", data)
+            _save(base + ".vocab_offsets.npy", offsets)
+            _save(base + ".indptr.npy", indptr)
+            _save(base + ".indices.npy", np.array(
+                [index[tag] for tags in lists for tag in tags], dtype=np.int32
+            ))
+            columns[column] = "list"
+        elif pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values):
+            _save(base + ".npy", values.to_numpy())
+            columns[column] = "number"
+        else:
+            nulls = values.isna().to_numpy()
+            data, offsets = _encode_strings(["" if null else str(value) for value, null in zip(values, nulls)])
+            _save(base + ".npy", data)
+            _save(base + ".offsets.npy", offsets)
+            if nulls.any():
+                _save(base + ".null.npy", nulls)
+            columns[column] = "string"
+    
+    # Sorted item IDs for binary-search lookups
+    order = np.argsort(df["item_id"].to_numpy(dtype=str), kind="stable")
+    _save(os.path.join(directory, "item_order.npy"), order.astype(np.int64))
+    _save(os.path.join(directory, "item_keys.npy"),
+          np.array([item_id.encode("utf-8") for item_id in df["item_id"].to_numpy()[order]]))
+    return columns
+
+
+def _write_facets(df: pd.DataFrame, directory: str) -> Dict[str, List[str]]:
+    """Write the facet bitmaps of a processed domain and return each facet's values."""
+    os.makedirs(directory)
+    facets = DomainFacets.from_frame(df)
+    for facet, (_, bitmaps) in facets.facets.items():
+        _save(os.path.join(directory, facet + ".npy"), bitmaps)
+    return {facet: values for facet, (values, _) in facets.facets.items()}
+
+
+def publish_snapshot(processed_data: Dict[str, pd.DataFrame], version: str,
+                     root: Optional[str] = None, keep: int = 2) -> str:
+    """Write a processed catalog as a new snapshot and make it current."""
+    root = root or settings.catalog_snapshot_dir
+    os.makedirs(root, exist_ok=True)
+    name = f"{version}-{time.time_ns()}"
+    staging = os.path.join(root, f".{name}.tmp")
+    
+    meta = {"version": version, "preprocess_version": PREPROCESS_VERSION, "domains": {},
+            "summary": summarize_catalog(processed_data)}
+    for domain, df in processed_data.items():
+        if df.empty:
+            continue
+        columns = _write_domain(df, os.path.join(staging, domain))
+        facets = _write_facets(df, os.path.join(staging, domain, "facets"))
+        meta["domains"][domain] = {"rows": len(df), "columns": columns, "facets": facets}
+    
+    os.makedirs(staging, exist_ok=True)
+    with open(os.path.join(staging, "meta.json"), "w") as f:
+        json.dump(meta, f)
+    os.rename(staging, os.path.join(root, name))
+    
+    # Swap the version pointer atomically; attached workers keep their mapping
+    pointer = os.path.join(root, POINTER_FILE)
+    with open(pointer + ".tmp", "w") as f:
+        f.write(name)
+    os.replace(pointer + ".tmp", pointer)
+    
+    _prune_snapshots(root, keep)
+    return name
+
+
+def _prune_snapshots(root: str, keep: int):
+    """Delete all but the newest ``keep`` snapshots.
+    
+    Workers still attached to a deleted snapshot keep reading it: the files
+    stay alive until their mappings are closed.
+    """
+    snapshots = sorted(
+        (entry for entry in os.listdir(root)
+         if os.path.isfile(os.path.join(root, entry, "meta.json"))),
+        key=lambda entry: int(entry.rsplit("-", 1)[-1])
+    )
+    for entry in snapshots[:-keep]:
+        shutil.rmtree(os.path.join(root, entry), ignore_errors=True)
+
+
+def current_snapshot_name(root: Optional[str] = None) -> Optional[str]:
+    """Get the name of the live snapshot, if one has been published."""
+    pointer = os.path.join(root or settings.catalog_snapshot_dir, POINTER_FILE)
+    try:
+        with open(pointer) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def attach_snapshot(root: Optional[str] = None) -> Optional["CatalogSnapshot"]:
+    """Memory-map the live snapshot, if one has been published."""
+    root = root or settings.catalog_snapshot_dir
+    name = current_snapshot_name(root)
+    if not name:
+        return None
+    return CatalogSnapshot(os.path.join(root, name))
+
+
+class StringColumn:
+    """Read-only view of an encoded string column."""
+    
+    def __init__(self, data: np.ndarray, offsets: np.ndarray, nulls: Optional[np.ndarray] = None):
+        """Initialize the column view."""
+        self.data = data
+        self.offsets = offsets
+        self.nulls = nulls
+    
+    def __len__(self) -> int:
+        """Get the number of values."""
+        return len(self.offsets) - 1
+    
+    def __getitem__(self, i: int) -> Optional[str]:
+        """Decode one value."""
+        if self.nulls is not None and self.nulls[i]:
+            return None
+        return self.data[self.offsets[i]:self.offsets[i + 1]].tobytes().decode("utf-8")
+    
+    def to_list(self) -> List[Optional[str]]:
+        """Decode every value."""
+        return [self[i] for i in range(len(self))]
+
+
+class ListColumn:
+    """Read-only view of a list column stored as CSR indices."""
+    
+    def __init__(self, vocabulary: List[str], indptr: np.ndarray, indices: np.ndarray):
+        """Initialize the column view."""
+        self.vocabulary = vocabulary
+        self.indptr = indptr
+        self.indices = indices
+    
+    def __len__(self) -> int:
+        """Get the number of values."""
+        return len(self.indptr) - 1
+    
+    def __getitem__(self, i: int) -> List[str]:
+        """Decode one list."""
+        vocabulary = self.vocabulary
+        return [vocabulary[j] for j in self.indices[self.indptr[i]:self.indptr[i + 1]].tolist()]
+    
+    def to_list(self) -> List[List[str]]:
+        """Decode every list."""
+        return [self[i] for i in range(len(self))]
+
+
+class DomainSnapshot:
+    """Memory-mapped columns of one domain."""
+    
+    def __init__(self, directory: str, rows: int, kinds: Dict[str, str],
+                 facets: Optional[Dict[str, List[str]]] = None):
+        """Attach the domain's column and facet files."""
+        self.rows = rows
+        self.columns = {}
+        for column, kind in kinds.items():
+            base = os.path.join(directory, column)
+            if kind == "list":
+                vocabulary = StringColumn(_map(base + ".vocab.npy"), _map(base + ".vocab_offsets.npy"))
+                self.columns[column] = ListColumn(
+                    vocabulary.to_list(), _map(base + ".indptr.npy"), _map(base + ".indices.npy")
+                )
+            elif kind == "string":
+                nulls = _map(base + ".null.npy") if os.path.exists(base + ".null.npy") else None
+                self.columns[column] = StringColumn(_map(base + ".npy"), _map(base + ".offsets.npy"), nulls)
+            else:
+                self.columns[column] = _map(base + ".npy")
+        self.item_order = _map(os.path.join(directory, "item_order.npy"))
+        self.item_keys = _map(os.path.join(directory, "item_keys.npy"))
+        
+        # Snapshots published before facets existed have none
+        self.facets = None
+        if facets is not None:
+            self.facets = DomainFacets(rows, {
+                facet: (values, _map(os.path.join(directory, "facets", facet + ".npy")))
+                for facet, values in facets.items()
+            })
+    
+    def record(self, i: int) -> Dict:
+        """Get one row as a dictionary of plain Python values."""
+        return {
+            column: values[i].item() if isinstance(values, np.ndarray) else values[i]
+            for column, values in self.columns.items()
+        }
+    
+    def find(self, item_id: str) -> Optional[int]:
+        """Get the row index of an item ID."""
+        key = item_id.encode("utf-8")
+        position = int(np.searchsorted(self.item_keys, key))
+        if position < len(self.item_keys) and self.item_keys[position] == key:
+            return int(self.item_order[position])
+        return None
+    
+    def to_frame(self) -> pd.DataFrame:
+        """Materialize the domain as a DataFrame."""
+        return pd.DataFrame({
+            column: values if isinstance(values, np.ndarray) else values.to_list()
+            for column, values in self.columns.items()
+        })
+
+
+def _map(path: str) -> np.ndarray:
+    """Memory-map one array read-only."""
+    return np.load(path, mmap_mode="r", allow_pickle=False)
+
+
+class FeatureView(Sequence):
+    """Scoring features of one domain, built on access from the shared arrays.
+    
+    Stands in for the engine's per-domain list of feature dictionaries, so
+    workers do not each hold a copy of them.
+    """
+    
+    def __init__(self, domain: DomainSnapshot, start: int = 0, stop: Optional[int] = None):
+        """Initialize a view of rows ``start`` to ``stop``."""
+        self.domain = domain
+        self.start = start
+        self.stop = domain.rows if stop is None else stop
+        columns = domain.columns
+        self.item_ids = columns["item_id"]
+        self.tags = columns.get("tags_list")
+        self.mood_tags = columns.get("mood_tags")
+        self.durations = columns["duration_min"]
+        self.difficulties = columns.get("difficulty")
+        self.domain_names = columns["domain"]
+    
+    def __len__(self) -> int:
+        """Get the number of items."""
+        return self.stop - self.start
+    
+    def __iter__(self):
+        """Iterate over the features of every item."""
+        for i in range(len(self)):
+            yield self[i]
+    
+    def __getitem__(self, i: int) -> Dict:
+        """Get the scoring features of one item."""
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        i += self.start
+        return {
+            'item_id': self.item_ids[i],
+            'tags': self.tags[i] if self.tags is not None else [],
+            'mood_tags': self.mood_tags[i] if self.mood_tags is not None else [],
+            'duration': self.durations[i].item(),
+            'difficulty': (self.difficulties[i] if self.difficulties is not None else None) or 'intermediate',
+            'domain': self.domain_names[i]
+        }
+
+
+class CatalogSnapshot:
+    """A published catalog snapshot attached read-only."""
+    
+    def __init__(self, path: str):
+        """Attach a snapshot directory."""
+        self.path = path
+        self.name = os.path.basename(path)
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        self.version = meta["version"]
+        self.preprocess_version = meta.get("preprocess_version")
+        self.summary = meta.get("summary")
+        self.domains = {
+            domain: DomainSnapshot(os.path.join(path, domain), info["rows"], info["columns"],
+                                   info.get("facets"))
+            for domain, info in meta["domains"].items()
+        }
+    
+    def get_item(self, item_id: str) -> Optional[Dict]:
+        """Get an item by ID without materializing any DataFrame."""
+        for domain in self.domains.values():
+            row = domain.find(item_id)
+            if row is not None:
+                return domain.record(row)
+        return None
+    
+    def item_features(self, domain: str, start: int = 0, stop: Optional[int] = None) -> FeatureView:
+        """Get the scoring features of a domain, or of a range of its rows."""
+        return FeatureView(self.domains[domain], start, stop)
+    
+    def to_frame(self, domain: str) -> pd.DataFrame:
+        """Materialize a domain as a DataFrame."""
+        return self.domains[domain].to_frame()
+
+
+class SnapshotFrames(Mapping):
+    """Domain DataFrames of a snapshot, materialized on first access.
+    
+    Requests served from the shared arrays never build them; only the code
+    paths that need whole DataFrames pay for a per-process copy.
+    """
+    
+    def __init__(self, snapshot: CatalogSnapshot):
+        """Initialize the mapping."""
+        self.snapshot = snapshot
+        self.frames: Dict[str, pd.DataFrame] = {}
+    
+    def __getitem__(self, domain: str) -> pd.DataFrame:
+        """Get the DataFrame of a domain."""
+        if domain not in self.frames:
+            if domain not in self.snapshot.domains:
+                raise KeyError(domain)
+            self.frames[domain] = self.snapshot.to_frame(domain)
+        return self.frames[domain]
+    
+    def __iter__(self):
+        """Iterate over domain names."""
+        return iter(self.snapshot.domains)
+    
+    def __len__(self) -> int:
+        """Get the number of domains."""
+        return len(self.snapshot.domains)
+
+
+def main():
+    """Publish the catalog in ``settings.data_dir`` as the current snapshot."""
+    loader = DataLoader(autoload=False)
+    loader._read_data_files()
+    loader._preprocess_data()
+    root = settings.catalog_snapshot_dir or os.path.join(settings.data_dir, "snapshots")
+    name = publish_snapshot(loader.processed_data, loader.version, root)
+    app_logger.info("Published catalog snapshot {} to {}", name, root)
+
+
+if __name__ == "__main__":
+    main()
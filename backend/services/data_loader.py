@@ -1,50 +1,316 @@
 """Data loading and preprocessing service."""
 
+import hashlib
 import os
+import sys
+import threading
+import time
+import numpy as np
 import pandas as pd
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from core.config import settings
 from core.logging import app_logger
+from core.tracing import span, traced
+
+# Bumped whenever preprocessing changes what it produces, so that content
+# model artifacts and catalog snapshots of an older version go stale
+PREPROCESS_VERSION = 2
+
+
+def _tag_counts(values: pd.Series) -> Dict[str, int]:
+    """Count tags across a column of tag lists, most frequent first."""
+    counts = values.explode().dropna().value_counts()
+    return dict(sorted(((str(tag), int(count)) for tag, count in counts.items()),
+                       key=lambda item: (-item[1], item[0])))
+
+
+def summarize_catalog(processed_data: Dict[str, pd.DataFrame]) -> Dict:
+    """Summarize a processed catalog: counts, moods, durations and tag histograms."""
+    summary = {
+        "total_items": 0,
+        "domains": {},
+        "moods": [],
+        "duration_range": {"min": 0, "max": 0},
+        "duration_ranges": {},
+        "mood_histogram": {},
+        "tag_histogram": {}
+    }
+    
+    for domain, df in processed_data.items():
+        summary["domains"][domain] = len(df)
+        summary["total_items"] += len(df)
+        if df.empty:
+            continue
+        
+        if 'mood_tags' in df.columns:
+            summary["mood_histogram"][domain] = _tag_counts(df['mood_tags'])
+        if 'tags_list' in df.columns:
+            summary["tag_histogram"][domain] = _tag_counts(df['tags_list'])
+        if 'duration_min' in df.columns:
+            summary["duration_ranges"][domain] = {
+                "min": int(df['duration_min'].min()),
+                "max": int(df['duration_min'].max())
+            }
+    
+    summary["moods"] = sorted({mood for counts in summary["mood_histogram"].values() for mood in counts})
+    ranges = summary["duration_ranges"].values()
+    if ranges:
+        summary["duration_range"] = {
+            "min": min(r["min"] for r in ranges),
+            "max": max(r["max"] for r in ranges)
+        }
+    
+    return summary
+
+
+# Explicit dtypes for the catalog files; low-cardinality text is categorical
+CATALOG_DTYPES = {
+    'title': 'str',
+    'description': 'str',
+    'image': 'str',
+    'ingredients': 'str',
+    'tags': 'str',
+    'mood_tag': 'category',
+    'difficulty': 'category',
+    'type': 'category',
+    'topic': 'category'
+}
+
+# Comma-separated text columns and the tag list columns parsed from them
+TAG_COLUMNS = {'tags': 'tags_list', 'mood_tag': 'mood_tags'}
+
+# Domain-specific names of the duration column
+DURATION_ALIASES = ('cook_time_min',)
+
+
+class TagColumn:
+    """Tag lists of one column as interned codes in flat arrays.
+    
+    Row ``i`` holds ``vocabulary[j]`` for each ``j`` in
+    ``indices[indptr[i]:indptr[i + 1]]``. ``lists`` holds the same rows as
+    Python lists for DataFrame consumers; rows with the same source text
+    share one list, and every tag string is interned.
+    """
+    
+    def __init__(self, vocabulary: List[str], indptr: np.ndarray, indices: np.ndarray,
+                 lists: np.ndarray):
+        """Initialize the column."""
+        self.vocabulary = vocabulary
+        self.indptr = indptr
+        self.indices = indices
+        self.lists = lists
+    
+    def __len__(self) -> int:
+        """Get the number of rows."""
+        return len(self.indptr) - 1
+    
+    def nbytes(self) -> int:
+        """Get the size of the flat arrays and vocabulary."""
+        return (self.indptr.nbytes + self.indices.nbytes
+                + sum(sys.getsizeof(tag) for tag in self.vocabulary))
+
+
+def encode_tags(values: pd.Series) -> TagColumn:
+    """Parse comma-separated tags into a tag column, parsing each distinct text once."""
+    texts, uniques = pd.factorize(values.astype(object).where(values.notna(), ''), sort=False)
+    parsed = [[sys.intern(tag.strip().lower()) for tag in str(text).split(',') if tag.strip()]
+              for text in uniques]
+    vocabulary = sorted({tag for tags in parsed for tag in tags})
+    index = {tag: i for i, tag in enumerate(vocabulary)}
+    
+    # Codes of each distinct text, gathered into one row per item
+    unique_lengths = np.array([len(tags) for tags in parsed], dtype=np.int64)
+    unique_starts = np.zeros(len(parsed), dtype=np.int64)
+    np.cumsum(unique_lengths[:-1], out=unique_starts[1:])
+    unique_indices = np.array([index[tag] for tags in parsed for tag in tags], dtype=np.int32)
+    lengths = unique_lengths[texts]
+    indptr = np.zeros(len(texts) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=indptr[1:])
+    positions = np.repeat(unique_starts[texts] - indptr[:-1], lengths) + np.arange(indptr[-1])
+    
+    shared = np.empty(len(parsed), dtype=object)
+    for i, tags in enumerate(parsed):
+        shared[i] = tags
+    return TagColumn(vocabulary, indptr, unique_indices[positions], shared[texts])
+
+
+def preprocess_domain(df: pd.DataFrame, domain: str) -> Tuple[pd.DataFrame, Dict[str, TagColumn]]:
+    """Preprocess raw catalog rows of a domain, also returning its tag columns."""
+    # Shallow copy: unchanged columns stay shared with the raw frame
+    processed_df = df.copy(deep=False)
+    
+    # Map domain-specific duration columns (recipes' cook_time_min)
+    if 'duration_min' not in processed_df.columns:
+        for alias in DURATION_ALIASES:
+            if alias in processed_df.columns:
+                processed_df = processed_df.rename(columns={alias: 'duration_min'})
+                break
+    
+    # Ensure required columns exist
+    required_columns = ['id', 'title', 'duration_min', 'mood_tag', 'tags']
+    for col in required_columns:
+        if col not in processed_df.columns:
+            if col == 'duration_min':
+                app_logger.warning(f"No duration column for {domain}, defaulting to 30 minutes")
+                processed_df[col] = 30  # default duration
+            elif col == 'mood_tag':
+                processed_df[col] = 'happy'  # default mood
+            elif col == 'tags':
+                processed_df[col] = ''  # empty tags
+            else:
+                processed_df[col] = f"Unknown {col}"
+    
+    # Parse tag text into interned codes; the list columns share their rows
+    tag_columns = {}
+    for source, column in TAG_COLUMNS.items():
+        tag_columns[column] = encode_tags(processed_df[source])
+        processed_df[column] = pd.Series(tag_columns[column].lists, index=processed_df.index,
+                                         dtype=object)
+    
+    # Ensure numeric columns, as integers when every duration is whole
+    durations = pd.to_numeric(processed_df['duration_min'], errors='coerce').fillna(30)
+    if (durations % 1 == 0).all():
+        durations = durations.astype(np.int32)
+    processed_df['duration_min'] = durations
+    
+    # Add domain identifier
+    domain_name = domain.rstrip('s')  # workouts -> workout
+    processed_df['domain'] = pd.Categorical.from_codes(
+        np.zeros(len(processed_df), dtype=np.int8), categories=[domain_name]
+    )
+    
+    # Create unique item IDs
+    processed_df['item_id'] = (domain_name + '_') + processed_df['id'].astype(str)
+    
+    return processed_df, tag_columns
+
+
+def preprocess_frame(df: pd.DataFrame, domain: str) -> pd.DataFrame:
+    """Preprocess raw catalog rows of a domain for recommendations."""
+    return preprocess_domain(df, domain)[0]
+
+
+def read_catalog_file(path: str) -> pd.DataFrame:
+    """Read a catalog CSV file with the catalog dtypes."""
+    return pd.read_csv(path, dtype=CATALOG_DTYPES)
+
+
+def frame_memory(df: pd.DataFrame) -> Dict[str, int]:
+    """Measure the bytes held by each column, counting shared objects once."""
+    seen = set()
+    
+    def object_bytes(values) -> int:
+        total = 0
+        for value in values:
+            if id(value) in seen:
+                continue
+            seen.add(id(value))
+            total += sys.getsizeof(value)
+            if isinstance(value, list):
+                total += object_bytes(value)
+        return total
+    
+    memory = {}
+    for column in df.columns:
+        values = df[column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            memory[column] = values.cat.codes.nbytes + object_bytes(values.cat.categories)
+        elif values.dtype == object or pd.api.types.is_string_dtype(values.dtype):
+            memory[column] = 8 * len(values) + object_bytes(values.tolist())
+        else:
+            memory[column] = int(values.memory_usage(index=False))
+    return memory
 
 
 class DataLoader:
     """Loads and preprocesses CSV data for recommendations."""
     
-    def __init__(self):
+    def __init__(self, data_dir: Optional[str] = None, autoload: bool = True):
         """Initialize data loader."""
+        self.data_dir = data_dir or settings.data_dir
         self.data_cache = {}
         self.processed_data = {}
-        self._load_all_data()
+        self.tag_columns: Dict[str, Dict[str, TagColumn]] = {}
+        self.version = self._compute_version()
+        self.snapshot = None
+        self._summary = None
+        self._snapshot_checked = 0.0
+        self._loaded = False
+        self._load_lock = threading.Lock()
+        if autoload:
+            self._load_all_data()
+    
+    def ensure_loaded(self):
+        """Load the data files on first use."""
+        if self._loaded:
+            if self.snapshot is not None:
+                self._check_snapshot()
+            return
+        with self._load_lock:
+            if not self._loaded:
+                self._load_all_data()
     
+    def current_version(self) -> str:
+        """Get the version of the catalog being served, loading it first."""
+        self.ensure_loaded()
+        return self.version
+    
+    def _attach_snapshot(self) -> bool:
+        """Attach the published shared catalog snapshot, if there is one."""
+        from services.catalog_store import SnapshotFrames, attach_snapshot
+        
+        snapshot = attach_snapshot(settings.catalog_snapshot_dir)
+        if snapshot is None:
+            app_logger.warning(f"No catalog snapshot in {settings.catalog_snapshot_dir}, reading CSV files")
+            return False
+        if snapshot.preprocess_version != PREPROCESS_VERSION:
+            app_logger.warning(f"Catalog snapshot {snapshot.name} was preprocessed by an older version; "
+                               f"republish it (python -m services.catalog_store)")
+            return False
+        
+        self.snapshot = snapshot
+        self.version = snapshot.version
+        self.data_cache = {}
+        self.processed_data = SnapshotFrames(snapshot)
+        self._summary = None
+        self._snapshot_checked = time.monotonic()
+        app_logger.info(f"Attached catalog snapshot {snapshot.name}")
+        return True
+    
+    def _check_snapshot(self):
+        """Switch to a newly published snapshot, checking at most every few seconds."""
+        now = time.monotonic()
+        if now - self._snapshot_checked < settings.catalog_snapshot_check_interval:
+            return
+        self._snapshot_checked = now
+        
+        from services.catalog_store import current_snapshot_name
+        name = current_snapshot_name(settings.catalog_snapshot_dir)
+        if name and name != self.snapshot.name:
+            with self._load_lock:
+                if name != self.snapshot.name:
+                    self._attach_snapshot()
+    
+    def _compute_version(self) -> str:
+        """Compute the catalog snapshot version from the source files."""
+        digest = hashlib.sha1(f"preprocess:{PREPROCESS_VERSION};".encode())
+        for filename in [settings.workouts_file, settings.recipes_file, settings.courses_file]:
+            path = os.path.join(self.data_dir, filename)
+            if os.path.exists(path):
+                stat = os.stat(path)
+                digest.update(f"{filename}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+        return digest.hexdigest()[:16]
+    
+    @traced()
     def _load_all_data(self):
-        """Load all CSV data files."""
+        """Load all CSV data files, or attach the shared snapshot if configured."""
+        self._summary = None
         try:
-            # Load workouts
-            workouts_path = os.path.join(settings.data_dir, settings.workouts_file)
-            if os.path.exists(workouts_path):
-                self.data_cache['workouts'] = pd.read_csv(workouts_path)
-                app_logger.info(f"Loaded {len(self.data_cache['workouts'])} workouts")
-            else:
-                app_logger.warning(f"Workouts file not found: {workouts_path}")
-                self.data_cache['workouts'] = pd.DataFrame()
+            if settings.catalog_snapshot_dir and self._attach_snapshot():
+                return
             
-            # Load recipes
-            recipes_path = os.path.join(settings.data_dir, settings.recipes_file)
-            if os.path.exists(recipes_path):
-                self.data_cache['recipes'] = pd.read_csv(recipes_path)
-                app_logger.info(f"Loaded {len(self.data_cache['recipes'])} recipes")
-            else:
-                app_logger.warning(f"Recipes file not found: {recipes_path}")
-                self.data_cache['recipes'] = pd.DataFrame()
-            
-            # Load courses
-            courses_path = os.path.join(settings.data_dir, settings.courses_file)
-            if os.path.exists(courses_path):
-                self.data_cache['courses'] = pd.read_csv(courses_path)
-                app_logger.info(f"Loaded {len(self.data_cache['courses'])} courses")
-            else:
-                app_logger.warning(f"Courses file not found: {courses_path}")
-                self.data_cache['courses'] = pd.DataFrame()
+            self.version = self._compute_version()
+            self._read_data_files()
             
             # Process data
             self._preprocess_data()
@@ -55,6 +321,26 @@ class DataLoader:
             for domain in ['workouts', 'recipes', 'courses']:
                 if domain not in self.data_cache:
                     self.data_cache[domain] = pd.DataFrame()
+        finally:
+            self._loaded = True
+    
+    def source_paths(self) -> Dict[str, str]:
+        """Get the CSV file of each domain."""
+        return {
+            'workouts': os.path.join(self.data_dir, settings.workouts_file),
+            'recipes': os.path.join(self.data_dir, settings.recipes_file),
+            'courses': os.path.join(self.data_dir, settings.courses_file)
+        }
+    
+    def _read_data_files(self):
+        """Read the raw CSV files into the data cache."""
+        for domain, path in self.source_paths().items():
+            if os.path.exists(path):
+                self.data_cache[domain] = read_catalog_file(path)
+                app_logger.info(f"Loaded {len(self.data_cache[domain])} {domain}")
+            else:
+                app_logger.warning(f"{domain.capitalize()} file not found: {path}")
+                self.data_cache[domain] = pd.DataFrame()
     
     def _preprocess_data(self):
         """Preprocess loaded data for recommendations."""
@@ -63,68 +349,87 @@ class DataLoader:
                 self.processed_data[domain] = df
                 continue
             
-            processed_df = df.copy()
-            
-            # Ensure required columns exist
-            required_columns = ['id', 'title', 'duration_min', 'mood_tag', 'tags']
-            for col in required_columns:
-                if col not in processed_df.columns:
-                    if col == 'duration_min':
-                        processed_df[col] = 30  # default duration
-                    elif col == 'mood_tag':
-                        processed_df[col] = 'happy'  # default mood
-                    elif col == 'tags':
-                        processed_df[col] = ''  # empty tags
-                    else:
-                        processed_df[col] = f"Unknown {col}"
-            
-            # Process tags - convert string to list
-            if 'tags' in processed_df.columns:
-                processed_df['tags_list'] = processed_df['tags'].apply(
-                    lambda x: [tag.strip().lower() for tag in str(x).split(',') if tag.strip()]
-                )
-            
-            # Process mood tags
-            if 'mood_tag' in processed_df.columns:
-                processed_df['mood_tags'] = processed_df['mood_tag'].apply(
-                    lambda x: [tag.strip().lower() for tag in str(x).split(',') if tag.strip()]
-                )
-            
-            # Ensure numeric columns
-            if 'duration_min' in processed_df.columns:
-                processed_df['duration_min'] = pd.to_numeric(processed_df['duration_min'], errors='coerce').fillna(30)
-            
-            # Add domain identifier
-            processed_df['domain'] = domain.rstrip('s')  # workouts -> workout
-            
-            # Create unique item IDs
-            processed_df['item_id'] = processed_df.apply(
-                lambda row: f"{row['domain']}_{row['id']}", axis=1
-            )
-            
+            processed_df, self.tag_columns[domain] = preprocess_domain(df, domain)
             self.processed_data[domain] = processed_df
             app_logger.info(f"Preprocessed {len(processed_df)} {domain}")
     
+    def memory_report(self) -> Dict[str, Dict]:
+        """Report the memory held by each processed domain, per column and per item."""
+        self.ensure_loaded()
+        report = {}
+        for domain, df in self.processed_data.items():
+            if df.empty:
+                continue
+            columns = frame_memory(df)
+            tag_arrays = sum(column.nbytes() for column in self.tag_columns.get(domain, {}).values())
+            total = sum(columns.values()) + tag_arrays
+            report[domain] = {
+                "rows": len(df),
+                "total_bytes": total,
+                "bytes_per_item": round(total / len(df), 1),
+                "tag_array_bytes": tag_arrays,
+                "columns": columns
+            }
+        return report
+    
     def get_data(self, domain: str) -> pd.DataFrame:
         """Get processed data for a domain."""
+        self.ensure_loaded()
         return self.processed_data.get(domain, pd.DataFrame())
     
     def get_all_data(self) -> Dict[str, pd.DataFrame]:
         """Get all processed data."""
+        self.ensure_loaded()
         return self.processed_data
     
     def get_item_by_id(self, item_id: str) -> Optional[Dict]:
         """Get a specific item by ID."""
-        for domain, df in self.processed_data.items():
-            if df.empty:
-                continue
+        self.ensure_loaded()
+        with span("DataLoader.get_item_by_id", item_id=item_id):
+            if self.snapshot is not None:
+                return self.snapshot.get_item(item_id)
             
-            item = df[df['item_id'] == item_id]
-            if not item.empty:
-                return item.iloc[0].to_dict()
+            for domain, df in self.processed_data.items():
+                if df.empty:
+                    continue
+                
+                item = df[df['item_id'] == item_id]
+                if not item.empty:
+                    return item.iloc[0].to_dict()
+            
+            return None
+    
+    @traced()
+    def get_items_by_ids(self, item_ids: List[str]) -> Dict[str, Dict]:
+        """Get several items by ID in one pass over each domain."""
+        self.ensure_loaded()
+        if self.snapshot is not None:
+            items = {item_id: self.snapshot.get_item(item_id) for item_id in item_ids}
+            return {item_id: item for item_id, item in items.items() if item is not None}
         
-        return None
+        items = {}
+        for df in self.processed_data.values():
+            if df.empty:
+                continue
+            for item in df[df['item_id'].isin(item_ids)].to_dict('records'):
+                items[item['item_id']] = item
+        return items
+    
+    def get_column(self, domain: str, column: str) -> np.ndarray:
+        """Get one numeric column of a domain as an array."""
+        self.ensure_loaded()
+        if self.snapshot is not None:
+            return np.asarray(self.snapshot.domains[domain].columns[column])
+        return self.get_data(domain)[column].to_numpy()
     
+    def get_items_at(self, domain: str, rows: List[int]) -> List[Dict]:
+        """Get items of a domain by row position, in the order given."""
+        self.ensure_loaded()
+        if self.snapshot is not None:
+            return [self.snapshot.domains[domain].record(row) for row in rows]
+        return self.get_data(domain).iloc[rows].to_dict('records')
+    
+    @traced()
     def get_items_by_domain(self, domain: str, limit: Optional[int] = None) -> List[Dict]:
         """Get items from a specific domain."""
         df = self.get_data(domain)
@@ -136,9 +441,11 @@ class DataLoader:
         
         return df.to_dict('records')
     
+    @traced()
     def get_items_by_mood(self, mood: str, domain: Optional[str] = None) -> List[Dict]:
         """Get items that match a specific mood."""
         items = []
+        self.ensure_loaded()
         
         domains_to_search = [domain] if domain else self.processed_data.keys()
         
@@ -156,10 +463,12 @@ class DataLoader:
         
         return items
     
+    @traced()
     def get_items_by_duration(self, min_duration: int, max_duration: int, 
                             domain: Optional[str] = None) -> List[Dict]:
         """Get items within a duration range."""
         items = []
+        self.ensure_loaded()
         
         domains_to_search = [domain] if domain else self.processed_data.keys()
         
@@ -178,50 +487,26 @@ class DataLoader:
         
         return items
     
+    @traced()
     def get_metadata(self) -> Dict:
-        """Get metadata about the loaded data."""
-        metadata = {
-            "total_items": 0,
-            "domains": {},
-            "moods": set(),
-            "duration_range": {"min": float('inf'), "max": 0}
-        }
-        
-        for domain, df in self.processed_data.items():
-            if df.empty:
-                metadata["domains"][domain] = 0
-                continue
-            
-            count = len(df)
-            metadata["domains"][domain] = count
-            metadata["total_items"] += count
-            
-            # Collect moods
-            if 'mood_tags' in df.columns:
-                for mood_list in df['mood_tags']:
-                    if isinstance(mood_list, list):
-                        metadata["moods"].update(mood_list)
-            
-            # Update duration range
-            if 'duration_min' in df.columns:
-                min_dur = df['duration_min'].min()
-                max_dur = df['duration_min'].max()
-                metadata["duration_range"]["min"] = min(metadata["duration_range"]["min"], min_dur)
-                metadata["duration_range"]["max"] = max(metadata["duration_range"]["max"], max_dur)
-        
-        metadata["moods"] = list(metadata["moods"])
-        
-        if metadata["duration_range"]["min"] == float('inf'):
-            metadata["duration_range"] = {"min": 0, "max": 0}
-        
-        return metadata
+        """Get the catalog summary, computed once per catalog version."""
+        self.ensure_loaded()
+        summary = self._summary
+        if summary is None:
+            if self.snapshot is not None and self.snapshot.summary:
+                summary = self.snapshot.summary
+            else:
+                summary = summarize_catalog(self.processed_data)
+            self._summary = summary
+        return summary
     
     def reload_data(self):
         """Reload all data from files."""
-        self.data_cache.clear()
-        self.processed_data.clear()
+        self.data_cache = {}
+        self.processed_data = {}
+        self.snapshot = None
         self._load_all_data()
 
 
-# Global instance
-data_loader = DataLoader()
+# Global instance (files are read on first use or at application startup)
+data_loader = DataLoader(autoload=False)
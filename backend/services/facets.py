@@ -0,0 +1,256 @@
+"""Bitmap indexes over catalog facets.
+
+For each facet value a domain keeps a bitmap with one bit per item row,
+packed into 64-bit words. A filter is the union of its values' bitmaps and
+several filters are their intersection; counts are popcounts. Filtering
+never touches the item rows, so its cost is the number of words, 1/64th of
+the rows, whatever the filter. Bitmaps are published with the shared
+catalog snapshot and built from the loaded catalog otherwise.
+
+Filters map a facet to the values it accepts, e.g.
+``{"difficulty": ["beginner"], "mood_tag": ["calm", "tired"]}``.
+"""
+
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from core.config import settings
+from core.logging import app_logger
+from core.metrics import MODEL_BUILD_DURATION
+
+DOMAINS = ["workout", "recipe", "course"]
+
+# Facets held per domain; "domain" itself selects which domains take part
+LABEL_FACETS = ("difficulty", "type", "topic")
+FACETS = ("domain", "difficulty", "duration", "mood_tag", "type", "topic")
+
+Bitmaps = Tuple[List[str], np.ndarray]
+
+# Set bits of every byte value, for numpy releases without np.bitwise_count
+BYTE_POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint8)
+
+
+def duration_buckets() -> List[str]:
+    """Get the duration bucket labels, split at the available time options."""
+    bounds = sorted(settings.available_time_options)
+    labels = [f"{low + 1 if low else 0}-{high}" for low, high in zip([0] + bounds, bounds)]
+    return labels + [f"{bounds[-1] + 1}+"]
+
+
+def buckets_within(minutes: int) -> List[str]:
+    """Get the duration buckets of items taking at most ``minutes``, a time option."""
+    bounds = sorted(settings.available_time_options)
+    return duration_buckets()[:bounds.index(minutes) + 1]
+
+
+def validate_filters(filters: Optional[Dict[str, List[str]]]) -> Optional[str]:
+    """Get why filters are invalid, or None if they are valid."""
+    for facet, values in (filters or {}).items():
+        if facet not in FACETS:
+            return f"Unknown facet {facet!r}. Must be one of: {list(FACETS)}"
+        if facet == "domain" and not set(values) <= set(DOMAINS):
+            return f"Domain filter must be from: {DOMAINS}"
+        if facet == "duration" and not set(values) <= set(duration_buckets()):
+            return f"Duration filter must be from: {duration_buckets()}"
+    return None
+
+
+def popcount(words: np.ndarray) -> np.ndarray:
+    """Count the set bits of each 64-bit word."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words)
+    return BYTE_POPCOUNT[words.view(np.uint8)].reshape(words.shape + (8,)).sum(axis=-1)
+
+
+def _pack(masks: np.ndarray) -> np.ndarray:
+    """Pack rows of boolean masks into rows of 64-bit words."""
+    rows = masks.shape[-1]
+    padded = np.zeros(masks.shape[:-1] + (-(-rows // 64) * 64,), dtype=bool)
+    padded[..., :rows] = masks
+    return np.packbits(padded, axis=-1, bitorder="little").view("<u8")
+
+
+def label_bitmaps(values: Sequence) -> Bitmaps:
+    """Build a bitmap per distinct value of a single-valued column."""
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object), sort=True)
+    labels = [str(value) for value in uniques]
+    return labels, _pack(codes[None, :] == np.arange(len(labels))[:, None])
+
+
+def list_bitmaps(indptr: np.ndarray, indices: np.ndarray, vocabulary: List[str]) -> Bitmaps:
+    """Build a bitmap per tag of a list column in CSR form."""
+    rows = len(indptr) - 1
+    masks = np.zeros((len(vocabulary), rows), dtype=bool)
+    masks[np.asarray(indices), np.repeat(np.arange(rows), np.diff(indptr))] = True
+    return list(vocabulary), _pack(masks)
+
+
+def duration_bitmaps(durations: np.ndarray) -> Bitmaps:
+    """Build a bitmap per duration bucket."""
+    buckets = np.searchsorted(sorted(settings.available_time_options), np.asarray(durations), side="left")
+    labels = duration_buckets()
+    return labels, _pack(buckets[None, :] == np.arange(len(labels))[:, None])
+
+
+class DomainFacets:
+    """Facet bitmaps of one domain's rows."""
+    
+    def __init__(self, rows: int, facets: Dict[str, Bitmaps]):
+        """Initialize from each facet's values and their bitmaps."""
+        self.rows = rows
+        self.facets = facets
+        self.positions = {facet: {value: i for i, value in enumerate(values)}
+                          for facet, (values, _) in facets.items()}
+        self.words = -(-rows // 64)
+    
+    @classmethod
+    def from_columns(cls, rows: int, labels: Dict[str, Sequence], durations: np.ndarray,
+                     mood_tags: Optional[Tuple[np.ndarray, np.ndarray, List[str]]]) -> "DomainFacets":
+        """Build from label columns, durations and the mood tags in CSR form."""
+        facets = {facet: label_bitmaps(values) for facet, values in labels.items()}
+        facets["duration"] = duration_bitmaps(durations)
+        if mood_tags is not None:
+            facets["mood_tag"] = list_bitmaps(*mood_tags)
+        return cls(rows, facets)
+    
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, tag_columns: Optional[Dict] = None) -> "DomainFacets":
+        """Build from a processed domain frame and its tag columns."""
+        from services.data_loader import encode_tags
+        
+        mood_tags = (tag_columns or {}).get('mood_tags')
+        if mood_tags is None or len(mood_tags) != len(df):
+            mood_tags = encode_tags(df['mood_tag'])
+        return cls.from_columns(
+            len(df),
+            {facet: df[facet].tolist() for facet in LABEL_FACETS if facet in df.columns},
+            df['duration_min'].to_numpy(),
+            (mood_tags.indptr, mood_tags.indices, mood_tags.vocabulary)
+        )
+    
+    @classmethod
+    def from_snapshot(cls, domain) -> "DomainFacets":
+        """Build from the columns of an attached snapshot domain."""
+        columns = domain.columns
+        mood_tags = columns.get('mood_tags')
+        return cls.from_columns(
+            domain.rows,
+            {facet: columns[facet].to_list() for facet in LABEL_FACETS if facet in columns},
+            columns['duration_min'],
+            (mood_tags.indptr, mood_tags.indices, mood_tags.vocabulary) if mood_tags is not None else None
+        )
+    
+    def match(self, filters: Dict[str, List[str]], skip: Optional[str] = None) -> Optional[np.ndarray]:
+        """Intersect the filters other than ``skip``; None if none apply."""
+        bitmap = None
+        for facet, values in filters.items():
+            if facet == "domain" or facet == skip or not values:
+                continue
+            positions = [self.positions.get(facet, {}).get(value) for value in values]
+            positions = [position for position in positions if position is not None]
+            if positions:
+                selected = np.bitwise_or.reduce(self.facets[facet][1][positions], axis=0)
+            else:
+                selected = np.zeros(self.words, dtype=np.uint64)
+            bitmap = selected if bitmap is None else bitmap & selected
+        return bitmap
+    
+    def count(self, bitmap: Optional[np.ndarray]) -> int:
+        """Count the rows of a bitmap, or every row for None."""
+        return self.rows if bitmap is None else int(popcount(bitmap).sum())
+    
+    def row_positions(self, bitmap: np.ndarray) -> np.ndarray:
+        """Get the rows set in a bitmap, in order."""
+        bits = np.unpackbits(bitmap.view(np.uint8), count=self.rows, bitorder="little")
+        return np.flatnonzero(bits)
+    
+    def counts(self, filters: Dict[str, List[str]]) -> Dict[str, Dict[str, int]]:
+        """Count the matches of every facet value under the other facets' filters."""
+        counts = {}
+        for facet, (values, bitmaps) in self.facets.items():
+            base = self.match(filters, skip=facet)
+            hits = popcount(bitmaps if base is None else bitmaps & base).sum(axis=1)
+            counts[facet] = dict(zip(values, hits.tolist()))
+        return counts
+
+
+class CatalogFacets:
+    """Facet bitmaps of every domain, kept current with the catalog."""
+    
+    def __init__(self, loader=None):
+        """Initialize the facet service."""
+        self._loader = loader
+        self.domains: Dict[str, DomainFacets] = {}
+        self.version: Optional[str] = None
+        self._lock = threading.Lock()
+    
+    @property
+    def data_loader(self):
+        """Get the catalog loader."""
+        if self._loader is None:
+            from services.data_loader import data_loader
+            self._loader = data_loader
+        return self._loader
+    
+    def ensure_index(self) -> Dict[str, DomainFacets]:
+        """Build the bitmaps on first use or after the catalog changed."""
+        loader = self.data_loader
+        loader.ensure_loaded()
+        if self.version != loader.version:
+            with self._lock:
+                if self.version != loader.version:
+                    with MODEL_BUILD_DURATION.time(domain="facets"):
+                        self.domains = self._build()
+                    self.version = loader.version
+                    app_logger.info("Built facet bitmaps for {}", list(self.domains))
+        return self.domains
+    
+    def _build(self) -> Dict[str, DomainFacets]:
+        """Take each domain's bitmaps from the snapshot, or build them."""
+        loader = self.data_loader
+        snapshot = loader.snapshot
+        domains = {}
+        for domain in DOMAINS:
+            key = domain + 's'
+            if snapshot is not None:
+                if key in snapshot.domains:
+                    shared = snapshot.domains[key]
+                    domains[domain] = shared.facets or DomainFacets.from_snapshot(shared)
+                continue
+            df = loader.get_data(key)
+            if not df.empty:
+                domains[domain] = DomainFacets.from_frame(df, loader.tag_columns.get(key))
+        return domains
+    
+    def filter_rows(self, domain: str, filters: Optional[Dict[str, List[str]]]) -> Optional[np.ndarray]:
+        """Get the rows of a domain passing the filters; None if none apply."""
+        if not filters:
+            return None
+        facets = self.ensure_index().get(domain)
+        if facets is None or (filters.get("domain") and domain not in filters["domain"]):
+            return np.zeros(0, dtype=np.int64)
+        bitmap = facets.match(filters)
+        return None if bitmap is None else facets.row_positions(bitmap)
+    
+    def counts(self, filters: Optional[Dict[str, List[str]]] = None) -> Dict:
+        """Count the matches of every facet value across domains."""
+        filters = filters or {}
+        wanted = filters.get("domain") or DOMAINS
+        result = {"total": 0, "facets": {"domain": {}}}
+        for domain, facets in self.ensure_index().items():
+            matching = facets.count(facets.match(filters))
+            result["facets"]["domain"][domain] = matching
+            if domain not in wanted:
+                continue
+            result["total"] += matching
+            for facet, counts in facets.counts(filters).items():
+                merged = result["facets"].setdefault(facet, {})
+                for value, count in counts.items():
+                    merged[value] = merged.get(value, 0) + count
+        return result
+
+
+# Global instance
+catalog_facets = CatalogFacets()
@@ -0,0 +1,300 @@
+"""Feedback retention: archive old rows to columnar files, keep a hot window.
+
+Rows older than ``feedback_retention_days`` move from the feedback table to
+compressed column files partitioned by UTC day::
+
+    <feedback_archive_dir>/day=2024-05-01/part-000000000001-000000000450.npz
+
+Each file holds the row ids, the creation times as epoch microseconds and
+dictionary-encoded string columns. A partition file is written before its
+rows are deleted and readers drop duplicate ids, so an interrupted run only
+leaves rows that the next run archives again. ``load_feedback`` reads
+archived and hot rows together for offline training. The daily rollups are
+never archived.
+
+Usage:
+    python -m services.feedback_archive
+    python -m services.feedback_archive --export feedback.csv --start 2024-01-01
+"""
+
+import argparse
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+from core.config import settings
+from core.logging import app_logger
+from core.metrics import DB_WRITE_LATENCY
+
+STRING_COLUMNS = ("item_id", "domain", "action", "user_session")
+
+PARTITION_PREFIX = "day="
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def _to_micros(value: datetime) -> int:
+    """Convert a datetime to epoch microseconds, reading naive values as UTC."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+
+def _day_start(day: date) -> datetime:
+    """Get midnight UTC at the start of a day."""
+    return datetime.combine(day, datetime.min.time(), tzinfo=timezone.utc)
+
+
+def _encode_column(values: List[Optional[str]]) -> Dict[str, np.ndarray]:
+    """Dictionary-encode a string column; missing values get code -1."""
+    vocabulary = sorted({value for value in values if value is not None})
+    index = {value: i for i, value in enumerate(vocabulary)}
+    codes = np.array([index.get(value, -1) if value is not None else -1 for value in values],
+                     dtype=np.int32)
+    encoded = [value.encode("utf-8") for value in vocabulary]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    return {
+        "codes": codes,
+        "values": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+        "offsets": offsets
+    }
+
+
+def _decode_column(codes: np.ndarray, values: np.ndarray, offsets: np.ndarray) -> List[Optional[str]]:
+    """Decode a dictionary-encoded string column."""
+    buffer = values.tobytes()
+    vocabulary = [buffer[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)]
+    return [vocabulary[code] if code >= 0 else None for code in codes.tolist()]
+
+
+def write_partition(root: str, day: date, rows: List) -> str:
+    """Write feedback rows of one day as a compressed column file."""
+    directory = os.path.join(root, f"{PARTITION_PREFIX}{day.isoformat()}")
+    os.makedirs(directory, exist_ok=True)
+    ids = [row.id for row in rows]
+    path = os.path.join(directory, f"part-{min(ids):012d}-{max(ids):012d}.npz")
+    
+    arrays = {
+        "id": np.array(ids, dtype=np.int64),
+        "created_at": np.array([_to_micros(row.created_at) for row in rows], dtype=np.int64)
+    }
+    for column in STRING_COLUMNS:
+        for part, array in _encode_column([getattr(row, column) for row in rows]).items():
+            arrays[f"{column}.{part}"] = array
+    
+    # Write under a temporary name so readers never see a partial file
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as f:
+        np.savez_compressed(f, **arrays)
+    os.replace(temporary, path)
+    return path
+
+
+def read_partition(path: str) -> Dict[str, np.ndarray]:
+    """Read a partition file into columns."""
+    with np.load(path, allow_pickle=False) as data:
+        columns = {"id": data["id"], "created_at": data["created_at"]}
+        for column in STRING_COLUMNS:
+            columns[column] = _decode_column(
+                data[f"{column}.codes"], data[f"{column}.values"], data[f"{column}.offsets"]
+            )
+    return columns
+
+
+def partition_paths(root: str, start: Optional[date] = None, end: Optional[date] = None) -> List[str]:
+    """List partition files for days between ``start`` and ``end`` inclusive."""
+    if not os.path.isdir(root):
+        return []
+    paths = []
+    for name in sorted(os.listdir(root)):
+        if not name.startswith(PARTITION_PREFIX):
+            continue
+        day = date.fromisoformat(name[len(PARTITION_PREFIX):])
+        if (start and day < start) or (end and day > end):
+            continue
+        directory = os.path.join(root, name)
+        paths.extend(os.path.join(directory, part) for part in sorted(os.listdir(directory))
+                     if part.endswith(".npz"))
+    return paths
+
+
+def _release_pages(db_engine, pages: int):
+    """Return up to ``pages`` free database pages to the filesystem.
+    
+    Unlike VACUUM this never rewrites the file, so writers wait only briefly.
+    Databases created without incremental auto-vacuum keep their free pages
+    for later inserts.
+    """
+    if pages <= 0:
+        return
+    connection = db_engine.raw_connection()
+    try:
+        # Run to completion; a single execute() step frees only one page
+        connection.driver_connection.executescript(f"PRAGMA incremental_vacuum({int(pages)});")
+    finally:
+        connection.close()
+
+
+def archive_feedback(retention_days: Optional[int] = None, root: Optional[str] = None,
+                     batch_size: int = 10000, today: Optional[date] = None,
+                     db_engine=None) -> Dict:
+    """Move feedback older than the retention window into archive partitions."""
+    from sqlmodel import Session, delete, select
+    from models.feedback import Feedback, create_db_and_tables, engine as feedback_engine
+    
+    retention_days = settings.feedback_retention_days if retention_days is None else retention_days
+    root = root or settings.feedback_archive_dir
+    db_engine = db_engine or feedback_engine
+    today = today or datetime.now(timezone.utc).date()
+    cutoff = _day_start(today - timedelta(days=retention_days))
+    
+    if db_engine is feedback_engine:
+        create_db_and_tables()
+    start = time.perf_counter()
+    archived = 0
+    partitions = 0
+    with Session(db_engine) as session:
+        while True:
+            rows = session.exec(
+                select(Feedback).where(Feedback.created_at < cutoff)
+                .order_by(Feedback.id).limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            
+            days: Dict[date, List] = {}
+            for row in rows:
+                days.setdefault(row.created_at.date(), []).append(row)
+            for day, day_rows in days.items():
+                write_partition(root, day, day_rows)
+            partitions += len(days)
+            
+            with DB_WRITE_LATENCY.time(operation="feedback_archive_delete"):
+                session.exec(delete(Feedback).where(Feedback.id.in_([row.id for row in rows])))
+                session.commit()
+            archived += len(rows)
+    
+    if archived and db_engine.dialect.name == "sqlite":
+        _release_pages(db_engine, settings.feedback_archive_vacuum_pages)
+    
+    result = {
+        "archived_rows": archived,
+        "partitions_written": partitions,
+        "cutoff": cutoff.date().isoformat(),
+        "duration_seconds": round(time.perf_counter() - start, 4)
+    }
+    if archived:
+        app_logger.info("Archived {archived_rows} feedback rows before {cutoff} "
+                        "into {partitions_written} partitions", **result)
+    return result
+
+
+def load_feedback(start: Optional[date] = None, end: Optional[date] = None,
+                  root: Optional[str] = None, include_hot: bool = True, db_engine=None):
+    """Load archived and hot feedback between two UTC days as one DataFrame."""
+    import pandas as pd
+    from sqlmodel import Session, select
+    from models.feedback import Feedback, engine as feedback_engine
+    
+    root = root or settings.feedback_archive_dir
+    frames = []
+    for path in partition_paths(root, start, end):
+        columns = read_partition(path)
+        columns["created_at"] = pd.to_datetime(columns["created_at"], unit="us", utc=True)
+        frames.append(pd.DataFrame(columns))
+    
+    if include_hot:
+        query = select(Feedback.id, Feedback.created_at, *[getattr(Feedback, c) for c in STRING_COLUMNS])
+        if start:
+            query = query.where(Feedback.created_at >= _day_start(start))
+        if end:
+            query = query.where(Feedback.created_at < _day_start(end + timedelta(days=1)))
+        with Session(db_engine or feedback_engine) as session:
+            rows = session.exec(query).all()
+        hot = pd.DataFrame(rows, columns=["id", "created_at", *STRING_COLUMNS])
+        hot["created_at"] = pd.to_datetime(hot["created_at"], utc=True)
+        frames.append(hot)
+    
+    columns = ["id", "created_at", *STRING_COLUMNS]
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    feedback = pd.concat(frames, ignore_index=True)[columns]
+    # Archived and hot frames infer string dtypes differently; use one
+    for column in STRING_COLUMNS:
+        values = feedback[column].astype(object)
+        feedback[column] = values.where(values.notna(), None)
+    
+    # A run interrupted between writing and deleting leaves a row in both
+    feedback = feedback.drop_duplicates("id")
+    if start:
+        feedback = feedback[feedback["created_at"] >= pd.Timestamp(_day_start(start))]
+    if end:
+        feedback = feedback[feedback["created_at"] < pd.Timestamp(_day_start(end + timedelta(days=1)))]
+    return feedback.sort_values(["created_at", "id"]).reset_index(drop=True)
+
+
+class FeedbackArchiver:
+    """Runs the retention job periodically in a background thread."""
+    
+    def __init__(self):
+        """Initialize the archiver."""
+        self.last_result: Optional[Dict] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self, interval: Optional[float] = None):
+        """Archive every ``interval`` seconds until stopped."""
+        interval = interval or settings.feedback_archive_interval
+        if self._thread is not None or interval <= 0:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(interval,), name="feedback-archive", daemon=True
+        )
+        self._thread.start()
+    
+    def stop(self):
+        """Stop the background thread."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+    
+    def _run(self, interval: float):
+        """Background loop; a failed run leaves the rows for the next one."""
+        while not self._stop.wait(interval):
+            try:
+                self.last_result = archive_feedback()
+            except Exception as e:
+                app_logger.error("Error archiving feedback: {}", e)
+
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Archive old feedback or export all of it")
+    parser.add_argument("--retention-days", type=int, help="Days of feedback kept in the database")
+    parser.add_argument("--export", help="Write archived and hot feedback to this CSV file instead")
+    parser.add_argument("--start", type=date.fromisoformat, help="First day to export")
+    parser.add_argument("--end", type=date.fromisoformat, help="Last day to export")
+    args = parser.parse_args()
+    
+    if args.export:
+        feedback = load_feedback(args.start, args.end)
+        feedback.to_csv(args.export, index=False)
+        print(f"Exported {len(feedback)} feedback rows to {args.export}")
+    else:
+        print(archive_feedback(args.retention_days))
+
+
+# Global instance
+feedback_archiver = FeedbackArchiver()
+
+
+if __name__ == "__main__":
+    main()
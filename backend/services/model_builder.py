@@ -0,0 +1,173 @@
+"""Streaming, parallel build of the content models.
+
+A domain is built ``model_build_chunk_size`` rows at a time, either from its
+CSV file, preprocessing each chunk like the loaded catalog, or from a frame
+the data loader already holds. Each chunk is turned into scoring features
+and feature texts hashed into ``model_hash_features`` columns, so no
+vocabulary is kept. Document frequencies are summed per chunk into a
+fixed-size vector and applied as IDF weights at the end. Working memory is
+one chunk plus that vector; only the results grow with the catalog.
+Domains built from files run in parallel worker processes, one per domain
+up to ``model_build_workers``.
+"""
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from core.config import settings
+from core.logging import app_logger
+from services.data_loader import preprocess_frame
+
+# Below this much CSV, starting worker processes costs more than it saves
+PARALLEL_MIN_BYTES = 8 * 1024 * 1024
+
+
+def make_vectorizer(n_features: int):
+    """Create the stateless vectorizer counting hashed feature terms."""
+    # Imported here so servers using prebuilt artifacts never load scikit-learn
+    from sklearn.feature_extraction.text import HashingVectorizer
+    
+    return HashingVectorizer(
+        n_features=n_features,
+        stop_words='english',
+        ngram_range=(1, 1),
+        alternate_sign=False,
+        norm=None
+    )
+
+
+def chunk_features(df: pd.DataFrame) -> Tuple[List[Dict], List[str]]:
+    """Get the scoring features and feature texts of preprocessed rows."""
+    rows = len(df)
+    tags = df['tags_list'].tolist() if 'tags_list' in df.columns else [[]] * rows
+    mood_tags = df['mood_tags'].tolist() if 'mood_tags' in df.columns else [[]] * rows
+    difficulty = df['difficulty'].tolist() if 'difficulty' in df.columns else ['intermediate'] * rows
+    types = df['type'].tolist() if 'type' in df.columns else [None] * rows
+    durations = df['duration_min'].tolist() if 'duration_min' in df.columns else [30] * rows
+    
+    item_features = []
+    feature_texts = []
+    for item_id, domain, item_tags, item_moods, item_difficulty, item_type, duration in zip(
+        df['item_id'].tolist(), df['domain'].tolist(), tags, mood_tags, difficulty, types, durations
+    ):
+        # Combine tags, mood tags, difficulty and type
+        features = []
+        if isinstance(item_tags, list):
+            features.extend(item_tags)
+        if isinstance(item_moods, list):
+            features.extend(item_moods)
+        if pd.notna(item_difficulty):
+            features.append(str(item_difficulty).lower())
+        if pd.notna(item_type):
+            features.append(str(item_type).lower())
+        feature_texts.append(' '.join(features))
+        
+        item_features.append({
+            'item_id': item_id,
+            'tags': item_tags,
+            'mood_tags': item_moods,
+            'duration': duration,
+            'difficulty': item_difficulty,
+            'domain': domain
+        })
+    
+    return item_features, feature_texts
+
+
+def iter_chunks(domain: str, source: Union[str, pd.DataFrame], chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Read preprocessed rows of a domain from a CSV path or a processed frame."""
+    if isinstance(source, pd.DataFrame):
+        for start in range(0, len(source), chunk_size):
+            yield source.iloc[start:start + chunk_size]
+        return
+    for raw in pd.read_csv(source, chunksize=chunk_size):
+        yield preprocess_frame(raw, domain)
+
+
+def build_domain_model(domain: str, source: Union[str, pd.DataFrame], chunk_size: int,
+                       n_features: int) -> Dict:
+    """Build one domain's scoring features and TF-IDF matrix."""
+    import scipy.sparse as sp
+    from sklearn.preprocessing import normalize
+    
+    start = time.perf_counter()
+    vectorizer = make_vectorizer(n_features)
+    document_frequency = np.zeros(n_features, dtype=np.int64)
+    item_features: List[Dict] = []
+    chunks = []
+    
+    for chunk in iter_chunks(domain, source, chunk_size):
+        features, texts = chunk_features(chunk)
+        counts = vectorizer.transform(texts)
+        document_frequency += np.bincount(counts.indices, minlength=n_features)
+        item_features.extend(features)
+        chunks.append(counts)
+    
+    if not item_features:
+        return {"domain": domain, "item_features": [], "matrix": None, "vectorizer": vectorizer,
+                "duration_seconds": time.perf_counter() - start}
+    
+    # Smoothed IDF and L2 rows, as TfidfVectorizer weights its matrix
+    matrix = sp.vstack(chunks, format="csr")
+    idf = np.log((1 + len(item_features)) / (1 + document_frequency)) + 1
+    matrix.data *= idf[matrix.indices]
+    normalize(matrix, copy=False)
+    return {
+        "domain": domain,
+        "item_features": item_features,
+        "matrix": matrix,
+        "vectorizer": vectorizer,
+        "duration_seconds": time.perf_counter() - start
+    }
+
+
+def build_content_models(sources: Dict[str, Union[str, pd.DataFrame]], workers: int = 0) -> Dict[str, Dict]:
+    """Build every domain from its CSV path or processed frame.
+    
+    Domains read from files are built in parallel processes when there is
+    enough data to pay for starting them; ``workers`` of 0 uses one per
+    domain, up to the CPU count. Frames are built in this process so their
+    rows are shared rather than copied. A domain that fails to build is
+    logged and left out.
+    """
+    files = {}
+    for domain, source in sources.items():
+        if isinstance(source, str):
+            if os.path.exists(source):
+                files[domain] = source
+            else:
+                app_logger.warning(f"No data found for {domain}")
+    workers = workers or min(len(files), os.cpu_count() or 1)
+    total_bytes = sum(os.path.getsize(path) for path in files.values())
+    parallel = workers > 1 and len(files) > 1 and total_bytes >= PARALLEL_MIN_BYTES
+    chunk_size = settings.model_build_chunk_size
+    n_features = settings.model_hash_features
+    
+    results = {}
+    pool = None
+    futures = {}
+    if parallel:
+        pool = ProcessPoolExecutor(max_workers=min(workers, len(files)),
+                                   mp_context=multiprocessing.get_context("spawn"))
+        futures = {domain: pool.submit(build_domain_model, domain, path, chunk_size, n_features)
+                   for domain, path in files.items()}
+    try:
+        for domain, source in sources.items():
+            if isinstance(source, str) and domain not in files:
+                continue
+            try:
+                if domain in futures:
+                    results[domain] = futures[domain].result()
+                else:
+                    results[domain] = build_domain_model(domain, source, chunk_size, n_features)
+            except Exception as e:
+                app_logger.error(f"Error building content model for {domain}: {e}")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return results
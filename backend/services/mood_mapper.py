@@ -1,8 +1,75 @@
 """Mood mapping service for recommendation preferences."""
 
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
 from core.config import settings
 
+DOMAINS = ["workout", "recipe", "course"]
+
+
+class TagMatrix:
+    """Sparse item-by-tag matrix of one domain in CSR form.
+    
+    Row ``i`` holds the vocabulary indices of item ``i``'s tags in
+    ``indices[indptr[i]:indptr[i + 1]]``.
+    """
+    
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray, vocabulary: List[str]):
+        """Initialize the matrix."""
+        self.indptr = indptr
+        self.indices = indices
+        self.vocabulary = vocabulary
+        self.index = {tag: i for i, tag in enumerate(vocabulary)}
+        self.row_lengths = np.diff(indptr)
+    
+    @classmethod
+    def from_lists(cls, tag_lists: Iterable[List[str]]) -> "TagMatrix":
+        """Build the matrix from per-item tag lists."""
+        index: Dict[str, int] = {}
+        indptr = [0]
+        indices = []
+        for tags in tag_lists:
+            for tag in tags or []:
+                indices.append(index.setdefault(tag, len(index)))
+            indptr.append(len(indices))
+        return cls(np.array(indptr, dtype=np.int64), np.array(indices, dtype=np.int64), list(index))
+    
+    def __len__(self) -> int:
+        """Get the number of items."""
+        return len(self.row_lengths)
+    
+    def dot(self, weights: Dict[str, float]) -> np.ndarray:
+        """Multiply the matrix by a sparse tag weight vector."""
+        vector = np.zeros(len(self.vocabulary))
+        for tag, weight in weights.items():
+            column = self.index.get(tag)
+            if column is not None:
+                vector[column] = weight
+        
+        # Sum each non-empty row on its own, so a row's result does not
+        # depend on the rows around it (sharded scoring relies on this)
+        result = np.zeros(len(self))
+        non_empty = self.row_lengths > 0
+        if non_empty.any():
+            result[non_empty] = np.add.reduceat(vector[self.indices], self.indptr[:-1][non_empty])
+        return result
+    
+    def rows(self, start: int, stop: int) -> "TagMatrix":
+        """Get the sub-matrix of rows ``start`` to ``stop``."""
+        indptr = self.indptr[start:stop + 1]
+        return TagMatrix(indptr - indptr[0], self.indices[indptr[0]:indptr[-1]], self.vocabulary)
+    
+    def select(self, rows: Sequence[int]) -> "TagMatrix":
+        """Get the sub-matrix of the given rows, in the given order."""
+        rows = np.asarray(rows, dtype=np.int64)
+        lengths = self.row_lengths[rows]
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=indptr[1:])
+        # Position of every selected entry in the full indices array
+        positions = np.repeat(self.indptr[:-1][rows] - indptr[:-1], lengths) + np.arange(indptr[-1])
+        return TagMatrix(indptr, self.indices[positions], self.vocabulary)
+
 
 class MoodMapper:
     """Maps moods to preferred content characteristics."""
@@ -69,6 +136,30 @@ class MoodMapper:
             "medium_to_long": {"min": 30, "max": 90, "optimal": 60},
             "flexible": {"min": 5, "max": 120, "optimal": 45}
         }
+        
+        # Mood profiles as sparse tag weight vectors, seeded from the tables
+        # above and replaced wholesale when refitted from feedback
+        self.seed_weights = self._seed_tag_weights()
+        self.tag_weights = self.seed_weights
+    
+    def _seed_tag_weights(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Build weight vectors giving each preferred tag a weight of 1."""
+        return {
+            mood: {
+                domain: {tag: 1.0 for tag in preferences.get(f"{domain}_tags", [])}
+                for domain in DOMAINS
+            }
+            for mood, preferences in self.mood_preferences.items()
+        }
+    
+    def get_tag_weights(self, mood: str, domain: str) -> Dict[str, float]:
+        """Get the tag weight vector for a mood and domain."""
+        weights = self.tag_weights
+        return weights.get(mood, weights["happy"]).get(domain, {})
+    
+    def publish_tag_weights(self, weights: Dict[str, Dict[str, Dict[str, float]]]):
+        """Replace every mood's weight vectors in one assignment."""
+        self.tag_weights = weights
     
     def get_mood_preferences(self, mood: str) -> Dict:
         """Get preferences for a given mood."""
@@ -106,18 +197,32 @@ class MoodMapper:
     
     def calculate_mood_score(self, item_tags: List[str], mood: str, domain: str) -> float:
         """Calculate how well an item matches a mood."""
-        preferred_tags = self.get_preferred_tags(mood, domain)
-        if not preferred_tags or not item_tags:
+        weights = self.get_tag_weights(mood, domain)
+        total_weight = sum(weights.values())
+        if not total_weight or not item_tags:
             return 0.5  # neutral score
         
-        # Calculate overlap
-        tag_overlap = len(set(item_tags) & set(preferred_tags))
-        max_possible = min(len(item_tags), len(preferred_tags))
+        # Weighted overlap, relative to the best achievable for this many tags
+        overlap = sum(weights.get(tag, 0.0) for tag in item_tags)
+        return min(1.0, overlap / min(len(item_tags), total_weight))
+    
+    def score_items(self, matrix: TagMatrix, mood: str, domain: str,
+                    weights: Optional[Dict[str, float]] = None) -> np.ndarray:
+        """Calculate the mood score of every item of a domain at once.
         
-        if max_possible == 0:
-            return 0.5
+        Same scores as ``calculate_mood_score``, as one sparse matrix-vector
+        product against the domain's item-tag matrix.
+        """
+        if weights is None:
+            weights = self.get_tag_weights(mood, domain)
+        total_weight = sum(weights.values())
+        if not total_weight:
+            return np.full(len(matrix), 0.5)
         
-        return tag_overlap / max_possible
+        overlap = matrix.dot(weights)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores = np.minimum(1.0, overlap / np.minimum(matrix.row_lengths, total_weight))
+        return np.where(matrix.row_lengths == 0, 0.5, scores)
     
     def get_difficulty_preference_score(self, item_difficulty: str, mood: str) -> float:
         """Get preference score for item difficulty based on mood."""
@@ -0,0 +1,141 @@
+"""Mood tag weights learned from user feedback.
+
+Each mood's weight vector starts from the preferred tags in ``MoodMapper``
+(weight 1) and moves towards the like rate observed for each tag on items
+tagged with that mood. The hand-written preferences act as a prior worth
+``mood_weight_prior_strength`` votes, so weights only move once enough
+feedback has been collected. A background thread refits the vectors and
+publishes them to the mapper in a single assignment.
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+
+from core.config import settings
+from core.logging import app_logger
+from core.metrics import MODEL_BUILD_DURATION
+from services.mood_mapper import DOMAINS, MoodMapper, mood_mapper
+
+# Tags whose learned weight falls below this are dropped from the vector
+MIN_WEIGHT = 0.01
+
+
+def load_feedback_counts() -> Dict[str, Dict[str, int]]:
+    """Count likes and dislikes per item from the daily feedback rollups."""
+    from sqlmodel import Session, func, select
+    from models.feedback import FeedbackItemDaily, create_db_and_tables, engine
+    
+    create_db_and_tables()
+    with Session(engine) as session:
+        rows = session.exec(
+            select(FeedbackItemDaily.item_id, func.sum(FeedbackItemDaily.likes),
+                   func.sum(FeedbackItemDaily.dislikes))
+            .group_by(FeedbackItemDaily.item_id)
+        ).all()
+    
+    return {item_id: {"like": likes, "dislike": dislikes} for item_id, likes, dislikes in rows}
+
+
+def fit_tag_weights(seed: Dict[str, Dict[str, Dict[str, float]]],
+                    item_counts: Dict[str, Dict[str, int]], items: Dict[str, Dict],
+                    prior_strength: float) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """Fit mood tag weights as smoothed like rates.
+    
+    A tag's weight for a mood and domain is
+    ``(likes + prior_strength * seed) / (likes + dislikes + prior_strength)``
+    over feedback on items of that domain tagged with that mood.
+    """
+    votes: Dict = {}
+    for item_id, counts in item_counts.items():
+        item = items.get(item_id)
+        if item is None:
+            continue
+        for mood in item.get('mood_tags') or []:
+            if mood not in seed:
+                continue
+            tag_votes = votes.setdefault((mood, item['domain']), {})
+            for tag in item.get('tags_list') or []:
+                likes, dislikes = tag_votes.get(tag, (0, 0))
+                tag_votes[tag] = (likes + counts.get("like", 0), dislikes + counts.get("dislike", 0))
+    
+    weights = {}
+    for mood, domains in seed.items():
+        weights[mood] = {}
+        for domain in DOMAINS:
+            prior = domains.get(domain, {})
+            tag_votes = votes.get((mood, domain), {})
+            vector = {}
+            for tag in set(prior) | set(tag_votes):
+                likes, dislikes = tag_votes.get(tag, (0, 0))
+                weight = (likes + prior_strength * prior.get(tag, 0.0)) / (likes + dislikes + prior_strength)
+                if weight >= MIN_WEIGHT:
+                    vector[tag] = round(weight, 4)
+            weights[mood][domain] = vector
+    return weights
+
+
+class MoodWeightRefitter:
+    """Periodically refits mood tag weights on a background thread."""
+    
+    def __init__(self, mapper: Optional[MoodMapper] = None, loader=None):
+        """Initialize the refitter."""
+        self.mapper = mapper or mood_mapper
+        self.loader = loader
+        self.last_result: Optional[Dict] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def refit(self) -> Dict:
+        """Refit the weights from all feedback and publish them."""
+        from services.data_loader import data_loader
+        loader = self.loader or data_loader
+        
+        start = time.perf_counter()
+        item_counts = load_feedback_counts()
+        items = loader.get_items_by_ids(list(item_counts))
+        weights = fit_tag_weights(
+            self.mapper.seed_weights, item_counts, items, settings.mood_weight_prior_strength
+        )
+        self.mapper.publish_tag_weights(weights)
+        duration = time.perf_counter() - start
+        MODEL_BUILD_DURATION.observe(duration, domain="mood_weights")
+        
+        self.last_result = {
+            "items": len(items),
+            "feedback": sum(sum(counts.values()) for counts in item_counts.values()),
+            "duration_seconds": round(duration, 4)
+        }
+        app_logger.info("Refitted mood tag weights from {feedback} votes on {items} items", **self.last_result)
+        return self.last_result
+    
+    def start(self, interval: Optional[float] = None):
+        """Refit every ``interval`` seconds until stopped."""
+        interval = interval or settings.mood_refit_interval
+        if self._thread is not None or interval <= 0:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(interval,), name="mood-weight-refit", daemon=True
+        )
+        self._thread.start()
+    
+    def stop(self):
+        """Stop the background thread."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+    
+    def _run(self, interval: float):
+        """Background loop; a failed refit keeps the previous weights."""
+        while not self._stop.wait(interval):
+            try:
+                self.refit()
+            except Exception as e:
+                app_logger.error("Error refitting mood tag weights: {}", e)
+
+
+# Global instance
+mood_refitter = MoodWeightRefitter()
@@ -1,18 +1,31 @@
 """Playlist generation service for creating curated daily recommendations."""
 
 import random
+import threading
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Tuple
 from core.config import settings
 from core.logging import app_logger
-from services.data_loader import data_loader
-from services.recommender import recommendation_engine
+from core.metrics import track_stage
+from core.tracing import traced
+from services.data_loader import DataLoader, data_loader
+from services.facets import buckets_within, duration_buckets
+from services.ranked_lists import RankedListStore, ranked_lists
+from services.recommender import RecommendationEngine, recommendation_engine
 
 
 class PlaylistGenerator:
     """Generates curated playlists from recommendations."""
     
-    def __init__(self):
+    def __init__(self, loader: Optional[DataLoader] = None,
+                 engine: Optional[RecommendationEngine] = None,
+                 store: Optional[RankedListStore] = None):
         """Initialize playlist generator."""
+        self.data_loader = loader or data_loader
+        self.recommendation_engine = engine or recommendation_engine
+        self.ranked_lists = store if store is not None else ranked_lists
         self.domain_order_preferences = {
             "energized": ["workout", "recipe", "course"],
             "calm": ["course", "recipe", "workout"],
@@ -20,55 +33,271 @@ class PlaylistGenerator:
             "happy": ["workout", "recipe", "course"],
             "tired": ["recipe", "course", "workout"]
         }
+        # Last full playlist per mood/time/interests bucket, served when
+        # admission control sheds a request
+        self._fallbacks: Dict[Tuple, Dict] = {}
+        self._fallback_lock = threading.Lock()
     
+    @traced()
     def generate_playlist(self, mood: str, available_minutes: int, 
                          interests: List[str], limit: int = 6,
-                         user_session: Optional[str] = None) -> Dict:
-        """Generate a curated playlist based on preferences."""
-        
-        # Get recommendations from the engine
-        recommendations = recommendation_engine.get_recommendations(
-            mood=mood,
-            available_minutes=available_minutes,
-            interests=interests,
-            limit=limit * 2,  # Get more for better curation
-            user_session=user_session
-        )
+                         user_session: Optional[str] = None,
+                         filters: Optional[Dict[str, List[str]]] = None,
+                         record_served: bool = True, store_remaining: bool = True) -> Dict:
+        """Generate a curated playlist based on preferences and facet filters.
+        
+        Items are marked as seen by the session unless ``record_served`` is
+        False, for playlists computed ahead of being served. Without
+        ``store_remaining`` the candidates not shown are not kept for paging
+        and no cursor is returned.
+        """
+        
+        # Rank candidates once; the first page is curated from the best of
+        # them and the rest are kept for follow-up pages
+        with track_stage("scoring"):
+            ranked = self.recommendation_engine.get_ranked_recommendations(
+                mood=mood,
+                available_minutes=available_minutes,
+                interests=interests,
+                depth=max(limit * 2, settings.ranked_list_depth),
+                user_session=user_session,
+                filters=filters
+            )
+        recommendations = ranked[:limit * 2]  # Get more for better curation
         
         if not recommendations:
             app_logger.warning("No recommendations found, returning empty playlist")
             return {
                 "playlist": [],
                 "total_duration": 0,
-                "message": "No recommendations available"
+                "message": "No recommendations available",
+                "next_cursor": None,
+                "degraded": False
             }
         
         # Enrich recommendations with full item data
-        enriched_recommendations = self._enrich_recommendations(recommendations)
+        with track_stage("enrichment"):
+            enriched_recommendations = self._enrich_recommendations(recommendations)
         
         # Create curated playlist
-        playlist = self._curate_playlist(
-            enriched_recommendations, mood, available_minutes, limit
-        )
+        with track_stage("curation"):
+            playlist = self._curate_playlist(
+                enriched_recommendations, mood, available_minutes, limit
+            )
         
         # Calculate total duration
         total_duration = sum(item.get('duration_min', 0) for item in playlist)
         
+        # Keep served items out of this session's next playlists
+        if user_session and record_served:
+            self.recommendation_engine.seen_filters.record_served(
+                user_session, [item['item_id'] for item in playlist]
+            )
+        
+        # Session and filtered playlists are personalized, so only anonymous
+        # unfiltered ones are reused for other requests under overload
+        if not user_session and not filters:
+            self._remember_fallback(mood, available_minutes, interests, playlist)
+        
         return {
             "playlist": playlist,
             "total_duration": total_duration,
             "mood": mood,
             "available_minutes": available_minutes,
-            "interests": interests
+            "interests": interests,
+            "next_cursor": (self._store_remaining(ranked, playlist, available_minutes)
+                            if store_remaining else None),
+            "degraded": False
+        }
+    
+    @traced()
+    def generate_plan(self, mood: str, available_minutes: int, interests: List[str],
+                      days: int, limit: int = 6, user_session: Optional[str] = None,
+                      filters: Optional[Dict[str, List[str]]] = None,
+                      day_moods: Optional[List[str]] = None) -> Dict:
+        """Generate a playlist per day with no item repeated across days.
+        
+        Each distinct mood is scored once for all its days, concurrently when
+        days have different moods. Ranked candidates are dealt in snake order
+        per domain into one pool per day, so days get candidates of similar
+        quality and domain mix and no item can be used twice. Each day then
+        leads with a rotated domain order to balance domains across the plan.
+        """
+        moods = day_moods or [mood] * days
+        distinct = list(dict.fromkeys(moods))
+        
+        def rank(day_mood: str) -> List[Dict]:
+            """Rank enough candidates for every day with this mood."""
+            return self.recommendation_engine.get_ranked_recommendations(
+                mood=day_mood,
+                available_minutes=available_minutes,
+                interests=interests,
+                depth=max(limit * 2 * moods.count(day_mood), settings.ranked_list_depth),
+                user_session=user_session,
+                filters=filters
+            )
+        
+        with track_stage("scoring"):
+            workers = min(settings.plan_workers, len(distinct))
+            if workers > 1:
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    ranked = dict(zip(distinct, pool.map(rank, distinct)))
+            else:
+                ranked = {day_mood: rank(day_mood) for day_mood in distinct}
+        
+        # Candidates ranked for several moods go to the first mood's days only
+        pools: List[List[Dict]] = [[] for _ in moods]
+        used = set()
+        with track_stage("enrichment"):
+            for day_mood in distinct:
+                candidates = [rec for rec in ranked[day_mood] if rec['item_id'] not in used]
+                used.update(rec['item_id'] for rec in candidates)
+                self._deal(self._enrich_recommendations(candidates), pools,
+                           [day for day, m in enumerate(moods) if m == day_mood])
+        
+        plan = []
+        with track_stage("curation"):
+            for day, (day_mood, pool) in enumerate(zip(moods, pools)):
+                order = self.domain_order_preferences.get(day_mood, ["workout", "recipe", "course"])
+                playlist = self._curate_playlist(
+                    pool, day_mood, available_minutes, limit,
+                    domain_order=order[day % len(order):] + order[:day % len(order)]
+                )
+                plan.append({
+                    "day": day + 1,
+                    "mood": day_mood,
+                    "playlist": playlist,
+                    "total_duration": sum(item['duration_min'] for item in playlist)
+                })
+        
+        if user_session:
+            self.recommendation_engine.seen_filters.record_served(
+                user_session, [item['item_id'] for day in plan for item in day['playlist']]
+            )
+        
+        return {
+            "days": plan,
+            "mood": mood,
+            "available_minutes": available_minutes,
+            "interests": interests,
+            "total_items": sum(len(day['playlist']) for day in plan),
+            "degraded": False
+        }
+    
+    @staticmethod
+    def _deal(items: List[Dict], pools: List[List[Dict]], days: List[int]):
+        """Deal ranked items into the days' pools, in snake order within each domain."""
+        dealt: Dict[str, int] = {}
+        for item in items:
+            turn = dealt.get(item['domain'], 0)
+            dealt[item['domain']] = turn + 1
+            lap, seat = divmod(turn, len(days))
+            pools[days[seat if lap % 2 == 0 else len(days) - 1 - seat]].append(item)
+    
+    def _remember_fallback(self, mood: str, available_minutes: int,
+                           interests: List[str], playlist: List[Dict]):
+        """Keep a playlist for its bucket, unless a longer one is already kept."""
+        if not playlist:
+            return
+        key = (mood, available_minutes, tuple(sorted(interests)))
+        with self._fallback_lock:
+            current = self._fallbacks.get(key)
+            if current is None or len(playlist) >= len(current):
+                self._fallbacks[key] = playlist
+    
+    def get_degraded_playlist(self, mood: str, available_minutes: int,
+                              interests: List[str], limit: int = 6,
+                              filters: Optional[Dict[str, List[str]]] = None) -> Tuple[Dict, str]:
+        """Get a cached playlist for the request's bucket without scoring.
+        
+        Falls back to the longest time bucket of the same mood and interests
+        that fits in ``available_minutes``. Facet filters are checked against
+        the fields playlist items carry. Returns the response and where it
+        came from: "bucket", "nearest_bucket" or "empty".
+        """
+        interests_key = tuple(sorted(interests))
+        with self._fallback_lock:
+            playlist = self._fallbacks.get((mood, available_minutes, interests_key))
+            source = "bucket"
+            if playlist is None:
+                source = "nearest_bucket"
+                shorter = sorted(
+                    (minutes for (m, minutes, i) in self._fallbacks
+                     if m == mood and i == interests_key and minutes < available_minutes),
+                    reverse=True
+                )
+                playlist = self._fallbacks[(mood, shorter[0], interests_key)] if shorter else None
+        
+        if playlist is not None and filters:
+            playlist = [item for item in playlist if _item_matches(item, filters)]
+        if not playlist:
+            source = "empty"
+            playlist = []
+        playlist = playlist[:limit]
+        return {
+            "playlist": playlist,
+            "total_duration": sum(item['duration_min'] for item in playlist),
+            "mood": mood,
+            "available_minutes": available_minutes,
+            "interests": interests,
+            "next_cursor": None,
+            "degraded": True,
+            "message": "Serving a cached playlist while the service is busy"
+        }, source
+    
+    def precompute_fallbacks(self):
+        """Build the degraded-mode playlist of every mood/time/interests bucket."""
+        start = time.perf_counter()
+        interest_sets = [[interest] for interest in settings.interest_options]
+        interest_sets.append(list(settings.interest_options))
+        for mood in settings.mood_options:
+            for minutes in settings.available_time_options:
+                for interests in interest_sets:
+                    self.generate_playlist(mood, minutes, interests,
+                                           limit=settings.max_recommendation_limit,
+                                           store_remaining=False)
+        app_logger.info("Precomputed {} fallback playlists in {:.2f}s",
+                        len(self._fallbacks), time.perf_counter() - start)
+    
+    def _store_remaining(self, ranked: List[Dict], playlist: List[Dict],
+                         available_minutes: int) -> Optional[str]:
+        """Keep the ranked candidates not shown yet and get the cursor to page them."""
+        shown = {item['item_id'] for item in playlist}
+        remaining = [
+            rec for rec in ranked
+            if rec['item_id'] not in shown and rec['duration'] <= available_minutes
+        ]
+        if not remaining:
+            return None
+        return self.ranked_lists.put(remaining)
+    
+    @traced()
+    def get_page(self, cursor: str, limit: int) -> Optional[Dict]:
+        """Get the next page of a ranked list by cursor, or None if it expired."""
+        page = self.ranked_lists.page(cursor, limit)
+        if page is None:
+            return None
+        
+        recommendations, next_cursor, remaining = page
+        with track_stage("enrichment"):
+            items = [
+                self._format_playlist_item(item)
+                for item in self._enrich_recommendations(recommendations)
+            ]
+        
+        return {
+            "items": items,
+            "next_cursor": next_cursor,
+            "remaining": remaining
         }
     
     def _enrich_recommendations(self, recommendations: List[Dict]) -> List[Dict]:
         """Enrich recommendations with full item data."""
         enriched = []
+        items = self.data_loader.get_items_by_ids([rec['item_id'] for rec in recommendations])
         
         for rec in recommendations:
-            item_id = rec['item_id']
-            item_data = data_loader.get_item_by_id(item_id)
+            item_data = items.get(rec['item_id'])
             
             if item_data:
                 # Combine recommendation scores with item data
@@ -85,7 +314,8 @@ class PlaylistGenerator:
         return enriched
     
     def _curate_playlist(self, recommendations: List[Dict], mood: str, 
-                        available_minutes: int, limit: int) -> List[Dict]:
+                        available_minutes: int, limit: int,
+                        domain_order: Optional[List[str]] = None) -> List[Dict]:
         """Curate a balanced playlist from recommendations."""
         
         # Group recommendations by domain
@@ -101,7 +331,7 @@ class PlaylistGenerator:
             domain_groups[domain].sort(key=lambda x: x['score'], reverse=True)
         
         # Get preferred domain order for this mood
-        domain_order = self.domain_order_preferences.get(
+        domain_order = domain_order or self.domain_order_preferences.get(
             mood, ["workout", "recipe", "course"]
         )
         
@@ -151,6 +381,7 @@ class PlaylistGenerator:
     
     def _format_playlist_item(self, item: Dict) -> Dict:
         """Format an item for playlist output."""
+        score = item.get('score', 0.5)
         return {
             "domain": item['domain'],
             "id": str(item['id']),
@@ -160,12 +391,12 @@ class PlaylistGenerator:
             "tags": item.get('tags_list', []),
             "mood_match": item.get('mood_tags', []),
             "image": item.get('image', f"/images/{item['domain']}s/default.jpg"),
-            "score": round(float(item['score']), 3),
+            "score": round(float(score), 3),
             "difficulty": item.get('difficulty', 'intermediate'),
             "description": item.get('description', ''),
             # Score breakdown for tooltips
             "score_breakdown": {
-                "overall": round(float(item['score']), 3),
+                "overall": round(float(score), 3),
                 "content": round(float(item.get('content_score', 0.5)), 3),
                 "collaborative": round(float(item.get('collaborative_score', 0.5)), 3),
                 "mood": round(float(item.get('mood_score', 0.5)), 3),
@@ -192,14 +423,15 @@ class PlaylistGenerator:
         
         return playlist
     
+    @traced()
     def get_similar_items(self, item_id: str, limit: int = 5) -> List[Dict]:
         """Get items similar to a given item."""
-        item = data_loader.get_item_by_id(item_id)
+        item = self.data_loader.get_item_by_id(item_id)
         if not item:
             return []
         
         domain = item['domain'] + 's'  # workout -> workouts
-        all_items = data_loader.get_items_by_domain(domain)
+        all_items = self.data_loader.get_items_by_domain(domain)
         
         if not all_items:
             return []
@@ -223,22 +455,29 @@ class PlaylistGenerator:
                 if similarity > 0.1:  # Minimum similarity threshold
                     similar_items.append({
                         **candidate,
-                        'similarity': similarity
+                        'similarity': similarity,
+                        'score': similarity
                     })
         
         # Sort by similarity and return top items
         similar_items.sort(key=lambda x: x['similarity'], reverse=True)
         return [self._format_playlist_item(item) for item in similar_items[:limit]]
     
+    @traced()
     def get_quick_suggestions(self, available_minutes: int, 
-                            domain: Optional[str] = None) -> List[Dict]:
-        """Get quick suggestions for a specific time constraint."""
+                            domain: Optional[str] = None,
+                            filters: Optional[Dict[str, List[str]]] = None) -> List[Dict]:
+        """Get quick suggestions for a specific time constraint and facet filters."""
         suggestions = []
         
         domains_to_search = [domain + 's'] if domain else ['workouts', 'recipes', 'courses']
+        if filters:
+            for d in domains_to_search:
+                suggestions.extend(self._filtered_suggestions(d, available_minutes, filters))
+            return [self._format_playlist_item(item) for item in suggestions[:10]]
         
         for d in domains_to_search:
-            items = data_loader.get_items_by_duration(
+            items = self.data_loader.get_items_by_duration(
                 min_duration=1,
                 max_duration=available_minutes,
                 domain=d
@@ -250,6 +489,58 @@ class PlaylistGenerator:
         
         # Format and return
         return [self._format_playlist_item(item) for item in suggestions[:10]]
+    
+    def _filtered_suggestions(self, domain: str, available_minutes: int,
+                              filters: Dict[str, List[str]]) -> List[Dict]:
+        """Get a domain's longest three items that fit in the time and pass the filters.
+        
+        The time limit is the union of the duration buckets within it,
+        intersected with the filters' bitmaps; only the three chosen rows are
+        read in full.
+        """
+        within = buckets_within(available_minutes)
+        buckets = [bucket for bucket in within if bucket in (filters.get("duration") or within)]
+        if not buckets:
+            return []
+        rows = self.recommendation_engine.facets.filter_rows(
+            domain.rstrip('s'), dict(filters, duration=buckets)
+        )
+        if not len(rows):
+            return []
+        
+        durations = self.data_loader.get_column(domain, 'duration_min')[rows]
+        rows = rows[durations >= 1]
+        durations = durations[durations >= 1]
+        
+        # Prefer items that use most of the available time; ties in catalog order
+        top = rows[np.argsort(-durations, kind="stable")[:3]]
+        return self.data_loader.get_items_at(domain, top.tolist())
+
+
+def _item_matches(item: Dict, filters: Dict[str, List[str]]) -> bool:
+    """Check a formatted playlist item against facet filters.
+    
+    Items do not carry their type or topic, so filters on those never match.
+    """
+    buckets = duration_buckets()
+    for facet, values in filters.items():
+        if not values:
+            continue
+        if facet == "domain":
+            matched = item['domain'] in values
+        elif facet == "difficulty":
+            matched = item.get('difficulty') in values
+        elif facet == "mood_tag":
+            matched = bool(set(item.get('mood_match', [])) & set(values))
+        elif facet == "duration":
+            bounds = sorted(settings.available_time_options)
+            position = sum(item['duration_min'] > bound for bound in bounds)
+            matched = buckets[position] in values
+        else:
+            matched = False
+        if not matched:
+            return False
+    return True
 
 
 # Global instance
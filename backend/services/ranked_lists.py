@@ -0,0 +1,84 @@
+"""Bounded store of ranked candidate lists, paged through with opaque cursors."""
+
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from core.config import settings
+from core.metrics import record_cache
+
+
+class RankedListStore:
+    """Keeps ranked lists for a limited time, evicting the least recently used."""
+    
+    def __init__(self, ttl: Optional[float] = None, max_entries: Optional[int] = None):
+        """Initialize the store."""
+        self.ttl = ttl if ttl is not None else settings.ranked_list_ttl
+        self.max_entries = max_entries if max_entries is not None else settings.ranked_list_max_entries
+        self._lists: "OrderedDict[str, Tuple[float, List[Dict]]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        """Count the stored lists."""
+        return len(self._lists)
+    
+    def put(self, items: List[Dict]) -> str:
+        """Store a ranked list and get the cursor for its first item."""
+        list_id = secrets.token_urlsafe(12)
+        with self._lock:
+            self._lists[list_id] = (time.monotonic() + self.ttl, items)
+            while len(self._lists) > self.max_entries:
+                self._lists.popitem(last=False)
+        return encode_cursor(list_id, 0)
+    
+    def page(self, cursor: str, limit: int) -> Optional[Tuple[List[Dict], Optional[str], int]]:
+        """Get a page of items, the next cursor and how many items remain after it.
+        
+        Returns None if the cursor is malformed, unknown or expired.
+        """
+        decoded = decode_cursor(cursor)
+        if decoded is None:
+            return None
+        list_id, offset = decoded
+        
+        with self._lock:
+            entry = self._lists.get(list_id)
+            if entry is not None and entry[0] < time.monotonic():
+                del self._lists[list_id]
+                entry = None
+            if entry is not None:
+                self._lists.move_to_end(list_id)
+        
+        record_cache("ranked_list", entry is not None)
+        if entry is None:
+            return None
+        
+        items = entry[1]
+        end = offset + limit
+        remaining = max(0, len(items) - end)
+        next_cursor = encode_cursor(list_id, end) if remaining else None
+        return items[offset:end], next_cursor, remaining
+    
+    def clear(self):
+        """Drop every stored list."""
+        with self._lock:
+            self._lists.clear()
+
+
+def encode_cursor(list_id: str, offset: int) -> str:
+    """Build the cursor for a position in a stored list."""
+    return f"{list_id}.{offset}"
+
+
+def decode_cursor(cursor: str) -> Optional[Tuple[str, int]]:
+    """Split a cursor into its list ID and offset."""
+    list_id, _, offset = cursor.rpartition(".")
+    if not list_id or not offset.isdigit():
+        return None
+    return list_id, int(offset)
+
+
+# Global instance
+ranked_lists = RankedListStore()
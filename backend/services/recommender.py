@@ -1,40 +1,137 @@
 """Core recommendation engine with content-based and collaborative filtering."""
 
+import json
+import os
+import threading
+
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Optional, Tuple
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from typing import Dict, List, Optional, Sequence, Tuple
 from core.config import settings
-from core.logging import app_logger
-from services.data_loader import data_loader
-from services.mood_mapper import mood_mapper
+from core.logging import app_logger, log_event
+from core.metrics import MODEL_BUILD_DURATION
+from core.tracing import span, traced
+from services.data_loader import DataLoader, data_loader
+from services.facets import CatalogFacets, catalog_facets
+from services.mood_mapper import TagMatrix, mood_mapper
+from services.seen_filter import SeenFilterStore, exclude_seen, item_hashes, seen_filters
+from services.session_profiles import SessionProfileStore, session_profiles
 
 # Disable surprise for now to avoid hanging
 SURPRISE_AVAILABLE = False
 app_logger.info("Using content-based filtering only for stability")
 
 
+def calculate_time_score(duration: int, min_dur: int, max_dur: int, optimal_dur: int) -> float:
+    """Calculate how well an item's duration fits the time constraints."""
+    if duration < min_dur or duration > max_dur:
+        return 0.1  # Outside acceptable range
+    
+    # Score based on distance from optimal
+    distance_from_optimal = abs(duration - optimal_dur)
+    max_distance = max(optimal_dur - min_dur, max_dur - optimal_dur)
+    
+    if max_distance == 0:
+        return 1.0
+    
+    return max(0.3, 1.0 - (distance_from_optimal / max_distance))
+
+
+def score_features(features: Sequence[Dict], matrix: TagMatrix, mood: str, domain: str,
+                   time_constraints: Dict, weights: Optional[Dict[str, float]] = None) -> List[Dict]:
+    """Score items for a mood and time constraints from their scoring features."""
+    domain_items = []
+    mood_scores = mood_mapper.score_items(matrix, mood, domain, weights)
+    for item_features, mood_score in zip(features, mood_scores.tolist()):
+        # Calculate scores
+        difficulty_score = mood_mapper.get_difficulty_preference_score(
+            item_features['difficulty'], mood
+        )
+        
+        # Time fit score
+        duration = item_features['duration']
+        time_score = calculate_time_score(
+            duration, time_constraints['min_duration'], 
+            time_constraints['max_duration'], time_constraints['optimal_duration']
+        )
+        
+        # Combined content score
+        content_score = (mood_score * 0.4 + difficulty_score * 0.3 + time_score * 0.3)
+        
+        domain_items.append({
+            'item_id': item_features['item_id'],
+            'domain': item_features['domain'],
+            'content_score': content_score,
+            'mood_score': mood_score,
+            'time_score': time_score,
+            'duration': duration
+        })
+    
+    return domain_items
+
+
 class RecommendationEngine:
     """Main recommendation engine combining content-based and collaborative filtering."""
     
-    def __init__(self):
+    def __init__(self, loader: Optional[DataLoader] = None,
+                 profiles: Optional[SessionProfileStore] = None,
+                 seen: Optional[SeenFilterStore] = None,
+                 facets: Optional[CatalogFacets] = None):
         """Initialize the recommendation engine."""
+        self.data_loader = loader or data_loader
+        self.session_profiles = profiles if profiles is not None else session_profiles
+        self.seen_filters = seen if seen is not None else seen_filters
+        if facets is None:
+            facets = catalog_facets if self.data_loader is data_loader else CatalogFacets(self.data_loader)
+        self.facets = facets
         self.tfidf_vectorizers = {}
         self.content_matrices = {}
         self.collaborative_models = {}
         self.item_features = {}
+        self.tag_matrices = {}
+        self.item_rows = {}
+        self.shard_pool = None
+        self._snapshot = None
         self._initialized = False
+        self._init_lock = threading.Lock()
 
     def _ensure_initialized(self):
         """Ensure models are initialized (lazy initialization)."""
-        if not self._initialized:
-            self._initialize_models()
-            self._initialized = True
+        self.data_loader.ensure_loaded()
+        if self._initialized and self._snapshot is self.data_loader.snapshot:
+            return
+        # Requests score on several threads; only one of them (re)builds
+        with self._init_lock:
+            if self._initialized and self._snapshot is not self.data_loader.snapshot:
+                # A new shared catalog snapshot was published
+                self._initialized = False
+            if not self._initialized:
+                self._initialize_models()
+                self._initialized = True
+                if settings.scoring_shards > 1:
+                    self.start_shards(settings.scoring_shards)
 
     def _initialize_models(self):
         """Initialize recommendation models."""
         try:
+            self.tag_matrices = {}
+            self.item_rows = {}
+            self._snapshot = self.data_loader.snapshot
+            if self._snapshot is not None:
+                # Score straight from the shared arrays; no per-worker copies
+                self.item_features = {
+                    domain: self._snapshot.item_features(domain) for domain in self._snapshot.domains
+                }
+                for domain, columns in self._snapshot.domains.items():
+                    tags = columns.columns.get("tags_list")
+                    if tags is not None:
+                        self.tag_matrices[domain] = TagMatrix(tags.indptr, tags.indices, tags.vocabulary)
+                app_logger.info("Scoring from shared catalog snapshot {}", self._snapshot.name)
+                return
+            
+            if self._load_artifacts():
+                app_logger.info("Loaded prebuilt content models from {}", settings.model_artifact_path)
+                return
             app_logger.info("Starting model initialization...")
             self._build_content_models()
             if SURPRISE_AVAILABLE:
@@ -45,71 +142,69 @@ class RecommendationEngine:
             # Continue without models - will use simple scoring
             app_logger.warning("Continuing with simplified recommendation logic")
     
-    def _build_content_models(self):
-        """Build content-based recommendation models."""
+    def _load_artifacts(self) -> bool:
+        """Load prebuilt scoring features if they match the current catalog."""
+        path = settings.model_artifact_path
+        if not path or not os.path.exists(path):
+            return False
+        
+        try:
+            with open(path) as f:
+                artifact = json.load(f)
+        except (OSError, ValueError) as e:
+            app_logger.warning("Ignoring unreadable model artifact {}: {}", path, e)
+            return False
+        
+        if artifact.get("version") != self.data_loader.version:
+            app_logger.info("Model artifact {} is stale, rebuilding", path)
+            return False
+        
+        self.item_features = artifact["item_features"]
+        return True
+    
+    def save_artifacts(self, path: Optional[str] = None) -> str:
+        """Write the scoring features so servers can start without scikit-learn."""
+        path = path or settings.model_artifact_path
+        if not self._initialized and not settings.catalog_snapshot_dir:
+            # Stream the catalog files rather than loading them whole
+            self._build_content_models(from_files=True)
+            self._initialized = True
+        else:
+            self._ensure_initialized()
+        
+        artifact = {"version": self.data_loader.version, "item_features": self.item_features}
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(artifact, f, default=lambda value: value.item() if hasattr(value, "item") else str(value))
+        return path
+    
+    @traced()
+    def _build_content_models(self, from_files: bool = False):
+        """Build content-based recommendation models.
+        
+        Builds from the loaded catalog, or streams the catalog files in
+        parallel processes if ``from_files``.
+        """
+        from services.model_builder import build_content_models
+        
         app_logger.info("Building content-based models...")
-        for domain in ['workouts', 'recipes', 'courses']:
-            try:
-                app_logger.info(f"Processing {domain}...")
-                df = data_loader.get_data(domain)
-                if df.empty:
-                    app_logger.warning(f"No data found for {domain}")
-                    continue
-
-                # Create feature text combining tags and other attributes
-                feature_texts = []
-                item_features = []
-
-                for _, item in df.iterrows():
-                    # Combine tags, mood tags, and other text features
-                    features = []
-
-                    if 'tags_list' in item and isinstance(item['tags_list'], list):
-                        features.extend(item['tags_list'])
-
-                    if 'mood_tags' in item and isinstance(item['mood_tags'], list):
-                        features.extend(item['mood_tags'])
-
-                    # Add difficulty if available
-                    if 'difficulty' in item and pd.notna(item['difficulty']):
-                        features.append(str(item['difficulty']).lower())
-
-                    # Add type/category if available
-                    if 'type' in item and pd.notna(item['type']):
-                        features.append(str(item['type']).lower())
-
-                    feature_text = ' '.join(features)
-                    feature_texts.append(feature_text)
-
-                    # Store item features for scoring
-                    item_features.append({
-                        'item_id': item['item_id'],
-                        'tags': item.get('tags_list', []),
-                        'mood_tags': item.get('mood_tags', []),
-                        'duration': item.get('duration_min', 30),
-                        'difficulty': item.get('difficulty', 'intermediate'),
-                        'domain': item['domain']
-                    })
-
-                if feature_texts:
-                    # Build TF-IDF matrix with simpler settings
-                    vectorizer = TfidfVectorizer(
-                        max_features=500,  # Reduced for faster processing
-                        stop_words='english',
-                        ngram_range=(1, 1)  # Only unigrams for speed
-                    )
-                    app_logger.info(f"Building TF-IDF matrix for {domain} with {len(feature_texts)} items")
-                    tfidf_matrix = vectorizer.fit_transform(feature_texts)
-
-                    self.tfidf_vectorizers[domain] = vectorizer
-                    self.content_matrices[domain] = tfidf_matrix
-                    self.item_features[domain] = item_features
-
-                    app_logger.info(f"Built content model for {domain}: {tfidf_matrix.shape}")
-
-            except Exception as e:
-                app_logger.error(f"Error building content model for {domain}: {e}")
-                # Continue with next domain
+        if from_files:
+            sources = self.data_loader.source_paths()
+        else:
+            sources = {domain: self.data_loader.get_data(domain)
+                       for domain in ['workouts', 'recipes', 'courses']}
+        models = build_content_models(sources, settings.model_build_workers)
+        for domain, model in models.items():
+            if not model['item_features']:
+                app_logger.warning(f"No data found for {domain}")
+                continue
+            
+            self.tfidf_vectorizers[domain] = model['vectorizer']
+            self.content_matrices[domain] = model['matrix']
+            self.item_features[domain] = model['item_features']
+            
+            app_logger.info(f"Built content model for {domain}: {model['matrix'].shape}")
+            MODEL_BUILD_DURATION.observe(model['duration_seconds'], domain=domain)
     
     def _build_collaborative_models(self):
         """Build collaborative filtering models using surprise."""
@@ -119,7 +214,7 @@ class RecommendationEngine:
         # Create synthetic interaction data for demo
         # In a real app, this would come from user feedback
         for domain in ['workouts', 'recipes', 'courses']:
-            df = data_loader.get_data(domain)
+            df = self.data_loader.get_data(domain)
             if df.empty:
                 continue
             
@@ -160,15 +255,22 @@ class RecommendationEngine:
             except Exception as e:
                 app_logger.error(f"Error building collaborative model for {domain}: {e}")
     
+    @traced()
     def get_content_recommendations(self, mood: str, interests: List[str],
-                                  available_minutes: int, limit: int = 6) -> List[Dict]:
-        """Get content-based recommendations."""
+                                  available_minutes: int, limit: int = 6,
+                                  user_session: Optional[str] = None,
+                                  filters: Optional[Dict[str, List[str]]] = None) -> List[Dict]:
+        """Get content-based recommendations, leaving out items the session has seen.
+        
+        Facet ``filters`` prune each domain to its matching rows before scoring.
+        """
         recommendations = []
+        seen = self.seen_filters.get(user_session) if user_session else None
 
         # Check if we have any models built
         if not self.item_features:
             app_logger.warning("No content models available, using fallback")
-            return self._get_fallback_recommendations(mood, available_minutes, interests, limit)
+            return self._get_fallback_recommendations(mood, available_minutes, interests, limit, filters)
         
         # Get mood preferences
         domain_weights = mood_mapper.get_domain_weights(mood)
@@ -188,43 +290,146 @@ class RecommendationEngine:
             if domain not in self.item_features:
                 continue
             
-            domain_items = []
-            for item_features in self.item_features[domain]:
-                # Calculate scores
-                mood_score = mood_mapper.calculate_mood_score(
-                    item_features['tags'], mood, item_features['domain']
-                )
-                
-                difficulty_score = mood_mapper.get_difficulty_preference_score(
-                    item_features['difficulty'], mood
-                )
-                
-                # Time fit score
-                duration = item_features['duration']
-                time_score = self._calculate_time_score(
-                    duration, time_constraints['min_duration'], 
-                    time_constraints['max_duration'], time_constraints['optimal_duration']
-                )
-                
-                # Combined content score
-                content_score = (mood_score * 0.4 + difficulty_score * 0.3 + time_score * 0.3)
-                
-                domain_items.append({
-                    'item_id': item_features['item_id'],
-                    'domain': item_features['domain'],
-                    'content_score': content_score,
-                    'mood_score': mood_score,
-                    'time_score': time_score,
-                    'duration': duration
-                })
+            rows = self.facets.filter_rows(domain.rstrip('s'), filters)
+            if rows is not None and not len(rows):
+                continue
             
-            # Sort by score and take top items
-            domain_items.sort(key=lambda x: x['content_score'], reverse=True)
             domain_limit = max(1, int(limit * domain_weights.get(domain.rstrip('s'), 0.33)))
-            recommendations.extend(domain_items[:domain_limit])
+            with span("score_domain", domain=domain):
+                if seen:
+                    # Over-fetch by the most items the filter can exclude
+                    candidates = self._top_domain_items(
+                        domain, mood, time_constraints, domain_limit + len(seen), rows
+                    )
+                    h1, h2 = item_hashes(rec['item_id'] for rec in candidates)
+                    recommendations.extend(exclude_seen(candidates, h1, h2, seen, domain_limit))
+                else:
+                    recommendations.extend(
+                        self._top_domain_items(domain, mood, time_constraints, domain_limit, rows)
+                    )
         
         return recommendations
     
+    def _get_tag_matrix(self, domain: str) -> TagMatrix:
+        """Get the item-tag matrix of a domain, building it on first use."""
+        matrix = self.tag_matrices.get(domain)
+        if matrix is None:
+            tags = self.data_loader.tag_columns.get(domain, {}).get('tags_list')
+            if tags is not None and len(tags) == len(self.item_features[domain]):
+                # Item features follow the loaded catalog's row order
+                matrix = TagMatrix(tags.indptr, tags.indices, tags.vocabulary)
+            else:
+                matrix = TagMatrix.from_lists(features['tags'] for features in self.item_features[domain])
+            self.tag_matrices[domain] = matrix
+        return matrix
+    
+    def _score_domain(self, domain: str, mood: str, time_constraints: Dict,
+                      rows: Optional[np.ndarray] = None) -> List[Dict]:
+        """Score every item of a domain, or only ``rows``, for a mood and time constraints."""
+        features = self.item_features[domain]
+        matrix = self._get_tag_matrix(domain)
+        if rows is not None:
+            features = [features[row] for row in rows.tolist()]
+            matrix = matrix.select(rows)
+        return score_features(features, matrix, mood, domain.rstrip('s'), time_constraints)
+    
+    def _top_domain_items(self, domain: str, mood: str, time_constraints: Dict,
+                          limit: int, rows: Optional[np.ndarray] = None) -> List[Dict]:
+        """Get the best scored items of a domain, scattering to shards if enabled.
+        
+        Filtered ``rows`` are scored in process; pruned, they are cheap.
+        """
+        if self.shard_pool is not None and rows is None:
+            try:
+                return self.shard_pool.top_k(
+                    domain, mood, time_constraints,
+                    mood_mapper.get_tag_weights(mood, domain.rstrip('s')), limit
+                )
+            except Exception as e:
+                app_logger.error("Sharded scoring failed, scoring in process: {}", e)
+        
+        domain_items = self._score_domain(domain, mood, time_constraints, rows)
+        
+        # Sort by score and take top items
+        domain_items.sort(key=lambda x: x['content_score'], reverse=True)
+        return domain_items[:limit]
+    
+    def _get_item_rows(self, domain: str) -> Dict[str, int]:
+        """Get the row of each item of a domain, building the index on first use."""
+        rows = self.item_rows.get(domain)
+        if rows is None:
+            if self._snapshot is not None:
+                item_ids = self._snapshot.domains[domain].columns["item_id"].to_list()
+            else:
+                item_ids = [item['item_id'] for item in self.item_features[domain]]
+            rows = {item_id: i for i, item_id in enumerate(item_ids)}
+            self.item_rows[domain] = rows
+        return rows
+    
+    def get_item_tags(self, item_id: str, domain: Optional[str] = None) -> Optional[List[str]]:
+        """Get an item's tags from the row index, or None for an unknown item.
+        
+        The item's ``domain`` (singular, as in feedback) is looked in first.
+        """
+        self._ensure_initialized()
+        domains = sorted(self.item_features, key=lambda name: name != f"{domain}s")
+        for name in domains:
+            row = self._get_item_rows(name).get(item_id)
+            if row is not None:
+                tags = self.item_features[name][row]['tags']
+                return list(tags) if isinstance(tags, list) else []
+        return None
+    
+    def rerank_for_session(self, candidates: List[Dict], user_session: str) -> List[Dict]:
+        """Add the session profile's affinity to each candidate's content score.
+        
+        The affinity of an item is the mean profile weight of its tags, taken
+        with one sparse product per domain. Sessions without feedback are
+        returned unchanged.
+        """
+        profile = self.session_profiles.get_vector(user_session)
+        if not profile or not candidates:
+            return candidates
+        
+        by_domain: Dict[str, List[int]] = {}
+        for position, rec in enumerate(candidates):
+            by_domain.setdefault(rec['domain'] + 's', []).append(position)
+        
+        reranked = [rec.copy() for rec in candidates]
+        for domain, positions in by_domain.items():
+            if domain not in self.item_features:
+                continue
+            rows = self._get_item_rows(domain)
+            known = [p for p in positions if candidates[p]['item_id'] in rows]
+            if not known:
+                continue
+            batch = self._get_tag_matrix(domain).select([rows[candidates[p]['item_id']] for p in known])
+            affinity = batch.dot(profile) / np.maximum(batch.row_lengths, 1)
+            for position, score in zip(known, affinity.tolist()):
+                reranked[position]['profile_score'] = score
+                reranked[position]['content_score'] += settings.session_profile_weight * score
+        
+        # Stable sort, so untouched candidates keep their order
+        reranked.sort(key=lambda x: x['content_score'], reverse=True)
+        return reranked
+    
+    def start_shards(self, shards: int):
+        """Partition every domain across ``shards`` scoring processes."""
+        from services.sharding import ShardPool
+        
+        self.stop_shards()
+        if shards > 1 and self.item_features:
+            try:
+                self.shard_pool = ShardPool(self.item_features, shards, snapshot=self._snapshot)
+            except Exception as e:
+                app_logger.error("Could not start scoring shards, scoring in process: {}", e)
+    
+    def stop_shards(self):
+        """Stop the scoring processes, if any."""
+        if self.shard_pool is not None:
+            self.shard_pool.close()
+            self.shard_pool = None
+    
     def get_collaborative_recommendations(self, user_session: str, domain: str, 
                                         limit: int = 10) -> List[Dict]:
         """Get collaborative filtering recommendations."""
@@ -261,17 +466,7 @@ class RecommendationEngine:
     
     def _calculate_time_score(self, duration: int, min_dur: int, max_dur: int, optimal_dur: int) -> float:
         """Calculate how well an item's duration fits the time constraints."""
-        if duration < min_dur or duration > max_dur:
-            return 0.1  # Outside acceptable range
-        
-        # Score based on distance from optimal
-        distance_from_optimal = abs(duration - optimal_dur)
-        max_distance = max(optimal_dur - min_dur, max_dur - optimal_dur)
-        
-        if max_distance == 0:
-            return 1.0
-        
-        return max(0.3, 1.0 - (distance_from_optimal / max_distance))
+        return calculate_time_score(duration, min_dur, max_dur, optimal_dur)
     
     def combine_recommendations(self, content_recs: List[Dict], 
                               collaborative_recs: List[Dict]) -> List[Dict]:
@@ -304,41 +499,74 @@ class RecommendationEngine:
         combined_recs.sort(key=lambda x: x['final_score'], reverse=True)
         return combined_recs
     
+    def _combined_candidates(self, mood: str, available_minutes: int, interests: List[str],
+                             content_limit: int, collaborative_limit: int,
+                             user_session: Optional[str] = None,
+                             filters: Optional[Dict[str, List[str]]] = None) -> List[Dict]:
+        """Score content candidates and blend in collaborative scores."""
+        # Ensure models are initialized
+        self._ensure_initialized()
+        # Get content-based recommendations
+        content_recs = self.get_content_recommendations(
+            mood, interests, available_minutes, content_limit, user_session, filters
+        )
+        if user_session:
+            content_recs = self.rerank_for_session(content_recs, user_session)
+
+        # Get collaborative recommendations if available
+        collaborative_recs = []
+        if user_session and SURPRISE_AVAILABLE:
+            for domain in ['workout', 'recipe', 'course']:
+                domain_collab = self.get_collaborative_recommendations(
+                    user_session, domain + 's', collaborative_limit
+                )
+                collaborative_recs.extend(domain_collab)
+
+        # Combine recommendations
+        return self.combine_recommendations(content_recs, collaborative_recs)
+
+    @traced()
     def get_recommendations(self, mood: str, available_minutes: int,
                           interests: List[str], limit: int = 6,
-                          user_session: Optional[str] = None) -> List[Dict]:
+                          user_session: Optional[str] = None,
+                          filters: Optional[Dict[str, List[str]]] = None) -> List[Dict]:
         """Get combined recommendations."""
         try:
-            # Ensure models are initialized
-            self._ensure_initialized()
-            # Get content-based recommendations
-            content_recs = self.get_content_recommendations(
-                mood, interests, available_minutes, limit * 2  # Get more for better selection
+            final_recs = self._combined_candidates(
+                mood, available_minutes, interests,
+                limit * 2, limit, user_session, filters  # Get more for better selection
             )
-
-            # Get collaborative recommendations if available
-            collaborative_recs = []
-            if user_session and SURPRISE_AVAILABLE:
-                for domain in ['workout', 'recipe', 'course']:
-                    domain_collab = self.get_collaborative_recommendations(
-                        user_session, domain + 's', limit
-                    )
-                    collaborative_recs.extend(domain_collab)
-
-            # Combine recommendations
-            final_recs = self.combine_recommendations(content_recs, collaborative_recs)
-
             return final_recs[:limit]
 
         except Exception as e:
             app_logger.error(f"Error getting recommendations: {e}")
             # Fallback to simple recommendations
-            return self._get_fallback_recommendations(mood, available_minutes, interests, limit)
+            return self._get_fallback_recommendations(mood, available_minutes, interests, limit, filters)
+
+    @traced()
+    def get_ranked_recommendations(self, mood: str, available_minutes: int,
+                                   interests: List[str], depth: int,
+                                   user_session: Optional[str] = None,
+                                   filters: Optional[Dict[str, List[str]]] = None) -> List[Dict]:
+        """Get up to ``depth`` candidates ranked across all domains, best first."""
+        try:
+            ranked = self._combined_candidates(
+                mood, available_minutes, interests, depth, depth, user_session, filters
+            )
+        except Exception as e:
+            app_logger.error(f"Error getting ranked recommendations: {e}")
+            ranked = self._get_fallback_recommendations(mood, available_minutes, interests, depth, filters)
+        
+        # Stable sort, so equal scores keep their domain order
+        ranked.sort(key=lambda x: x.get('final_score', x['content_score']), reverse=True)
+        return ranked[:depth]
 
+    @traced()
     def _get_fallback_recommendations(self, mood: str, available_minutes: int,
-                                    interests: List[str], limit: int) -> List[Dict]:
+                                    interests: List[str], limit: int,
+                                    filters: Optional[Dict[str, List[str]]] = None) -> List[Dict]:
         """Fallback recommendations when ML models fail."""
-        app_logger.info("Using fallback recommendation logic")
+        log_event("fallback_used", "INFO", "Using fallback recommendation logic")
         recommendations = []
 
         # Get domain weights based on mood
@@ -356,9 +584,12 @@ class RecommendationEngine:
 
         for domain in active_domains:
             try:
-                df = data_loader.get_data(domain)
+                df = self.data_loader.get_data(domain)
                 if df.empty:
                     continue
+                rows = self.facets.filter_rows(domain.rstrip('s'), filters)
+                if rows is not None:
+                    df = df.iloc[rows]
 
                 # Simple filtering by time and mood
                 filtered_items = []
@@ -394,3 +625,8 @@ class RecommendationEngine:
 
 # Global instance
 recommendation_engine = RecommendationEngine()
+
+
+if __name__ == "__main__":
+    # Prebuild the content models: python -m services.recommender
+    app_logger.info("Wrote model artifact to {}", recommendation_engine.save_artifacts())
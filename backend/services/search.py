@@ -0,0 +1,288 @@
+"""Full-text search over catalog titles, descriptions and tags.
+
+Every item is a document of its title (counted twice), description and
+tags. The index keeps, for each term, the sorted IDs of the documents that
+contain it and their precomputed BM25 weights, so a query is a sparse
+product: the posting lists of the query's terms are gathered and summed per
+document, filters are applied to the matching documents only and the top k
+are partially sorted out. Matches are documents numbered across the domains
+in catalog order, so results are fetched by row position rather than looked
+up by item ID. Tokenized queries are cached in least-recently-used order,
+per index version. The index is rebuilt when the catalog version changes.
+"""
+
+import re
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from core.config import settings
+from core.logging import app_logger
+from core.metrics import MODEL_BUILD_DURATION, record_cache
+from core.tracing import traced
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+DOMAINS = ["workout", "recipe", "course"]
+
+# BM25 term frequency saturation and document length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Title terms count this many times, a simple stand-in for field weights
+TITLE_BOOST = 2
+
+
+def tokenize(text) -> List[str]:
+    """Split text into lowercase alphanumeric terms."""
+    if not isinstance(text, str):
+        return []
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class SearchIndex:
+    """Inverted index of the catalog with BM25 posting weights."""
+    
+    def __init__(self, version: str, domains: np.ndarray, rows: np.ndarray, durations: np.ndarray,
+                 vocabulary: Dict[str, int], indptr: np.ndarray, doc_ids: np.ndarray,
+                 weights: np.ndarray):
+        """Initialize the index."""
+        self.version = version
+        self.domains = domains
+        self.rows = rows
+        self.durations = durations
+        self.vocabulary = vocabulary
+        self.indptr = indptr
+        self.doc_ids = doc_ids
+        self.weights = weights
+    
+    def __len__(self) -> int:
+        """Get the number of documents."""
+        return len(self.domains)
+    
+    @classmethod
+    def build(cls, loader) -> "SearchIndex":
+        """Index every item of the loaded catalog."""
+        domains = []
+        rows = []
+        durations = []
+        vocabulary: Dict[str, int] = {}
+        terms = array("i")
+        doc_lengths = array("i")
+        
+        for code, domain in enumerate(DOMAINS):
+            df = loader.get_data(domain + 's')
+            if df.empty:
+                continue
+            titles = df['title'].tolist()
+            descriptions = df['description'].tolist() if 'description' in df.columns else [None] * len(df)
+            tags = df['tags_list'].tolist() if 'tags_list' in df.columns else [[]] * len(df)
+            
+            for title, description, item_tags in zip(titles, descriptions, tags):
+                tokens = tokenize(title) * TITLE_BOOST + tokenize(description)
+                for tag in item_tags if isinstance(item_tags, list) else []:
+                    tokens.extend(tokenize(tag))
+                terms.extend(vocabulary.setdefault(token, len(vocabulary)) for token in tokens)
+                doc_lengths.append(len(tokens))
+            
+            domains.append(np.full(len(df), code, dtype=np.int8))
+            rows.append(np.arange(len(df), dtype=np.int32))
+            durations.append(df['duration_min'].to_numpy(dtype=np.int32))
+        
+        doc_lengths = np.frombuffer(doc_lengths, dtype=np.int32)
+        documents = len(doc_lengths)
+        size = len(vocabulary)
+        
+        # Term frequency of every (term, document) pair; keyed term first, the
+        # sorted pairs are already posting lists in document order
+        keys = np.frombuffer(terms, dtype=np.int32).astype(np.int64)
+        keys *= documents
+        keys += np.repeat(np.arange(documents, dtype=np.int64), doc_lengths)
+        pairs, frequency = np.unique(keys, return_counts=True)
+        del keys
+        doc_ids = (pairs % documents).astype(np.int32)
+        document_frequency = np.bincount(pairs // documents, minlength=size)
+        del pairs
+        
+        # BM25 weight of each posting, in float32 to halve the temporaries
+        idf = np.log(1 + (documents - document_frequency + 0.5) / (document_frequency + 0.5))
+        average_length = doc_lengths.mean() if documents else 1.0
+        length_norm = (BM25_K1 * (1 - BM25_B + BM25_B * doc_lengths / average_length)).astype(np.float32)
+        frequency = frequency.astype(np.float32)
+        weights = length_norm[doc_ids]
+        weights += frequency
+        np.divide(frequency * (BM25_K1 + 1), weights, out=weights)
+        weights *= np.repeat(idf.astype(np.float32), document_frequency)
+        
+        indptr = np.zeros(size + 1, dtype=np.int64)
+        np.cumsum(document_frequency, out=indptr[1:])
+        return cls(
+            loader.version,
+            np.concatenate(domains) if domains else np.zeros(0, dtype=np.int8),
+            np.concatenate(rows) if rows else np.zeros(0, dtype=np.int32),
+            np.concatenate(durations) if durations else np.zeros(0, dtype=np.int32),
+            vocabulary, indptr, doc_ids, weights
+        )
+    
+    def query_vector(self, query: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the indexed terms of a query and how often each occurs in it."""
+        columns = [self.vocabulary[token] for token in tokenize(query) if token in self.vocabulary]
+        terms, counts = np.unique(np.array(columns, dtype=np.int64), return_counts=True)
+        return terms, counts.astype(np.float32)
+    
+    def _filter(self, keep: np.ndarray, docs, domain: Optional[str], min_minutes: Optional[int],
+                max_minutes: Optional[int]) -> bool:
+        """Clear ``keep`` for ``docs`` outside the filters; return whether any filter applied."""
+        if domain is not None:
+            keep &= self.domains[docs] == DOMAINS.index(domain)
+        if min_minutes is not None:
+            keep &= self.durations[docs] >= min_minutes
+        if max_minutes is not None:
+            keep &= self.durations[docs] <= max_minutes
+        return domain is not None or min_minutes is not None or max_minutes is not None
+    
+    def search(self, terms: np.ndarray, counts: np.ndarray, limit: int,
+               domain: Optional[str] = None, min_minutes: Optional[int] = None,
+               max_minutes: Optional[int] = None) -> Tuple[List[Tuple[int, float]], int]:
+        """Get the best matching documents and the number of matches after filtering."""
+        if not len(terms):
+            return [], 0
+        
+        starts = self.indptr[terms]
+        stops = self.indptr[terms + 1]
+        docs = np.concatenate([self.doc_ids[a:b] for a, b in zip(starts, stops)])
+        postings = np.concatenate([self.weights[a:b] * c for a, b, c in zip(starts, stops, counts)])
+        if len(terms) > 1 and len(docs) * 16 > len(self):
+            # Long posting lists: accumulate and filter over every document;
+            # weights are positive, and a boolean array is quickest to scan
+            dense = np.bincount(docs, postings, minlength=len(self))
+            keep = dense > 0
+            self._filter(keep, slice(None), domain, min_minutes, max_minutes)
+            docs = np.flatnonzero(keep)
+            scores = dense[docs]
+        else:
+            if len(terms) > 1:
+                docs, inverse = np.unique(docs, return_inverse=True)
+                scores = np.bincount(inverse, postings)
+            else:
+                scores = postings
+            keep = np.ones(len(docs), dtype=bool)
+            if self._filter(keep, docs, domain, min_minutes, max_minutes):
+                docs = docs[keep]
+                scores = scores[keep]
+        
+        total = len(docs)
+        if total > limit:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+            docs = docs[top]
+            scores = scores[top]
+        # Best first; ties in catalog order
+        order = np.lexsort((docs, -scores))
+        return list(zip(docs[order].tolist(), scores[order].tolist())), total
+
+
+class CatalogSearch:
+    """Serves searches from an index kept current with the catalog."""
+    
+    def __init__(self, loader=None, cache_size: Optional[int] = None):
+        """Initialize the search service."""
+        self._loader = loader
+        self.cache_size = cache_size if cache_size is not None else settings.search_query_cache_size
+        self.index: Optional[SearchIndex] = None
+        self._queries: "OrderedDict[Tuple[str, str], Tuple[np.ndarray, np.ndarray]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @property
+    def data_loader(self):
+        """Get the catalog loader."""
+        if self._loader is None:
+            from services.data_loader import data_loader
+            self._loader = data_loader
+        return self._loader
+    
+    def ensure_index(self) -> SearchIndex:
+        """Build the index on first use or after the catalog changed."""
+        self.data_loader.ensure_loaded()
+        index = self.index
+        if index is None or index.version != self.data_loader.version:
+            with self._lock:
+                if self.index is None or self.index.version != self.data_loader.version:
+                    with MODEL_BUILD_DURATION.time(domain="search"):
+                        self.index = SearchIndex.build(self.data_loader)
+                    self._queries.clear()
+                    app_logger.info("Built search index of {} items and {} terms",
+                                    len(self.index), len(self.index.vocabulary))
+                index = self.index
+        return index
+    
+    def _query_vector(self, index: SearchIndex, query: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Get a query's vector, from the cache when it was asked recently.
+        
+        Vectors hold term IDs of one index's vocabulary, so they are cached
+        under its version; a search still holding the previous index cannot
+        hand its vectors to searches of the rebuilt one.
+        """
+        text = " ".join(tokenize(query))
+        key = (index.version, text)
+        with self._lock:
+            vector = self._queries.get(key)
+            if vector is not None:
+                self._queries.move_to_end(key)
+        record_cache("search_query", vector is not None)
+        if vector is None:
+            vector = index.query_vector(text)
+            with self._lock:
+                self._queries[key] = vector
+                while len(self._queries) > self.cache_size:
+                    self._queries.popitem(last=False)
+        return vector
+    
+    @traced()
+    def search(self, query: str, limit: int = 10, domain: Optional[str] = None,
+               min_minutes: Optional[int] = None, max_minutes: Optional[int] = None) -> Dict:
+        """Search the catalog, best matches first."""
+        index = self.ensure_index()
+        terms, counts = self._query_vector(index, query)
+        matches, total = index.search(terms, counts, limit, domain, min_minutes, max_minutes)
+        
+        # Fetch each domain's matching rows at once, then restore the ranking
+        positions: Dict[int, List[int]] = {}
+        for doc, _ in matches:
+            positions.setdefault(int(index.domains[doc]), []).append(int(index.rows[doc]))
+        fetched = {
+            code: iter(self.data_loader.get_items_at(DOMAINS[code] + 's', rows))
+            for code, rows in positions.items()
+        }
+        results = [
+            _format_result(next(fetched[int(index.domains[doc])]), score)
+            for doc, score in matches
+        ]
+        return {
+            "query": query,
+            "results": results,
+            "count": len(results),
+            "total_matches": total
+        }
+
+
+def _format_result(item: Dict, score: float) -> Dict:
+    """Format a matching item like a playlist item, with its search score."""
+    return {
+        "domain": item['domain'],
+        "id": str(item['id']),
+        "item_id": item['item_id'],
+        "title": item['title'],
+        "duration_min": int(item['duration_min']),
+        "tags": item.get('tags_list', []),
+        "mood_match": item.get('mood_tags', []),
+        "image": item.get('image', f"/images/{item['domain']}s/default.jpg"),
+        "score": round(score, 3),
+        "difficulty": item.get('difficulty', 'intermediate'),
+        "description": item.get('description', '')
+    }
+
+
+# Global instance
+catalog_search = CatalogSearch()
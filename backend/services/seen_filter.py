@@ -0,0 +1,253 @@
+"""Per-session Bloom filters of items already served or rated.
+
+Each session keeps two filters: one for items it was shown or gave feedback
+on, and one for items it disliked. Candidate scoring masks both against a
+batch of candidates at once. Disliked items are always excluded. Seen items
+are excluded unless a domain would otherwise run short.
+
+A filter holds two generations of ``seen_filter_capacity`` items each. When
+the current generation is full it becomes the previous one and the oldest
+generation is dropped, so the false positive rate stays near
+``seen_filter_error_rate`` however long a session runs. Sessions are kept in
+least-recently-used order within ``seen_filter_max_bytes`` and are rebuilt
+from the feedback table after a restart.
+"""
+
+import hashlib
+import math
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from core.config import settings
+from core.logging import app_logger
+from core.metrics import MODEL_BUILD_DURATION, record_cache
+
+
+def item_hashes(item_ids: Iterable[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Hash item IDs into the two 64-bit values used for double hashing."""
+    digests = b"".join(hashlib.blake2b(str(item_id).encode(), digest_size=16).digest()
+                       for item_id in item_ids)
+    pairs = np.frombuffer(digests, dtype="<u8").reshape(-1, 2)
+    # Keep the step non-zero so an item's positions differ
+    return pairs[:, 0], pairs[:, 1] | np.uint64(1)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over pre-hashed items."""
+    
+    __slots__ = ("size", "hash_count", "bits", "count")
+    
+    def __init__(self, capacity: int, error_rate: float):
+        """Size the filter for ``capacity`` items at the given false positive rate."""
+        self.size = max(8, int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self.hash_count = max(1, int(round(self.size / capacity * math.log(2))))
+        self.bits = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+        self.count = 0
+    
+    def _positions(self, h1: np.ndarray, h2: np.ndarray) -> np.ndarray:
+        """Get the bit positions of each item, one row per item."""
+        steps = np.arange(self.hash_count, dtype=np.uint64)
+        return (h1[:, None] + steps * h2[:, None]) % np.uint64(self.size)
+    
+    def add(self, h1: np.ndarray, h2: np.ndarray):
+        """Add pre-hashed items."""
+        positions = self._positions(h1, h2).ravel()
+        np.bitwise_or.at(self.bits, positions >> np.uint64(3),
+                         np.left_shift(1, positions & np.uint64(7)).astype(np.uint8))
+        self.count += len(h1)
+    
+    def contains(self, h1: np.ndarray, h2: np.ndarray) -> np.ndarray:
+        """Test pre-hashed items, getting a boolean mask."""
+        if not self.count or not len(h1):
+            return np.zeros(len(h1), dtype=bool)
+        positions = self._positions(h1, h2)
+        set_bits = (self.bits[positions >> np.uint64(3)] >> (positions & np.uint64(7)).astype(np.uint8)) & 1
+        return set_bits.all(axis=1)
+    
+    def nbytes(self) -> int:
+        """Get the size of the bit array."""
+        return self.bits.nbytes
+
+
+class RotatingBloomFilter:
+    """Two Bloom filter generations, dropping the older one when the newer fills."""
+    
+    __slots__ = ("capacity", "error_rate", "current", "previous")
+    
+    def __init__(self, capacity: int, error_rate: float):
+        """Initialize an empty filter."""
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.current = BloomFilter(capacity, error_rate)
+        self.previous: Optional[BloomFilter] = None
+    
+    def add(self, h1: np.ndarray, h2: np.ndarray):
+        """Add pre-hashed items, rotating generations as they fill."""
+        start = 0
+        while start < len(h1):
+            if self.current.count >= self.capacity:
+                self.previous = self.current
+                self.current = BloomFilter(self.capacity, self.error_rate)
+            stop = start + self.capacity - self.current.count
+            self.current.add(h1[start:stop], h2[start:stop])
+            start = stop
+    
+    def contains(self, h1: np.ndarray, h2: np.ndarray) -> np.ndarray:
+        """Test pre-hashed items in either generation."""
+        mask = self.current.contains(h1, h2)
+        if self.previous is not None:
+            mask |= self.previous.contains(h1, h2)
+        return mask
+    
+    def __len__(self) -> int:
+        """Get the number of items the filter may hold."""
+        return self.current.count + (self.previous.count if self.previous is not None else 0)
+    
+    def nbytes(self) -> int:
+        """Get the size of both generations at capacity."""
+        return 2 * self.current.nbytes()
+
+
+class SessionSeenFilter:
+    """Seen and disliked items of one session."""
+    
+    __slots__ = ("seen", "disliked")
+    
+    def __init__(self, capacity: int, error_rate: float):
+        """Initialize empty filters."""
+        self.seen = RotatingBloomFilter(capacity, error_rate)
+        self.disliked = RotatingBloomFilter(capacity, error_rate)
+    
+    def __len__(self) -> int:
+        """Get an upper bound on the number of items the filters exclude."""
+        return len(self.seen)
+    
+    def nbytes(self) -> int:
+        """Get the memory held by the filters."""
+        return self.seen.nbytes() + self.disliked.nbytes()
+
+
+class SeenFilterStore:
+    """Session filters in least-recently-used order, bounded by memory."""
+    
+    def __init__(self, capacity: Optional[int] = None, error_rate: Optional[float] = None,
+                 max_bytes: Optional[int] = None):
+        """Initialize the store."""
+        self.capacity = capacity if capacity is not None else settings.seen_filter_capacity
+        self.error_rate = error_rate if error_rate is not None else settings.seen_filter_error_rate
+        self.max_bytes = max_bytes if max_bytes is not None else settings.seen_filter_max_bytes
+        self.session_bytes = SessionSeenFilter(self.capacity, self.error_rate).nbytes()
+        self._filters: "OrderedDict[str, SessionSeenFilter]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._loaded = False
+    
+    def __len__(self) -> int:
+        """Count the sessions with a filter."""
+        return len(self._filters)
+    
+    @property
+    def max_sessions(self) -> int:
+        """Get the number of sessions that fit in the memory budget."""
+        return max(1, self.max_bytes // self.session_bytes)
+    
+    def _session_filter(self, user_session: str) -> SessionSeenFilter:
+        """Get or create a session's filter, evicting the least recently used."""
+        session_filter = self._filters.get(user_session)
+        if session_filter is None:
+            session_filter = SessionSeenFilter(self.capacity, self.error_rate)
+            self._filters[user_session] = session_filter
+            while len(self._filters) > self.max_sessions:
+                self._filters.popitem(last=False)
+        else:
+            self._filters.move_to_end(user_session)
+        return session_filter
+    
+    def record_served(self, user_session: str, item_ids: List[str]):
+        """Mark items shown to a session as seen."""
+        if not item_ids:
+            return
+        self._ensure_loaded()
+        h1, h2 = item_hashes(item_ids)
+        with self._lock:
+            self._session_filter(user_session).seen.add(h1, h2)
+    
+    def record_feedback(self, user_session: str, item_id: str, action: str):
+        """Mark an item a session rated as seen, and as disliked if it was."""
+        self._ensure_loaded()
+        h1, h2 = item_hashes([item_id])
+        with self._lock:
+            session_filter = self._session_filter(user_session)
+            session_filter.seen.add(h1, h2)
+            if action == "dislike":
+                session_filter.disliked.add(h1, h2)
+    
+    def get(self, user_session: str) -> Optional[SessionSeenFilter]:
+        """Get a session's filters, or None for a session with no history."""
+        self._ensure_loaded()
+        with self._lock:
+            session_filter = self._filters.get(user_session)
+            if session_filter is not None:
+                self._filters.move_to_end(user_session)
+        record_cache("seen_filter", session_filter is not None)
+        return session_filter
+    
+    def _ensure_loaded(self):
+        """Rebuild the filters from stored feedback on first use."""
+        if not self._loaded:
+            self.rebuild()
+    
+    def rebuild(self):
+        """Replace the filters with ones rebuilt from the feedback table."""
+        from sqlmodel import Session, select
+        from models.feedback import Feedback, create_db_and_tables, engine
+        
+        self._loaded = True
+        try:
+            with MODEL_BUILD_DURATION.time(domain="seen_filters"):
+                create_db_and_tables()
+                with Session(engine) as session:
+                    rows = session.exec(
+                        select(Feedback.user_session, Feedback.item_id, Feedback.action)
+                        .where(Feedback.user_session.is_not(None))
+                        .order_by(Feedback.id)
+                    ).all()
+                
+                with self._lock:
+                    self._filters.clear()
+                    for user_session, item_id, action in rows:
+                        h1, h2 = item_hashes([item_id])
+                        session_filter = self._session_filter(user_session)
+                        session_filter.seen.add(h1, h2)
+                        if action == "dislike":
+                            session_filter.disliked.add(h1, h2)
+            app_logger.info("Rebuilt seen filters for {} sessions from {} feedback rows",
+                            len(self._filters), len(rows))
+        except Exception as e:
+            app_logger.error("Error rebuilding seen filters: {}", e)
+    
+    def clear(self):
+        """Drop every filter."""
+        with self._lock:
+            self._filters.clear()
+
+
+def exclude_seen(items: List[Dict], h1: np.ndarray, h2: np.ndarray,
+                 session_filter: SessionSeenFilter, limit: int) -> List[Dict]:
+    """Drop disliked and seen items from ranked candidates, best first.
+    
+    Seen items that were not disliked fill in, in rank order, when fewer than
+    ``limit`` unseen candidates remain.
+    """
+    disliked = session_filter.disliked.contains(h1, h2)
+    seen = session_filter.seen.contains(h1, h2)
+    fresh = [item for item, skip in zip(items, seen | disliked) if not skip]
+    if len(fresh) < limit:
+        fresh.extend([item for item, seen_only in zip(items, seen & ~disliked) if seen_only]
+                     [:limit - len(fresh)])
+    return fresh[:limit]
+
+
+# Global instance
+seen_filters = SeenFilterStore()
@@ -0,0 +1,146 @@
+"""Per-session tag preference profiles built from feedback.
+
+A profile is a sparse tag vector: a like adds 1 to each of the item's tags
+and a dislike subtracts 1, and older votes decay with a half-life of
+``session_profile_half_life`` seconds. Decay is kept as one scale factor per
+profile, so an update only touches the item's tags. Profiles live in memory
+in least-recently-used order and are evicted once their estimated size goes
+over ``session_profile_max_bytes``.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from core.config import settings
+from core.logging import app_logger
+from core.metrics import record_cache
+
+# Estimated bytes of a profile and of each tag it holds, for the memory bound
+PROFILE_BYTES = 400
+TAG_BYTES = 120
+
+# Stored weights are divided by the scale; rescale them before it underflows
+MIN_SCALE = 1e-6
+
+
+class SessionProfile:
+    """Decayed like/dislike tag vector of one session."""
+    
+    __slots__ = ("weights", "scale", "updated")
+    
+    def __init__(self, now: float):
+        """Initialize an empty profile."""
+        self.weights: Dict[str, float] = {}
+        self.scale = 1.0
+        self.updated = now
+    
+    def _decay(self, now: float, half_life: float) -> float:
+        """Get the scale factor decayed to ``now``."""
+        elapsed = max(0.0, now - self.updated)
+        return self.scale * 0.5 ** (elapsed / half_life)
+    
+    def add(self, tags: List[str], delta: float, now: float, half_life: float):
+        """Add a vote to each tag, decaying earlier votes."""
+        self.scale = self._decay(now, half_life)
+        self.updated = now
+        if self.scale < MIN_SCALE:
+            self.weights = {tag: weight * self.scale for tag, weight in self.weights.items()}
+            self.scale = 1.0
+        
+        for tag in tags:
+            self.weights[tag] = self.weights.get(tag, 0.0) + delta / self.scale
+    
+    def vector(self, now: float, half_life: float) -> Dict[str, float]:
+        """Get the tag vector, squashed into (-1, 1)."""
+        scale = self._decay(now, half_life)
+        return {tag: math.tanh(weight * scale) for tag, weight in self.weights.items()}
+    
+    def size(self) -> int:
+        """Estimate the memory held by the profile."""
+        return PROFILE_BYTES + TAG_BYTES * len(self.weights)
+
+
+class SessionProfileStore:
+    """Session profiles in least-recently-used order, bounded by memory."""
+    
+    def __init__(self, max_bytes: Optional[int] = None, half_life: Optional[float] = None):
+        """Initialize the store."""
+        self.max_bytes = max_bytes if max_bytes is not None else settings.session_profile_max_bytes
+        self.half_life = half_life if half_life is not None else settings.session_profile_half_life
+        self._profiles: "OrderedDict[str, SessionProfile]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        """Count the stored profiles."""
+        return len(self._profiles)
+    
+    @property
+    def bytes(self) -> int:
+        """Get the estimated memory held by all profiles."""
+        return self._bytes
+    
+    def record(self, user_session: str, tags: List[str], action: str,
+               now: Optional[float] = None):
+        """Fold one like or dislike of an item with these tags into a profile."""
+        if not tags:
+            return
+        now = time.time() if now is None else now
+        delta = 1.0 if action == "like" else -1.0
+        
+        with self._lock:
+            profile = self._profiles.pop(user_session, None)
+            if profile is None:
+                profile = SessionProfile(now)
+            else:
+                self._bytes -= profile.size()
+            profile.add(tags, delta, now, self.half_life)
+            self._profiles[user_session] = profile
+            self._bytes += profile.size()
+            
+            while self._bytes > self.max_bytes and len(self._profiles) > 1:
+                _, evicted = self._profiles.popitem(last=False)
+                self._bytes -= evicted.size()
+    
+    def get_vector(self, user_session: str, now: Optional[float] = None) -> Optional[Dict[str, float]]:
+        """Get a session's tag vector, or None for a session without feedback."""
+        now = time.time() if now is None else now
+        with self._lock:
+            profile = self._profiles.get(user_session)
+            if profile is not None:
+                self._profiles.move_to_end(user_session)
+                # record() changes the weights and scale; read them together
+                vector = profile.vector(now, self.half_life)
+        
+        record_cache("session_profile", profile is not None)
+        if profile is None:
+            return None
+        return vector
+    
+    def clear(self):
+        """Drop every profile."""
+        with self._lock:
+            self._profiles.clear()
+            self._bytes = 0
+
+
+def record_feedback(user_session: Optional[str], item_id: str, action: str,
+                    domain: Optional[str] = None):
+    """Update a session's profile from feedback on a catalog item."""
+    if not user_session:
+        return
+    try:
+        from services.recommender import recommendation_engine
+        tags = recommendation_engine.get_item_tags(item_id, domain)
+        if tags is None:
+            return
+        session_profiles.record(user_session, tags, action)
+    except Exception as e:
+        app_logger.error("Error updating session profile: {}", e)
+
+
+# Global instance
+session_profiles = SessionProfileStore()
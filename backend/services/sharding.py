@@ -0,0 +1,211 @@
+"""Scatter-gather scoring over catalog shards in worker processes.
+
+Each domain's items are split into contiguous row ranges, one per shard
+process. A request is sent to every shard, each shard scores its rows and
+returns its local top-k, and the coordinator merges the sorted lists with
+a heap. Ties are broken by global row position, which is the order the
+single-process engine's stable sort keeps, so results are identical.
+
+Shards attached to a shared catalog snapshot map their rows from it;
+otherwise each shard receives a copy of its partition when it starts.
+Every request carries an ID that its replies echo. A dispatcher thread per
+shard routes each reply to the request waiting for it, so several requests
+can be in flight at once (each shard still scores them one at a time, in
+the order received), and replies to a request that timed out are dropped.
+"""
+
+import heapq
+import itertools
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from core.config import settings
+from core.logging import app_logger
+
+
+def partition(rows: int, shards: int) -> List[Tuple[int, int]]:
+    """Split ``rows`` into ``shards`` contiguous, near-equal ranges."""
+    bounds = [rows * shard // shards for shard in range(shards + 1)]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _rank_key(ranked: Tuple[int, Dict]):
+    """Order by descending score, then by global row position."""
+    return -ranked[1]['content_score'], ranked[0]
+
+
+def local_top_k(items: List[Dict], offset: int, k: int) -> List[Tuple[int, Dict]]:
+    """Get a shard's best ``k`` items, tagged with their global row position."""
+    return heapq.nsmallest(k, enumerate(items, offset), key=_rank_key)
+
+
+def merge_top_k(shard_results: List[List[Tuple[int, Dict]]], k: int) -> List[Dict]:
+    """Merge sorted shard results into the global top ``k``."""
+    merged = heapq.merge(*shard_results, key=_rank_key)
+    return [item for _, item in itertools.islice(merged, k)]
+
+
+def _shard_main(conn, partitions: Dict, snapshot_path: Optional[str]):
+    """Serve scoring requests for one shard until told to stop."""
+    from services.mood_mapper import TagMatrix
+    from services.recommender import score_features
+    
+    shard = {}
+    if snapshot_path:
+        from services.catalog_store import CatalogSnapshot
+        snapshot = CatalogSnapshot(snapshot_path)
+        for domain, (start, stop) in partitions.items():
+            tags = snapshot.domains[domain].columns["tags_list"]
+            matrix = TagMatrix(tags.indptr, tags.indices, tags.vocabulary).rows(start, stop)
+            shard[domain] = (start, snapshot.item_features(domain, start, stop), matrix)
+    else:
+        for domain, (start, features) in partitions.items():
+            shard[domain] = (start, features, TagMatrix.from_lists(f['tags'] for f in features))
+    conn.send("ready")
+    
+    while True:
+        request = conn.recv()
+        if request is None:
+            break
+        request_id, domain, mood, time_constraints, weights, k = request
+        try:
+            start, features, matrix = shard[domain]
+            items = score_features(features, matrix, mood, domain.rstrip('s'), time_constraints, weights)
+            conn.send((request_id, "ok", local_top_k(items, start, k)))
+        except Exception as e:
+            conn.send((request_id, "error", repr(e)))
+    conn.close()
+
+
+class ShardPool:
+    """A fixed set of scoring processes, each owning one slice of every domain."""
+    
+    def __init__(self, item_features: Dict[str, Sequence[Dict]], shards: int, snapshot=None):
+        """Start the shard processes and wait until they are ready."""
+        context = multiprocessing.get_context("spawn")
+        self.shards = shards
+        self.connections = []
+        self.processes = []
+        self._lock = threading.Lock()
+        self._send_locks = []
+        self._dispatchers = []
+        self._pending: Dict[int, List[Future]] = {}
+        self._exited = set()
+        self._request_ids = itertools.count()
+        
+        ranges = {domain: partition(len(features), shards) for domain, features in item_features.items()}
+        for shard in range(shards):
+            if snapshot is not None:
+                partitions = {domain: bounds[shard] for domain, bounds in ranges.items()}
+            else:
+                partitions = {
+                    domain: (bounds[shard][0], list(item_features[domain][slice(*bounds[shard])]))
+                    for domain, bounds in ranges.items()
+                }
+            parent, child = context.Pipe()
+            process = context.Process(
+                target=_shard_main, args=(child, partitions, snapshot.path if snapshot else None),
+                name=f"scoring-shard-{shard}", daemon=True
+            )
+            process.start()
+            child.close()
+            self.connections.append(parent)
+            self.processes.append(process)
+            self._send_locks.append(threading.Lock())
+        
+        try:
+            for connection in self.connections:
+                self._receive(connection)
+        except (EOFError, OSError, TimeoutError):
+            self.close()
+            raise
+        
+        for shard, connection in enumerate(self.connections):
+            dispatcher = threading.Thread(
+                target=self._dispatch, args=(shard, connection),
+                name=f"scoring-shard-{shard}-replies", daemon=True
+            )
+            dispatcher.start()
+            self._dispatchers.append(dispatcher)
+        app_logger.info("Started {} scoring shards", shards)
+    
+    def _receive(self, connection):
+        """Wait for one shard's reply."""
+        if not connection.poll(settings.scoring_shard_timeout):
+            raise TimeoutError("Scoring shard did not reply in time")
+        return connection.recv()
+    
+    def _dispatch(self, shard: int, connection):
+        """Hand each reply from a shard to the request waiting for it."""
+        while True:
+            try:
+                request_id, status, result = connection.recv()
+            except (EOFError, OSError):
+                break
+            with self._lock:
+                waiting = self._pending.get(request_id)
+            if waiting is not None:
+                waiting[shard].set_result((status, result))
+        
+        with self._lock:
+            self._exited.add(shard)
+            waiting = [futures[shard] for futures in self._pending.values()]
+        for future in waiting:
+            if not future.done():
+                future.set_result(("error", "shard process exited"))
+    
+    def top_k(self, domain: str, mood: str, time_constraints: Dict,
+              weights: Dict[str, float], k: int) -> List[Dict]:
+        """Score a domain on every shard and merge their top ``k`` items."""
+        futures = [Future() for _ in self.connections]
+        with self._lock:
+            if self._exited:
+                raise RuntimeError("Scoring shard process exited")
+            request_id = next(self._request_ids)
+            self._pending[request_id] = futures
+        
+        try:
+            request = (request_id, domain, mood, time_constraints, weights, k)
+            for connection, send_lock in zip(self.connections, self._send_locks):
+                with send_lock:
+                    connection.send(request)
+            deadline = time.monotonic() + settings.scoring_shard_timeout
+            replies = []
+            for future in futures:
+                try:
+                    replies.append(future.result(timeout=max(deadline - time.monotonic(), 0)))
+                except TimeoutError:
+                    raise TimeoutError("Scoring shard did not reply in time") from None
+        finally:
+            with self._lock:
+                self._pending.pop(request_id, None)
+        
+        errors = [result for status, result in replies if status != "ok"]
+        if errors:
+            raise RuntimeError(f"Scoring shard failed: {errors[0]}")
+        return merge_top_k([result for _, result in replies], k)
+    
+    def close(self):
+        """Stop every shard process."""
+        for connection, send_lock in zip(self.connections, self._send_locks):
+            try:
+                with send_lock:
+                    connection.send(None)
+            except OSError:
+                pass
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        # The dispatchers stop once their shard has exited and closed its end
+        for dispatcher in self._dispatchers:
+            dispatcher.join(timeout=5)
+        for connection in self.connections:
+            connection.close()
+        self.connections = []
+        self.processes = []
+        self._send_locks = []
+        self._dispatchers = []
@@ -0,0 +1,145 @@
+"""Tests for admission control and degraded-mode playlists."""
+
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+from app import app
+from core.admission import AdmissionController, recommend_admission
+from services.playlist import PlaylistGenerator
+from services.ranked_lists import RankedListStore
+
+client = TestClient(app)
+
+RECOMMEND_REQUEST = {
+    "mood": "calm",
+    "available_minutes": 60,
+    "interests": ["lifestyle", "learning"],
+    "limit": 4
+}
+
+
+class TestAdmissionController:
+    """Test bounding in-flight work and queue wait."""
+    
+    def test_admits_up_to_limit(self):
+        """Test requests within the limit are admitted and slots are released."""
+        controller = AdmissionController("test_limit", max_in_flight=2, max_queue=0,
+                                         max_queue_wait=0.01)
+        
+        assert controller.acquire()
+        assert controller.acquire()
+        assert not controller.acquire()
+        controller.release()
+        assert controller.acquire()
+        assert controller.stats()["shed"]["queue_full"] == 1
+    
+    def test_queue_wait_runs_out(self):
+        """Test a queued request is shed once its wait passes the limit."""
+        controller = AdmissionController("test_wait", max_in_flight=1, max_queue=4,
+                                         max_queue_wait=0.05)
+        controller.acquire()
+        
+        start = time.monotonic()
+        assert not controller.acquire()
+        assert 0.04 <= time.monotonic() - start < 1.0
+        assert controller.waiting == 0
+        assert controller.stats()["shed"]["queue_wait"] == 1
+    
+    def test_wait_counts_from_arrival(self):
+        """Test time queued before asking for a slot counts against the wait."""
+        controller = AdmissionController("test_arrival", max_in_flight=1, max_queue=4,
+                                         max_queue_wait=1.0)
+        controller.acquire()
+        
+        start = time.monotonic()
+        assert not controller.acquire(arrived=time.monotonic() - 2.0)
+        assert time.monotonic() - start < 0.5
+    
+    def test_release_wakes_waiter(self):
+        """Test a waiting request takes the slot freed by another."""
+        controller = AdmissionController("test_wake", max_in_flight=1, max_queue=4,
+                                         max_queue_wait=5.0)
+        controller.acquire()
+        results = []
+        waiter = threading.Thread(target=lambda: results.append(controller.acquire()))
+        waiter.start()
+        while controller.waiting == 0:
+            time.sleep(0.001)
+        
+        controller.release()
+        waiter.join()
+        assert results == [True]
+        assert controller.in_flight == 1
+    
+    def test_disabled_admits_everything(self):
+        """Test a limit of 0 never sheds."""
+        controller = AdmissionController("test_disabled", max_in_flight=0)
+        
+        assert all(controller.acquire() for _ in range(100))
+        assert not controller.queue_full()
+
+
+class TestDegradedPlaylist:
+    """Test cached playlists served under overload."""
+    
+    def test_bucket_and_nearest_bucket(self):
+        """Test the request's bucket is preferred, then the longest shorter one."""
+        generator = PlaylistGenerator()
+        full = generator.generate_playlist("happy", 30, ["lifestyle"], limit=6)
+        
+        result, source = generator.get_degraded_playlist("happy", 30, ["lifestyle"], limit=3)
+        assert source == "bucket"
+        assert result["degraded"] is True
+        assert result["next_cursor"] is None
+        assert result["playlist"] == full["playlist"][:3]
+        
+        result, source = generator.get_degraded_playlist("happy", 60, ["lifestyle"], limit=6)
+        assert source == "nearest_bucket"
+        assert result["total_duration"] <= 30
+    
+    def test_precomputed_fallbacks_keep_no_ranked_lists(self):
+        """Test warming the fallback buckets leaves nothing in the paging store."""
+        generator = PlaylistGenerator(store=RankedListStore())
+        generator.precompute_fallbacks()
+        
+        assert len(generator.ranked_lists) == 0
+        result, source = generator.get_degraded_playlist("happy", 30, ["lifestyle"])
+        assert source == "bucket"
+        assert result["playlist"]
+    
+    def test_session_playlists_are_not_reused(self):
+        """Test personalized playlists never become another session's fallback."""
+        generator = PlaylistGenerator()
+        generator.generate_playlist("tired", 30, ["learning"], limit=6, user_session="private")
+        
+        result, source = generator.get_degraded_playlist("tired", 30, ["learning"])
+        assert source == "empty"
+        assert result["playlist"] == []
+
+
+class TestDegradedEndpoint:
+    """Test /api/recommend under overload."""
+    
+    def test_saturated_requests_get_degraded_playlist(self, monkeypatch):
+        """Test a full queue serves a cached playlist flagged as degraded."""
+        full = client.post("/api/recommend", json=RECOMMEND_REQUEST).json()
+        assert full["degraded"] is False
+        
+        monkeypatch.setattr(recommend_admission, "max_in_flight", 1)
+        monkeypatch.setattr(recommend_admission, "max_queue", 0)
+        shed_before = recommend_admission.stats()["shed"]["queue_full"]
+        recommend_admission.acquire()
+        try:
+            response = client.post("/api/recommend", json=RECOMMEND_REQUEST)
+        finally:
+            recommend_admission.release()
+        
+        assert response.status_code == 200
+        degraded = response.json()
+        assert degraded["degraded"] is True
+        assert degraded["playlist"] == full["playlist"]
+        stats = client.get("/api/health").json()["admission"]
+        assert stats["shed"]["queue_full"] == shed_before + 1
+        assert stats["degraded"]["bucket"] >= 1
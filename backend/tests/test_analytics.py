@@ -0,0 +1,127 @@
+"""Tests for feedback rollups and the analytics endpoint."""
+
+from datetime import date, datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel, create_engine, select
+from app import app
+from models.feedback import (Feedback, FeedbackDomainDaily, FeedbackItemDaily, add_to_rollups,
+                             rebuild_rollups)
+from services.analytics import get_analytics
+
+client = TestClient(app)
+
+VOTES = [
+    ("workout_1", "workout", "like", 1),
+    ("workout_1", "workout", "like", 1),
+    ("workout_2", "workout", "dislike", 1),
+    ("workout_2", "workout", "like", 2),
+    ("recipe_1", "recipe", "like", 3),
+    ("workout_1", "workout", "dislike", 9),
+]
+
+
+@pytest.fixture
+def session():
+    """Get a session on an empty in-memory database with votes recorded."""
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        for item_id, domain, action, day in VOTES:
+            feedback = Feedback(item_id=item_id, domain=domain, action=action,
+                                created_at=datetime(2024, 5, day, 12, tzinfo=timezone.utc))
+            session.add(feedback)
+            add_to_rollups(session, feedback)
+            session.commit()
+        yield session
+
+
+def _rollups(session):
+    """Read both rollup tables as comparable tuples."""
+    items = sorted((r.item_id, r.day, r.domain, r.likes, r.dislikes)
+                   for r in session.exec(select(FeedbackItemDaily)))
+    domains = sorted((r.domain, r.day, r.likes, r.dislikes)
+                     for r in session.exec(select(FeedbackDomainDaily)))
+    return items, domains
+
+
+class TestRollups:
+    """Test the incrementally maintained rollups."""
+    
+    def test_incremental_matches_rebuild(self, session):
+        """Test per-insert updates give the same tables as a full rebuild."""
+        incremental = _rollups(session)
+        
+        assert rebuild_rollups(session) == len(VOTES)
+        assert _rollups(session) == incremental
+        assert ("workout_1", date(2024, 5, 1), "workout", 2, 0) in incremental[0]
+        assert ("workout", date(2024, 5, 1), 2, 1) in incremental[1]
+    
+    def test_votes_are_not_lost_to_stale_rows(self, tmp_path):
+        """Test a vote committed by another connection is not overwritten by a stale read."""
+        engine = create_engine(f"sqlite:///{tmp_path / 'feedback.db'}")
+        SQLModel.metadata.create_all(engine)
+        key = ("workout_1", date(2024, 5, 1))
+        
+        def vote(session):
+            feedback = Feedback(item_id="workout_1", domain="workout", action="like",
+                                created_at=datetime(2024, 5, 1, 12, tzinfo=timezone.utc))
+            session.add(feedback)
+            add_to_rollups(session, feedback)
+        
+        with Session(engine) as first, Session(engine) as second:
+            vote(first)
+            first.commit()
+            # The first session still holds the row it read
+            row = first.get(FeedbackItemDaily, key)
+            assert row.likes == 1
+            
+            vote(second)
+            second.commit()
+            vote(first)
+            first.commit()
+            
+            first.refresh(row)
+            assert row.likes == 3
+            assert first.get(FeedbackDomainDaily, ("workout", date(2024, 5, 1))).likes == 3
+    
+    def test_analytics_window(self, session):
+        """Test the summary only counts days inside the window."""
+        result = get_analytics(session, days=3, today=date(2024, 5, 3))
+        
+        assert result["start"] == "2024-05-01"
+        assert result["domains"] == [
+            {"domain": "recipe", "likes": 1, "dislikes": 0, "like_rate": 1.0},
+            {"domain": "workout", "likes": 3, "dislikes": 1, "like_rate": 0.75},
+        ]
+        assert [item["item_id"] for item in result["top_items"]] == ["workout_1", "recipe_1", "workout_2"]
+        assert result["top_items"][0]["likes"] == 2
+    
+    def test_analytics_by_domain_and_mood(self, session):
+        """Test filtering by domain and by the catalog's mood tags."""
+        by_domain = get_analytics(session, days=10, domain="recipe", today=date(2024, 5, 10))
+        by_mood = get_analytics(session, days=10, mood="energized", today=date(2024, 5, 10))
+        
+        assert [item["item_id"] for item in by_domain["top_items"]] == ["recipe_1"]
+        assert {row["domain"] for row in by_domain["daily"]} == {"recipe"}
+        assert "workout_1" in [item["item_id"] for item in by_mood["top_items"]]
+
+
+class TestAnalyticsEndpoint:
+    """Test the analytics endpoint."""
+    
+    def test_feedback_is_counted(self):
+        """Test new feedback shows up in today's rollups."""
+        before = client.get("/api/analytics", params={"days": 1, "domain": "course"}).json()
+        client.post("/api/feedback", json={"item_id": "course_2", "domain": "course", "action": "like"})
+        after = client.get("/api/analytics", params={"days": 1, "domain": "course"}).json()
+        
+        likes_before = sum(row["likes"] for row in before["domains"])
+        assert sum(row["likes"] for row in after["domains"]) == likes_before + 1
+    
+    def test_invalid_parameters(self):
+        """Test out-of-range parameters are rejected."""
+        assert client.get("/api/analytics", params={"days": 0}).status_code == 400
+        assert client.get("/api/analytics", params={"mood": "bored"}).status_code == 400
+        assert client.get("/api/analytics", params={"domain": "books"}).status_code == 400
@@ -38,6 +38,17 @@ class TestHealthEndpoint:
         assert "mood_options" in config
         assert "time_options" in config
         assert "interest_options" in config
+    
+    def test_metadata_histograms(self):
+        """Test metadata exposes per-domain mood and tag histograms."""
+        summary = client.get("/api/metadata").json()["data_summary"]
+        
+        for domain, count in summary["domains"].items():
+            assert sum(summary["mood_histogram"][domain].values()) >= count
+            tag_counts = list(summary["tag_histogram"][domain].values())
+            assert tag_counts == sorted(tag_counts, reverse=True)
+            assert summary["duration_ranges"][domain]["min"] >= summary["duration_range"]["min"]
+        assert summary["moods"] == sorted(summary["moods"])
 
 
 class TestRecommendationEndpoint:
@@ -85,6 +96,40 @@ class TestRecommendationEndpoint:
         data = response.json()
         assert len(data["playlist"]) <= 6
     
+    def test_recommendation_pages_follow_cursor(self):
+        """Test follow-up pages continue the ranked list without repeats."""
+        request_data = {
+            "mood": "calm",
+            "available_minutes": 60,
+            "interests": ["lifestyle", "learning"],
+            "limit": 4
+        }
+        
+        data = client.post("/api/recommend", json=request_data).json()
+        seen = [item["item_id"] for item in data["playlist"]]
+        cursor = data["next_cursor"]
+        assert cursor
+        
+        scores = []
+        while cursor:
+            response = client.get("/api/recommend/more", params={"cursor": cursor, "limit": 5})
+            assert response.status_code == 200
+            page = response.json()
+            assert len(page["items"]) <= 5
+            seen.extend(item["item_id"] for item in page["items"])
+            scores.extend(item["score"] for item in page["items"])
+            assert all(item["duration_min"] <= 60 for item in page["items"])
+            cursor = page["next_cursor"]
+        
+        assert len(seen) == len(set(seen))
+        assert scores == sorted(scores, reverse=True)
+    
+    def test_recommendation_page_unknown_cursor(self):
+        """Test an unknown cursor returns 404."""
+        response = client.get("/api/recommend/more", params={"cursor": "missing.0"})
+        
+        assert response.status_code == 404
+    
     def test_get_recommendations_invalid_mood(self):
         """Test recommendation endpoint with invalid mood."""
         request_data = {
@@ -155,6 +200,24 @@ class TestFeedbackEndpoint:
         assert "message" in data
         assert data["status"] == "ok"
     
+    def test_feedback_updates_session_profile(self):
+        """Test feedback with a session folds the item's tags into its profile."""
+        from services.session_profiles import session_profiles
+        
+        feedback_data = {
+            "item_id": "workout_1",
+            "domain": "workout",
+            "action": "like",
+            "user_session": "profile_user"
+        }
+        
+        response = client.post("/api/feedback", json=feedback_data)
+        
+        assert response.status_code == 200
+        vector = session_profiles.get_vector("profile_user")
+        assert vector is not None
+        assert vector["hiit"] > 0
+    
     def test_submit_feedback_dislike(self):
         """Test submitting dislike feedback."""
         feedback_data = {
@@ -276,6 +339,61 @@ class TestQuickSuggestionsEndpoint:
         assert response.status_code == 400
 
 
+class TestConditionalRequests:
+    """Test ETag and conditional GET handling on read endpoints."""
+    
+    def test_metadata_returns_cache_headers(self):
+        """Test metadata endpoint sets ETag and Cache-Control."""
+        response = client.get("/api/metadata")
+        
+        assert response.status_code == 200
+        assert response.headers["etag"].startswith('"')
+        assert "max-age" in response.headers["cache-control"]
+    
+    def test_metadata_not_modified(self):
+        """Test metadata endpoint returns 304 for a matching ETag."""
+        etag = client.get("/api/metadata").headers["etag"]
+        
+        response = client.get("/api/metadata", headers={"If-None-Match": etag})
+        
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+    
+    def test_stale_etag_returns_full_response(self):
+        """Test a non-matching ETag returns the full response."""
+        response = client.get(
+            "/api/quick-suggestions?available_minutes=10",
+            headers={"If-None-Match": '"stale"'}
+        )
+        
+        assert response.status_code == 200
+        assert "suggestions" in response.json()
+    
+    def test_etag_depends_on_parameters(self):
+        """Test ETags differ between request parameters."""
+        short = client.get("/api/quick-suggestions?available_minutes=10")
+        longer = client.get("/api/quick-suggestions?available_minutes=30")
+        
+        assert short.headers["etag"] != longer.headers["etag"]
+        
+        response = client.get(
+            "/api/quick-suggestions?available_minutes=30",
+            headers={"If-None-Match": f'W/{longer.headers["etag"]}, "other"'}
+        )
+        assert response.status_code == 304
+    
+    def test_similar_items_not_modified(self):
+        """Test similar items endpoint honours If-None-Match."""
+        etag = client.get("/api/similar/workout_1?limit=3").headers["etag"]
+        
+        response = client.get(
+            "/api/similar/workout_1?limit=3", headers={"If-None-Match": etag}
+        )
+        
+        assert response.status_code == 304
+
+
 class TestRootEndpoint:
     """Test root endpoint."""
     
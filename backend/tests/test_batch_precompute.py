@@ -0,0 +1,215 @@
+"""Tests for offline playlist precomputation and serving."""
+
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from app import app
+from models.feedback import Feedback, PrecomputedPlaylist, create_db_and_tables, engine
+from services.batch_precompute import (batch_generator, compute_sessions, likely_interests,
+                                       likely_moods, precompute_playlists, precomputed_key,
+                                       take_precomputed)
+from services.seen_filter import item_hashes, seen_filters
+
+client = TestClient(app)
+
+NOW = datetime(2024, 5, 20, 12, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def db_engine(tmp_path):
+    """Create a feedback database with two active sessions and one inactive."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'feedback.db'}")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        for user_session, item_id, domain, action, days_ago in [
+            ("user_a", "workout_2", "workout", "like", 1),
+            ("user_a", "recipe_2", "recipe", "like", 2),
+            ("user_b", "course_1", "course", "like", 1),
+            ("user_b", "course_2", "course", "dislike", 3),
+            ("user_old", "workout_1", "workout", "like", 30)
+        ]:
+            session.add(Feedback(item_id=item_id, domain=domain, action=action,
+                                 user_session=user_session,
+                                 created_at=NOW - timedelta(days=days_ago)))
+        session.commit()
+    return engine
+
+
+def _stored(engine):
+    """Get the stored playlists by key."""
+    with Session(engine) as session:
+        return {row.key: row for row in session.exec(select(PrecomputedPlaylist))}
+
+
+class TestLikelyRequests:
+    """Test deriving a session's likely requests from its feedback."""
+    
+    def test_moods_ranked_by_likes(self):
+        """Test moods carried by more liked items come first, ties in option order."""
+        assert likely_moods([["calm"], ["calm", "tired"], ["tired"], ["calm"]], 2) == ["calm", "tired"]
+        assert likely_moods([], 2) == ["energized", "calm"]
+    
+    def test_interests_cover_rated_domains(self):
+        """Test interests follow the domains of the session's feedback."""
+        assert likely_interests(["course"]) == ["learning"]
+        assert likely_interests(["recipe", "course"]) == ["lifestyle", "learning"]
+        assert likely_interests([]) == ["lifestyle", "learning"]
+    
+    def test_key_ignores_interest_order(self):
+        """Test requests naming the same interests share a key."""
+        assert (precomputed_key("s", "calm", 30, ["learning", "lifestyle"], 6)
+                == precomputed_key("s", "calm", 30, ["lifestyle", "learning"], 6))
+
+
+class TestPrecompute:
+    """Test the batch job."""
+    
+    def test_active_sessions_get_playlists(self, db_engine):
+        """Test each active session gets a playlist per likely mood and time."""
+        result = precompute_playlists(active_days=7, workers=1, chunk_size=1, now=NOW, db_engine=db_engine)
+        
+        assert result["active_sessions"] == 2
+        assert result["sessions"] == 2
+        assert result["playlists"] == 2 * 2 * 5
+        assert result["playlists_per_second"] > 0
+        
+        stored = _stored(db_engine)
+        assert {row.user_session for row in stored.values()} == {"user_a", "user_b"}
+        row = stored[precomputed_key("user_b", "calm", 60, ["learning"], 6)]
+        payload = json.loads(row.payload)
+        assert payload["result"]["playlist"]
+        assert all(item["domain"] == "course" for item in payload["result"]["playlist"])
+        assert "next_cursor" not in payload["result"]
+    
+    def test_rerun_resumes(self, db_engine):
+        """Test a second run only computes sessions without stored playlists."""
+        precompute_playlists(active_days=7, workers=1, now=NOW, db_engine=db_engine)
+        with Session(db_engine) as session:
+            for row in session.exec(select(PrecomputedPlaylist).where(PrecomputedPlaylist.user_session == "user_b")):
+                session.delete(row)
+            session.commit()
+        
+        result = precompute_playlists(active_days=7, workers=1, now=NOW, db_engine=db_engine)
+        
+        assert result["skipped_sessions"] == 1
+        assert result["sessions"] == 1
+        assert len(_stored(db_engine)) == 20
+    
+    def test_newer_feedback_is_not_overwritten(self, db_engine):
+        """Test sessions with feedback after the run started are left out."""
+        with Session(db_engine) as session:
+            session.add(Feedback(item_id="workout_3", domain="workout", action="like",
+                                 user_session="user_a", created_at=NOW + timedelta(minutes=1)))
+            session.commit()
+        
+        result = precompute_playlists(active_days=7, workers=1, now=NOW, db_engine=db_engine)
+        
+        assert result["sessions"] == 2
+        assert {row.user_session for row in _stored(db_engine).values()} == {"user_b"}
+    
+    def test_worker_processes_match_in_process(self, db_engine):
+        """Test playlists from worker processes equal ones computed in process."""
+        precompute_playlists(active_days=7, workers=2, chunk_size=1, now=NOW, db_engine=db_engine)
+        parallel = {key: json.loads(row.payload)["result"]["playlist"]
+                    for key, row in _stored(db_engine).items()}
+        
+        rows = [("user_a", [("workout_2", "workout", "like", (NOW - timedelta(days=1)).timestamp()),
+                            ("recipe_2", "recipe", "like", (NOW - timedelta(days=2)).timestamp())])]
+        local = {row["key"]: json.loads(row["payload"])["result"]["playlist"]
+                 for row in compute_sessions(rows, 6, 2, batch_generator())}
+        
+        assert local
+        for key, playlist in local.items():
+            assert [item["item_id"] for item in parallel[key]] == [item["item_id"] for item in playlist]
+
+
+class TestServing:
+    """Test /api/recommend serving stored playlists."""
+    
+    def test_served_once_then_online(self):
+        """Test a stored playlist is served for its request, once."""
+        create_db_and_tables()
+        user_session = f"precompute_{uuid.uuid4().hex}"
+        rows = compute_sessions([(user_session, [("course_1", "course", "like", NOW.timestamp())])],
+                                6, 1, batch_generator())
+        with Session(engine) as session:
+            session.add_all([PrecomputedPlaylist(**row) for row in rows])
+            session.commit()
+        request = {"mood": "energized", "available_minutes": 60, "interests": ["learning"],
+                   "user_session": user_session}
+        
+        first = client.post("/api/recommend", json=request).json()
+        assert first["precomputed"] is True
+        stored = json.loads(next(row for row in rows if row["key"] == precomputed_key(
+            user_session, "energized", 60, ["learning"], 6))["payload"])
+        assert [item["item_id"] for item in first["playlist"]] == \
+            [item["item_id"] for item in stored["result"]["playlist"]]
+        if first["next_cursor"]:
+            assert client.get("/api/recommend/more", params={"cursor": first["next_cursor"]}).status_code == 200
+        
+        second = client.post("/api/recommend", json=request).json()
+        assert "precomputed" not in second
+        # Served items are seen by the session, as after an online playlist
+        seen = seen_filters.get(user_session)
+        assert seen.seen.contains(*item_hashes(item["item_id"] for item in first["playlist"])).all()
+    
+    def test_feedback_drops_session_playlists(self):
+        """Test new feedback from a session drops its stored playlists."""
+        create_db_and_tables()
+        user_session = f"precompute_{uuid.uuid4().hex}"
+        rows = compute_sessions([(user_session, [("course_1", "course", "like", NOW.timestamp())])],
+                                6, 1, batch_generator())
+        with Session(engine) as session:
+            session.add_all([PrecomputedPlaylist(**row) for row in rows])
+            session.commit()
+        
+        response = client.post("/api/feedback", json={
+            "item_id": "course_2", "domain": "course", "action": "like", "user_session": user_session
+        })
+        assert response.status_code == 200
+        
+        result = client.post("/api/recommend", json={
+            "mood": "energized", "available_minutes": 60, "interests": ["learning"], "user_session": user_session
+        }).json()
+        assert "precomputed" not in result
+        with Session(engine) as session:
+            assert not session.exec(select(PrecomputedPlaylist)
+                                    .where(PrecomputedPlaylist.user_session == user_session)).all()
+    
+    def test_playlist_with_seen_items_is_computed_online(self):
+        """Test a stored playlist is passed over once the session was shown one of its items."""
+        create_db_and_tables()
+        user_session = f"precompute_{uuid.uuid4().hex}"
+        rows = compute_sessions([(user_session, [("course_1", "course", "like", NOW.timestamp())])],
+                                6, 1, batch_generator())
+        with Session(engine) as session:
+            session.add_all([PrecomputedPlaylist(**row) for row in rows])
+            session.commit()
+        stored = json.loads(next(row for row in rows if row["key"] == precomputed_key(
+            user_session, "energized", 60, ["learning"], 6))["payload"])
+        
+        # Shown online for another request after the batch ran
+        seen_filters.record_served(user_session, [stored["result"]["playlist"][0]["item_id"]])
+        
+        result = client.post("/api/recommend", json={
+            "mood": "energized", "available_minutes": 60, "interests": ["learning"], "user_session": user_session
+        }).json()
+        assert "precomputed" not in result
+        assert result["playlist"]
+    
+    def test_lookup_creates_missing_table(self, tmp_path, monkeypatch):
+        """Test a lookup before the tables exist creates them rather than failing."""
+        import models.feedback
+        
+        fresh = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+        monkeypatch.setattr(models.feedback, "engine", fresh)
+        monkeypatch.setattr(models.feedback, "_tables_created", False)
+        
+        assert take_precomputed("nobody", "calm", 30, ["learning"], 6) is None
+        with Session(fresh) as session:
+            assert session.exec(select(PrecomputedPlaylist)).all() == []
@@ -0,0 +1,98 @@
+"""Tests for the benchmark tooling."""
+
+import asyncio
+
+import pytest
+from app import app
+from benchmarks.catalog_generator import generate_catalog, generate_domain
+from benchmarks.load_test import parse_mix, run_load_test
+from benchmarks.stats import compare_to_baseline, summarize
+from services.data_loader import DataLoader
+from services.mood_mapper import MoodMapper
+
+
+class TestCatalogGenerator:
+    """Test the synthetic catalog generator."""
+    
+    def test_generator_is_deterministic(self):
+        """Test the same seed produces the same catalog."""
+        first = generate_domain("workouts", 200, seed=7)
+        second = generate_domain("workouts", 200, seed=7)
+        
+        assert first.equals(second)
+        assert not first.equals(generate_domain("workouts", 200, seed=8))
+    
+    def test_generator_matches_csv_schema(self):
+        """Test generated catalogs have the bundled CSV columns."""
+        catalog = generate_catalog(50)
+        
+        for domain in ["workouts", "recipes", "courses"]:
+            bundled = DataLoader().data_cache[domain]
+            assert list(catalog[domain].columns) == list(bundled.columns)
+            assert len(catalog[domain]) == 50
+    
+    def test_tags_follow_mood_preferences(self):
+        """Test most tags come from the item's mood preferences."""
+        df = generate_domain("workouts", 500)
+        mapper = MoodMapper()
+        
+        matches = 0
+        total = 0
+        for mood, tags in zip(df["mood_tag"], df["tags"]):
+            preferred = set(mapper.get_preferred_tags(mood, "workout"))
+            tag_list = tags.split(",")
+            matches += sum(tag in preferred for tag in tag_list)
+            total += len(tag_list)
+        
+        assert matches / total > 0.5
+
+
+class TestStats:
+    """Test benchmark statistics helpers."""
+    
+    def test_summarize(self):
+        """Test summary statistics are in milliseconds."""
+        stats = summarize([0.001, 0.002, 0.003])
+        
+        assert stats["runs"] == 3
+        assert stats["p50_ms"] == pytest.approx(2.0)
+        assert stats["max_ms"] == pytest.approx(3.0)
+    
+    def test_compare_to_baseline(self):
+        """Test only slowdowns beyond the tolerance are reported."""
+        baseline = {"1000": {"scoring": {"p50_ms": 10.0}, "curation": {"p50_ms": 1.0}}}
+        current = {"1000": {"scoring": {"p50_ms": 20.0}, "curation": {"p50_ms": 1.1}}}
+        
+        regressions = compare_to_baseline(current, baseline, tolerance=0.25)
+        
+        assert len(regressions) == 1
+        assert regressions[0]["stage"] == "scoring"
+        assert regressions[0]["ratio"] == 2.0
+
+
+class TestLoadTest:
+    """Test the in-process load test harness."""
+    
+    def test_parse_mix(self):
+        """Test request mix parsing."""
+        assert parse_mix("recommend=3,quick=1") == {"recommend": 3, "quick": 1}
+        
+        with pytest.raises(ValueError):
+            parse_mix("unknown=1")
+    
+    def test_run_load_test(self):
+        """Test a short load run reports every endpoint in the mix."""
+        mix = {"recommend": 1, "similar": 1, "quick": 1}
+        results = asyncio.run(run_load_test(app, mix, concurrency=3, total_requests=15))
+        
+        assert results["overall"]["requests"] == 15
+        assert set(results["endpoints"]) == set(mix)
+        for stats in results["endpoints"].values():
+            assert set(stats["statuses"]) <= {"200"}
+            if stats["requests"]:
+                assert stats["latency"]["p99_ms"] <= stats["latency"]["max_ms"]
+        assert "p99_ms" in results["event_loop_lag"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,72 @@
+"""Tests for request capture and replay."""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from app import app
+from benchmarks.replay import replay
+from core.capture import (
+    CaptureLog,
+    RequestCaptureMiddleware,
+    anonymize_session,
+    read_capture_log,
+    sanitize_body,
+)
+
+
+class TestSanitizeBody:
+    """Test request body sanitization."""
+    
+    def test_drops_unknown_fields_and_pseudonymizes_session(self):
+        """Test only whitelisted fields are kept and sessions are hashed."""
+        body = b'{"mood": "calm", "available_minutes": 30, "interests": ["learning"], ' \
+               b'"user_session": "alice", "email": "alice@example.com"}'
+        
+        sanitized = sanitize_body("/api/recommend", body)
+        
+        assert "email" not in sanitized
+        assert sanitized["mood"] == "calm"
+        assert sanitized["user_session"] == anonymize_session("alice")
+        assert sanitized["user_session"] != "alice"
+    
+    def test_invalid_json(self):
+        """Test malformed bodies are recorded as empty."""
+        assert sanitize_body("/api/feedback", b"{not json") is None
+
+
+class TestCaptureAndReplay:
+    """Test capturing requests and replaying them."""
+    
+    def test_capture_and_replay(self, tmp_path):
+        """Test captured requests can be replayed against the app."""
+        log_path = str(tmp_path / "capture.jsonl")
+        capture_log = CaptureLog(log_path)
+        client = TestClient(RequestCaptureMiddleware(app, capture_log))
+        
+        client.post("/api/recommend", json={
+            "mood": "happy", "available_minutes": 30, "interests": ["lifestyle"],
+            "user_session": "replay_user"
+        })
+        client.post("/api/feedback", json={
+            "item_id": "workout_1", "domain": "workout", "action": "like",
+            "user_session": "replay_user"
+        })
+        client.get("/api/health")  # not captured
+        capture_log.close()
+        
+        records = list(read_capture_log(log_path))
+        assert [record["p"] for record in records] == ["/api/recommend", "/api/feedback"]
+        assert all(record["s"] == 200 for record in records)
+        assert records[0]["t"] <= records[1]["t"]
+        
+        for speed in [100.0, None]:
+            results = asyncio.run(replay(app, records, speed=speed, concurrency=2))
+            
+            assert results["overall"]["requests"] == 2
+            assert results["status_mismatches"] == 0
+            assert set(results["endpoints"]) == {"recommend", "feedback"}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
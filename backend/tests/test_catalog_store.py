@@ -0,0 +1,109 @@
+"""Tests for shared catalog snapshots."""
+
+import json
+import os
+
+import pytest
+from core.config import settings
+from services.catalog_store import attach_snapshot, current_snapshot_name, publish_snapshot
+from services.data_loader import DataLoader
+from services.recommender import RecommendationEngine
+
+
+@pytest.fixture(scope="module")
+def csv_loader():
+    """Load the bundled catalog from CSV."""
+    return DataLoader()
+
+
+@pytest.fixture
+def snapshot_dir(tmp_path, csv_loader, monkeypatch):
+    """Publish the bundled catalog and configure workers to attach it."""
+    root = str(tmp_path / "snapshots")
+    publish_snapshot(csv_loader.processed_data, csv_loader.version, root)
+    monkeypatch.setattr(settings, "catalog_snapshot_dir", root)
+    monkeypatch.setattr(settings, "catalog_snapshot_check_interval", 0.0)
+    return root
+
+
+class TestCatalogSnapshot:
+    """Test publishing and attaching snapshots."""
+    
+    def test_round_trip(self, snapshot_dir, csv_loader):
+        """Test every domain reads back with the same values."""
+        snapshot = attach_snapshot(snapshot_dir)
+        
+        assert snapshot.version == csv_loader.version
+        for domain, df in csv_loader.processed_data.items():
+            restored = snapshot.to_frame(domain)
+            assert list(restored.columns) == list(df.columns)
+            assert restored["item_id"].tolist() == df["item_id"].tolist()
+            assert restored["tags_list"].tolist() == df["tags_list"].tolist()
+            assert restored["duration_min"].tolist() == df["duration_min"].tolist()
+    
+    def test_get_item(self, snapshot_dir, csv_loader):
+        """Test item lookups match the CSV loader without building DataFrames."""
+        loader = DataLoader()
+        
+        assert loader.snapshot is not None
+        assert loader.get_item_by_id("recipe_3")["title"] == csv_loader.get_item_by_id("recipe_3")["title"]
+        assert loader.get_item_by_id("missing_1") is None
+        assert loader.processed_data.frames == {}
+    
+    def test_summary_is_precomputed(self, snapshot_dir, csv_loader):
+        """Test the metadata summary is published with the snapshot."""
+        loader = DataLoader()
+        
+        assert loader.get_metadata() == csv_loader.get_metadata()
+        assert loader.get_metadata() is loader.get_metadata()
+        assert loader.processed_data.frames == {}
+    
+    def test_features_match_built_models(self, snapshot_dir, csv_loader, monkeypatch):
+        """Test scoring from the snapshot gives the same recommendations."""
+        monkeypatch.setattr(settings, "model_artifact_path", "")
+        shared = RecommendationEngine(loader=DataLoader())
+        built = RecommendationEngine(loader=csv_loader)
+        
+        for mood in ["calm", "energized"]:
+            expected = built.get_recommendations(mood, 45, ["lifestyle", "learning"])
+            assert expected
+            assert shared.get_recommendations(mood, 45, ["lifestyle", "learning"]) == expected
+        assert shared.content_matrices == {}
+    
+    def test_older_preprocessing_is_not_attached(self, snapshot_dir):
+        """Test a snapshot published by an older preprocessing is passed over for the CSV files."""
+        path = os.path.join(snapshot_dir, current_snapshot_name(snapshot_dir), "meta.json")
+        with open(path) as f:
+            meta = json.load(f)
+        del meta["preprocess_version"]
+        with open(path, "w") as f:
+            json.dump(meta, f)
+        
+        loader = DataLoader()
+        
+        assert loader.snapshot is None
+        assert not loader.get_data("recipes").empty
+    
+    def test_lazy_loader_reports_snapshot_version(self, snapshot_dir, csv_loader):
+        """Test a lazy loader attaches the snapshot before reporting its version."""
+        publish_snapshot(csv_loader.processed_data, "published", snapshot_dir)
+        loader = DataLoader(autoload=False)
+        
+        assert loader.current_version() == "published"
+        assert loader.snapshot is not None
+    
+    def test_pointer_swap(self, snapshot_dir, csv_loader):
+        """Test workers switch to a newly published snapshot and old ones are pruned."""
+        loader = DataLoader()
+        engine = RecommendationEngine(loader=loader)
+        engine._ensure_initialized()
+        first = loader.snapshot
+        
+        publish_snapshot(csv_loader.processed_data, csv_loader.version, snapshot_dir)
+        publish_snapshot(csv_loader.processed_data, csv_loader.version, snapshot_dir)
+        engine._ensure_initialized()
+        
+        assert loader.snapshot.name == current_snapshot_name(snapshot_dir) != first.name
+        assert engine._snapshot is loader.snapshot
+        assert not os.path.exists(first.path)
+        assert loader.get_item_by_id("course_1") is not None
@@ -0,0 +1,83 @@
+"""Tests for typed catalog ingestion."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from app import app
+from core.config import settings
+from services.data_loader import DataLoader, encode_tags, preprocess_frame
+
+
+@pytest.fixture(scope="module")
+def loader():
+    """Catalog loaded from the bundled CSV files."""
+    return DataLoader()
+
+
+class TestEncodeTags:
+    """Test parsing tag text into flat arrays."""
+    
+    def test_codes_and_lists_agree(self):
+        """Test every row decodes to the same tags as its list."""
+        column = encode_tags(pd.Series(["Yoga, calm", "quick", None, "yoga,calm", "quick"]))
+        
+        decoded = [[column.vocabulary[j] for j in column.indices[column.indptr[i]:column.indptr[i + 1]]]
+                   for i in range(len(column))]
+        assert decoded == [["yoga", "calm"], ["quick"], [], ["yoga", "calm"], ["quick"]]
+        assert [list(tags) for tags in column.lists] == decoded
+        assert column.indices.dtype == np.int32
+    
+    def test_same_text_shares_one_list(self):
+        """Test rows with the same tag text share a list and interned strings."""
+        column = encode_tags(pd.Series(["a,b", "a,b", "b"]))
+        
+        assert column.lists[0] is column.lists[1]
+        assert column.lists[0][1] is column.lists[2][0]
+
+
+class TestPreprocessing:
+    """Test typed, compact preprocessing of the catalog."""
+    
+    def test_recipe_cook_time_is_duration(self, loader):
+        """Test recipes take their duration from cook_time_min."""
+        raw = loader.data_cache["recipes"]
+        recipes = loader.get_data("recipes")
+        
+        assert recipes["duration_min"].tolist() == raw["cook_time_min"].tolist()
+        assert "cook_time_min" not in recipes.columns
+    
+    def test_explicit_dtypes(self, loader):
+        """Test low-cardinality text is categorical and item IDs are vectorized."""
+        workouts = loader.get_data("workouts")
+        
+        for column in ["mood_tag", "difficulty", "type", "domain"]:
+            assert isinstance(workouts[column].dtype, pd.CategoricalDtype)
+        assert workouts["item_id"].tolist() == [f"workout_{i}" for i in workouts["id"]]
+    
+    def test_raw_frame_is_unchanged(self):
+        """Test preprocessing leaves the raw frame as read."""
+        raw = pd.DataFrame({"id": [1, 2], "cook_time_min": [5, 10], "tags": ["a", "b"]})
+        
+        processed = preprocess_frame(raw, "recipes")
+        assert processed["duration_min"].tolist() == [5, 10]
+        assert list(raw.columns) == ["id", "cook_time_min", "tags"]
+    
+    def test_memory_report(self, loader):
+        """Test the memory report covers every domain and column."""
+        report = loader.memory_report()
+        
+        assert set(report) == {"workouts", "recipes", "courses"}
+        for domain, entry in report.items():
+            assert entry["rows"] == len(loader.get_data(domain))
+            assert set(entry["columns"]) == set(loader.get_data(domain).columns)
+            assert entry["total_bytes"] == sum(entry["columns"].values()) + entry["tag_array_bytes"]
+    
+    def test_memory_endpoint(self, monkeypatch):
+        """Test admins can read the memory report."""
+        monkeypatch.setattr(settings, "admin_token", "secret-token")
+        response = TestClient(app).get("/api/admin/memory", headers={"X-Admin-Token": "secret-token"})
+        
+        assert response.status_code == 200
+        assert response.json()["recipes"]["bytes_per_item"] > 0
@@ -0,0 +1,190 @@
+"""Tests for facet bitmap indexes and filtered recommendations."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from app import app
+from core.config import settings
+from services.catalog_store import publish_snapshot
+from services.data_loader import DataLoader, preprocess_frame
+from services.facets import CatalogFacets, DomainFacets, duration_buckets, popcount, validate_filters
+from services.playlist import _item_matches
+
+client = TestClient(app)
+
+
+@pytest.fixture(scope="module")
+def loader():
+    """Catalog loaded from the bundled CSV files."""
+    return DataLoader()
+
+
+@pytest.fixture(scope="module")
+def frame():
+    """A processed domain spanning several 64-bit words."""
+    rng = np.random.default_rng(7)
+    rows = 200
+    moods = np.array(["calm", "happy", "tired", "calm,happy"])
+    raw = pd.DataFrame({
+        "id": np.arange(rows),
+        "title": [f"Item {i}" for i in range(rows)],
+        "duration_min": rng.integers(1, 150, rows),
+        "difficulty": rng.choice(["beginner", "intermediate", "advanced"], rows),
+        "type": rng.choice(["Yoga", "HIIT"], rows),
+        "mood_tag": rng.choice(moods, rows),
+        "tags": "x"
+    })
+    return preprocess_frame(raw, "workouts")
+
+
+class TestDomainFacets:
+    """Test building, intersecting and counting bitmaps."""
+    
+    def test_duration_buckets(self):
+        """Test buckets split at the available time options."""
+        assert duration_buckets() == ["0-5", "6-10", "11-30", "31-60", "61-120", "121+"]
+    
+    def test_popcount_without_bitwise_count(self, monkeypatch):
+        """Test the byte-table popcount used on numpy 1.x counts like np.bitwise_count."""
+        words = np.random.default_rng(3).integers(0, 2 ** 63, (4, 5), dtype=np.int64).view(np.uint64)
+        expected = popcount(words)
+        monkeypatch.delattr(np, "bitwise_count", raising=False)
+        
+        assert np.array_equal(popcount(words), expected)
+        assert popcount(np.array([2 ** 64 - 1], dtype=np.uint64)).tolist() == [64]
+    
+    def test_match_agrees_with_masks(self, frame):
+        """Test bitmap intersections select the same rows as DataFrame masks."""
+        facets = DomainFacets.from_frame(frame)
+        filters = {"difficulty": ["beginner", "advanced"], "mood_tag": ["happy"], "duration": ["11-30", "31-60"]}
+        
+        mask = (frame["difficulty"].isin(["beginner", "advanced"])
+                & frame["mood_tags"].apply(lambda tags: "happy" in tags)
+                & frame["duration_min"].between(11, 60))
+        rows = facets.row_positions(facets.match(filters))
+        assert rows.tolist() == np.flatnonzero(mask.to_numpy()).tolist()
+        assert facets.count(facets.match(filters)) == int(mask.sum())
+        assert facets.match({}) is None
+    
+    def test_unknown_value_matches_nothing(self, frame):
+        """Test a value absent from the domain empties the match."""
+        facets = DomainFacets.from_frame(frame)
+        
+        assert facets.count(facets.match({"difficulty": ["expert"]})) == 0
+        assert facets.count(facets.match({"topic": ["Productivity"]})) == 0
+    
+    def test_counts_leave_out_own_filter(self, frame):
+        """Test each facet is counted under the other facets' filters only."""
+        facets = DomainFacets.from_frame(frame)
+        counts = facets.counts({"difficulty": ["beginner"], "type": ["Yoga"]})
+        
+        yoga = frame["type"] == "Yoga"
+        beginner = frame["difficulty"] == "beginner"
+        assert counts["difficulty"]["advanced"] == int((yoga & (frame["difficulty"] == "advanced")).sum())
+        assert counts["type"]["HIIT"] == int((beginner & (frame["type"] == "HIIT")).sum())
+        assert sum(counts["duration"].values()) == int((yoga & beginner).sum())
+
+
+class TestCatalogFacets:
+    """Test facets across domains and snapshots."""
+    
+    def test_domain_filter(self, loader):
+        """Test the domain facet selects whole domains."""
+        facets = CatalogFacets(loader)
+        
+        assert facets.filter_rows("workout", None) is None
+        assert facets.filter_rows("workout", {"domain": ["workout"]}) is None
+        assert len(facets.filter_rows("recipe", {"domain": ["workout"]})) == 0
+        
+        counts = facets.counts({"domain": ["course"]})
+        assert counts["total"] == len(loader.get_data("courses"))
+        assert counts["facets"]["domain"]["workout"] == len(loader.get_data("workouts"))
+        assert "Yoga" not in counts["facets"].get("type", {})
+    
+    def test_snapshot_bitmaps_match(self, loader, tmp_path, monkeypatch):
+        """Test bitmaps published with a snapshot equal ones built from the frames."""
+        root = str(tmp_path / "snapshots")
+        publish_snapshot(loader.processed_data, loader.version, root)
+        monkeypatch.setattr(settings, "catalog_snapshot_dir", root)
+        shared = CatalogFacets(DataLoader())
+        built = CatalogFacets(loader)
+        
+        for domain, facets in built.ensure_index().items():
+            published = shared.ensure_index()[domain]
+            assert published.facets.keys() == facets.facets.keys()
+            for facet, (values, bitmaps) in facets.facets.items():
+                assert published.facets[facet][0] == values
+                assert np.array_equal(published.facets[facet][1], bitmaps)
+    
+    def test_validate_filters(self):
+        """Test unknown facets, domains and buckets are reported."""
+        assert validate_filters(None) is None
+        assert validate_filters({"difficulty": ["beginner"], "duration": ["0-5"]}) is None
+        assert validate_filters({"colour": ["red"]})
+        assert validate_filters({"domain": ["book"]})
+        assert validate_filters({"duration": ["5"]})
+    
+    def test_item_matches(self):
+        """Test cached playlist items are checked against the fields they carry."""
+        item = {"domain": "workout", "difficulty": "beginner", "mood_match": ["calm"], "duration_min": 30}
+        
+        assert _item_matches(item, {"duration": ["11-30"], "mood_tag": ["calm", "happy"]})
+        assert not _item_matches(item, {"duration": ["31-60"]})
+        assert not _item_matches(item, {"type": ["Yoga"]})
+
+
+class TestFilteredEndpoints:
+    """Test facet filters on the recommendation endpoints."""
+    
+    def test_recommend_with_filters(self, loader):
+        """Test every recommended item passes the filters."""
+        response = client.post("/api/recommend", json={
+            "mood": "calm",
+            "available_minutes": 120,
+            "interests": ["lifestyle", "learning"],
+            "limit": 6,
+            "filters": {"difficulty": ["beginner"], "domain": ["workout", "course"]}
+        })
+        assert response.status_code == 200
+        
+        playlist = response.json()["playlist"]
+        assert playlist
+        for item in playlist:
+            assert item["domain"] in ("workout", "course")
+            assert item["difficulty"] == "beginner"
+    
+    def test_quick_suggestions_with_filters(self, loader):
+        """Test suggestions are the longest matching items within the time."""
+        response = client.get("/api/quick-suggestions", params={
+            "available_minutes": 30, "domain": "workout", "type": ["Yoga", "Stretching"]
+        })
+        assert response.status_code == 200
+        
+        df = loader.get_data("workouts")
+        expected = df[df["type"].isin(["Yoga", "Stretching"]) & df["duration_min"].between(1, 30)]
+        expected = expected.sort_values("duration_min", ascending=False, kind="stable")
+        assert [item["item_id"] for item in response.json()["suggestions"]] == expected["item_id"].tolist()[:3]
+    
+    def test_facet_counts(self, loader):
+        """Test facet counts add up to the matching items."""
+        response = client.get("/api/facets", params={"difficulty": "beginner"})
+        assert response.status_code == 200
+        
+        data = response.json()
+        assert data["filters"] == {"difficulty": ["beginner"]}
+        assert sum(data["facets"]["duration"].values()) == data["total"]
+        assert data["facets"]["difficulty"]["beginner"] == data["total"]
+        assert data["facets"]["difficulty"]["advanced"] > 0
+    
+    def test_invalid_filters(self):
+        """Test invalid filters are rejected."""
+        assert client.get("/api/facets", params={"duration": "7"}).status_code == 400
+        assert client.get("/api/quick-suggestions",
+                          params={"available_minutes": 30, "duration": "7"}).status_code == 400
+        response = client.post("/api/recommend", json={
+            "mood": "calm", "available_minutes": 30, "interests": ["lifestyle"],
+            "filters": {"colour": ["red"]}
+        })
+        assert response.status_code == 400
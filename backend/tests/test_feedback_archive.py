@@ -0,0 +1,114 @@
+"""Tests for feedback archival and compaction."""
+
+import os
+from datetime import date, datetime, timezone
+
+import pandas as pd
+import pytest
+from sqlmodel import Session, SQLModel, create_engine, select
+from core.config import settings
+from models.feedback import Feedback
+from services.feedback_archive import (archive_feedback, load_feedback, partition_paths,
+                                       read_partition, write_partition)
+
+TODAY = date(2024, 5, 20)
+
+
+@pytest.fixture
+def db_engine(tmp_path):
+    """Create a feedback database with rows spread over twenty days."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'feedback.db'}")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        for day in range(1, 21):
+            for i in range(3):
+                session.add(Feedback(
+                    item_id=f"workout_{day}", domain="workout",
+                    action="like" if i else "dislike",
+                    user_session=f"user_{i}" if i < 2 else None,
+                    created_at=datetime(2024, 5, day, 8 + i, tzinfo=timezone.utc)
+                ))
+        session.commit()
+    return engine
+
+
+def _hot_days(engine):
+    """Get the days still stored in the database."""
+    with Session(engine) as session:
+        return sorted({row.created_at.date() for row in session.exec(select(Feedback))})
+
+
+class TestArchive:
+    """Test moving old feedback into archive partitions."""
+    
+    def test_keeps_hot_window_and_loses_nothing(self, db_engine, tmp_path):
+        """Test old rows move to day partitions and load back together with hot rows."""
+        root = str(tmp_path / "archive")
+        before = load_feedback(root=root, db_engine=db_engine)
+        
+        result = archive_feedback(7, root, batch_size=10, today=TODAY, db_engine=db_engine)
+        
+        assert result["archived_rows"] == 12 * 3
+        assert _hot_days(db_engine)[0] == date(2024, 5, 13)
+        assert len(partition_paths(root)) >= 12
+        after = load_feedback(root=root, db_engine=db_engine)
+        pd.testing.assert_frame_equal(after, before)
+        assert after["user_session"].isna().sum() == 20
+    
+    def test_second_run_is_a_no_op(self, db_engine, tmp_path):
+        """Test archiving again within the window moves nothing."""
+        root = str(tmp_path / "archive")
+        archive_feedback(7, root, today=TODAY, db_engine=db_engine)
+        
+        assert archive_feedback(7, root, today=TODAY, db_engine=db_engine)["archived_rows"] == 0
+    
+    def test_day_range_prunes_partitions(self, db_engine, tmp_path):
+        """Test a day range reads only matching partitions and hot rows."""
+        root = str(tmp_path / "archive")
+        archive_feedback(7, root, today=TODAY, db_engine=db_engine)
+        
+        feedback = load_feedback(date(2024, 5, 12), date(2024, 5, 13), root=root, db_engine=db_engine)
+        
+        assert len(partition_paths(root, date(2024, 5, 12), date(2024, 5, 13))) == 1
+        assert sorted(feedback["item_id"].unique()) == ["workout_12", "workout_13"]
+        assert len(feedback) == 6
+    
+    def test_interrupted_run_does_not_duplicate(self, db_engine, tmp_path):
+        """Test rows archived but not yet deleted are read once."""
+        root = str(tmp_path / "archive")
+        with Session(db_engine) as session:
+            rows = session.exec(select(Feedback).where(Feedback.created_at < datetime(2024, 5, 2, tzinfo=timezone.utc))).all()
+            path = write_partition(root, date(2024, 5, 1), rows)
+        
+        assert os.path.exists(path)
+        assert read_partition(path)["item_id"] == ["workout_1"] * 3
+        assert len(load_feedback(root=root, db_engine=db_engine)) == 60
+    
+    def test_freed_pages_are_released_in_bounded_steps(self, tmp_path, monkeypatch):
+        """Test archiving hands back at most the configured pages of a new database."""
+        import models.feedback
+        
+        engine = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+        monkeypatch.setattr(models.feedback, "engine", engine)
+        monkeypatch.setattr(models.feedback, "_tables_created", False)
+        monkeypatch.setattr(settings, "feedback_archive_vacuum_pages", 20)
+        models.feedback.create_db_and_tables()
+        with Session(engine) as session:
+            session.add_all([Feedback(item_id=f"workout_{i}", domain="workout", action="like",
+                                      user_session="s" * 200, created_at=datetime(2024, 5, 1, tzinfo=timezone.utc))
+                             for i in range(3000)])
+            session.commit()
+        
+        def pages():
+            with engine.connect() as connection:
+                return (connection.exec_driver_sql("PRAGMA page_count").scalar(),
+                        connection.exec_driver_sql("PRAGMA freelist_count").scalar())
+        
+        with engine.connect() as connection:
+            assert connection.exec_driver_sql("PRAGMA auto_vacuum").scalar() == 2
+        before, _ = pages()
+        archive_feedback(7, str(tmp_path / "archive"), today=TODAY, db_engine=engine)
+        after, free = pages()
+        
+        assert after == before - 20
+        assert free > 0
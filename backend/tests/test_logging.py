@@ -0,0 +1,84 @@
+"""Tests for the logging pipeline."""
+
+import json
+
+import pytest
+from core.config import settings
+from core.logging import json_format, log_event, logger
+
+
+@pytest.fixture
+def captured():
+    """Collect records emitted to an in-memory sink."""
+    records = []
+    handler_id = logger.add(lambda message: records.append(message.record), level="DEBUG")
+    yield records
+    logger.remove(handler_id)
+
+
+class TestLogEvent:
+    """Test sampled event logging."""
+    
+    def test_zero_rate_drops_messages(self, captured, monkeypatch):
+        """Test events with a zero sample rate are never emitted."""
+        monkeypatch.setattr(settings, "log_sample_rates", {"noisy": 0.0})
+        
+        for _ in range(20):
+            log_event("noisy", "INFO", "dropped {}", 1)
+        
+        assert captured == []
+    
+    def test_unlisted_event_is_always_emitted(self, captured, monkeypatch):
+        """Test events without a configured rate are logged every time."""
+        monkeypatch.setattr(settings, "log_sample_rates", {})
+        
+        log_event("rare", "INFO", "Generated {} items for {}", 5, "s1")
+        
+        assert len(captured) == 1
+        assert captured[0]["message"] == "Generated 5 items for s1"
+        assert captured[0]["extra"]["event"] == "rare"
+        assert captured[0]["extra"]["sample_rate"] == 1.0
+    
+    def test_caller_is_recorded(self, captured, monkeypatch):
+        """Test records point at the caller rather than the helper."""
+        monkeypatch.setattr(settings, "log_sample_rates", {})
+        
+        log_event("rare", "INFO", "message")
+        
+        assert captured[0]["function"] == "test_caller_is_recorded"
+
+
+class TestJsonFormat:
+    """Test structured output."""
+    
+    def test_json_format_is_valid_json(self):
+        """Test JSON lines carry the message and bound fields."""
+        lines = []
+        handler_id = logger.add(lines.append, format=json_format)
+        try:
+            logger.bind(event="playlist_generated").info("Generated {} items", 3)
+        finally:
+            logger.remove(handler_id)
+        
+        payload = json.loads(lines[0])
+        assert payload["message"] == "Generated 3 items"
+        assert payload["event"] == "playlist_generated"
+        assert payload["level"] == "INFO"
+        assert "_json" not in payload
+    
+    def test_sinks_do_not_nest_each_others_lines(self):
+        """Test each of several JSON sinks writes the record once."""
+        first, second = [], []
+        handler_ids = [logger.add(first.append, format=json_format),
+                       logger.add(second.append, format=json_format)]
+        try:
+            logger.bind(event="feedback_recorded").info("Recorded")
+        finally:
+            for handler_id in handler_ids:
+                logger.remove(handler_id)
+        
+        assert first[0] == second[0]
+        for line in (first[0], second[0]):
+            payload = json.loads(line)
+            assert "_json" not in payload
+            assert payload["event"] == "feedback_recorded"
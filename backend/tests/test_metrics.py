@@ -0,0 +1,91 @@
+"""Tests for metrics and Server-Timing headers."""
+
+import pytest
+from fastapi.testclient import TestClient
+from app import app
+from core.config import settings
+from core.metrics import Counter, Histogram, MetricsRegistry
+
+client = TestClient(app)
+
+
+class TestMetricsRegistry:
+    """Test metric types and text exposition."""
+    
+    def test_counter_rendering(self):
+        """Test counters render with escaped labels."""
+        registry = MetricsRegistry()
+        counter = registry.counter("demo_total", "Demo counter.", ["name"])
+        counter.inc(name='a"b')
+        counter.inc(2, name='a"b')
+        
+        text = registry.render()
+        
+        assert "# TYPE demo_total counter" in text
+        assert 'demo_total{name="a\\"b"} 3.0' in text
+    
+    def test_histogram_buckets_are_cumulative(self):
+        """Test histogram buckets, sum and count."""
+        histogram = Histogram("demo_seconds", "Demo histogram.", buckets=(0.1, 1.0))
+        for value in [0.05, 0.5, 5.0]:
+            histogram.observe(value)
+        
+        lines = histogram.render()
+        
+        assert 'demo_seconds_bucket{le="0.1"} 1' in lines
+        assert 'demo_seconds_bucket{le="1.0"} 2' in lines
+        assert 'demo_seconds_bucket{le="+Inf"} 3' in lines
+        assert "demo_seconds_count 3" in lines
+    
+    def test_registry_reuses_metrics(self):
+        """Test registering the same name twice returns one metric."""
+        registry = MetricsRegistry()
+        first = registry.counter("same_total", "Same.")
+        
+        assert registry.counter("same_total", "Same.") is first
+        assert isinstance(first, Counter)
+
+
+class TestMetricsEndpoint:
+    """Test the metrics endpoint and instrumentation."""
+    
+    def test_metrics_endpoint(self):
+        """Test metrics are exposed in Prometheus text format."""
+        client.post("/api/recommend", json={
+            "mood": "happy", "available_minutes": 30, "interests": ["lifestyle"]
+        })
+        client.get("/api/metadata", headers={"If-None-Match": '"stale"'})
+        
+        response = client.get("/api/metrics")
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        text = response.text
+        assert 'http_request_duration_seconds_count{method="POST",route="/api/recommend",status="200"}' in text
+        for stage in ["scoring", "enrichment", "curation", "serialization"]:
+            assert f'recommendation_stage_duration_seconds_count{{stage="{stage}"}}' in text
+        assert 'cache_requests_total{cache="http_etag",result="miss"}' in text
+        assert 'cache_hit_ratio{cache="http_etag"}' in text
+        assert 'queue_depth{queue="threadpool_busy"}' in text
+    
+    def test_server_timing_header(self, monkeypatch):
+        """Test the optional Server-Timing header carries stage durations."""
+        monkeypatch.setattr(settings, "server_timing_enabled", True)
+        
+        response = client.post("/api/recommend", json={
+            "mood": "calm", "available_minutes": 60, "interests": ["lifestyle", "learning"]
+        })
+        
+        header = response.headers["server-timing"]
+        for stage in ["scoring", "enrichment", "curation", "serialization", "app"]:
+            assert f"{stage};dur=" in header
+    
+    def test_server_timing_disabled_by_default(self):
+        """Test no Server-Timing header is sent unless enabled."""
+        response = client.get("/api/health")
+        
+        assert "server-timing" not in response.headers
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,57 @@
+"""Tests for the streaming content model build."""
+
+import numpy as np
+import pytest
+
+from core.config import settings
+from services import model_builder
+from services.data_loader import DataLoader
+from services.model_builder import build_content_models
+
+
+@pytest.fixture(scope="module")
+def loader():
+    """Catalog loaded from the bundled CSV files."""
+    return DataLoader()
+
+
+def _assert_same_models(left, right):
+    """Check two builds produced the same features and matrices."""
+    assert left.keys() == right.keys()
+    for domain in left:
+        assert left[domain]["item_features"] == right[domain]["item_features"]
+        assert np.allclose(left[domain]["matrix"].toarray(), right[domain]["matrix"].toarray())
+
+
+class TestBuildContentModels:
+    """Test building content models in chunks."""
+    
+    def test_files_and_frames_match(self, loader, monkeypatch):
+        """Test streaming the CSV files in small chunks matches the loaded frames."""
+        monkeypatch.setattr(settings, "model_build_chunk_size", 7)
+        from_files = build_content_models(loader.source_paths(), workers=1)
+        from_frames = build_content_models(
+            {domain: loader.get_data(domain) for domain in loader.source_paths()}
+        )
+        
+        _assert_same_models(from_files, from_frames)
+        for domain, model in from_frames.items():
+            assert len(model["item_features"]) == len(loader.get_data(domain))
+            assert model["matrix"].shape[1] == settings.model_hash_features
+            norms = np.sqrt(model["matrix"].multiply(model["matrix"]).sum(axis=1))
+            assert np.allclose(norms, 1.0)
+    
+    def test_parallel_build_matches(self, loader, monkeypatch):
+        """Test building domains in worker processes gives the same models."""
+        monkeypatch.setattr(model_builder, "PARALLEL_MIN_BYTES", 0)
+        serial = build_content_models(loader.source_paths(), workers=1)
+        parallel = build_content_models(loader.source_paths(), workers=3)
+        
+        _assert_same_models(serial, parallel)
+    
+    def test_missing_file_is_skipped(self, loader, tmp_path):
+        """Test a domain without a CSV file is left out."""
+        sources = dict(loader.source_paths(), recipes=str(tmp_path / "missing.csv"))
+        
+        models = build_content_models(sources, workers=1)
+        assert set(models) == {"workouts", "courses"}
@@ -0,0 +1,103 @@
+"""Tests for mood tag weight vectors."""
+
+import numpy as np
+from services import mood_weights
+from services.mood_mapper import MoodMapper, TagMatrix
+from services.mood_weights import MoodWeightRefitter, fit_tag_weights
+
+
+ITEMS = {
+    "workout_1": {"item_id": "workout_1", "domain": "workout",
+                  "tags_list": ["yoga", "outdoor"], "mood_tags": ["calm"]},
+    "workout_2": {"item_id": "workout_2", "domain": "workout",
+                  "tags_list": ["stretching"], "mood_tags": ["calm"]},
+}
+
+
+class TestTagMatrix:
+    """Test sparse mood scoring."""
+    
+    def test_dot_handles_empty_rows(self):
+        """Test rows without tags get a zero product."""
+        matrix = TagMatrix.from_lists([["a", "b"], [], ["b"]])
+        
+        assert matrix.dot({"b": 0.5, "missing": 1.0}).tolist() == [0.5, 0.0, 0.5]
+    
+    def test_score_items_matches_single_item_scores(self):
+        """Test the vectorized scores equal the per-item scores."""
+        mapper = MoodMapper()
+        tag_lists = [["yoga", "relaxing", "gentle"], ["hiit"], [], ["yoga", "cardio"]]
+        matrix = TagMatrix.from_lists(tag_lists)
+        
+        for mood in mapper.mood_preferences:
+            expected = [mapper.calculate_mood_score(tags, mood, "workout") for tags in tag_lists]
+            assert np.allclose(mapper.score_items(matrix, mood, "workout"), expected)
+    
+    def test_seed_weights_keep_overlap_scores(self):
+        """Test the seeded vectors give the original set-overlap score."""
+        mapper = MoodMapper()
+        
+        assert mapper.calculate_mood_score(["yoga", "relaxing", "gentle"], "calm", "workout") == 1.0
+        assert mapper.calculate_mood_score(["yoga", "hiit"], "calm", "workout") == 0.5
+        assert mapper.calculate_mood_score([], "calm", "workout") == 0.5
+
+
+class TestFitTagWeights:
+    """Test fitting weights from feedback."""
+    
+    def test_no_feedback_keeps_seed(self):
+        """Test the prior alone reproduces the seed vectors."""
+        mapper = MoodMapper()
+        
+        assert fit_tag_weights(mapper.seed_weights, {}, {}, 10.0) == mapper.seed_weights
+    
+    def test_feedback_moves_weights(self):
+        """Test likes raise unseeded tags and dislikes lower seeded ones."""
+        mapper = MoodMapper()
+        counts = {"workout_1": {"like": 30, "dislike": 0}, "workout_2": {"like": 0, "dislike": 10}}
+        
+        weights = fit_tag_weights(mapper.seed_weights, counts, ITEMS, 10.0)["calm"]["workout"]
+        
+        assert weights["outdoor"] == 0.75
+        assert weights["yoga"] == 1.0
+        assert weights["stretching"] == 0.5
+        assert weights["gentle"] == 1.0
+        assert fit_tag_weights(mapper.seed_weights, counts, ITEMS, 10.0)["happy"] == mapper.seed_weights["happy"]
+
+
+class TestMoodWeightRefitter:
+    """Test background refitting."""
+    
+    def test_refit_publishes_new_vectors(self, monkeypatch):
+        """Test a refit replaces the mapper's weights in one step."""
+        mapper = MoodMapper()
+        monkeypatch.setattr(mood_weights, "load_feedback_counts",
+                            lambda: {"workout_1": {"like": 30, "dislike": 0}})
+        
+        class Loader:
+            def get_items_by_ids(self, item_ids):
+                return {item_id: ITEMS[item_id] for item_id in item_ids}
+        
+        before = mapper.tag_weights
+        result = MoodWeightRefitter(mapper=mapper, loader=Loader()).refit()
+        
+        assert result["feedback"] == 30
+        assert mapper.tag_weights is not before
+        assert mapper.get_tag_weights("calm", "workout")["outdoor"] == 0.75
+        assert mapper.seed_weights is before
+    
+    def test_start_and_stop(self, monkeypatch):
+        """Test the background thread refits and stops cleanly."""
+        refitter = MoodWeightRefitter(mapper=MoodMapper())
+        calls = []
+        monkeypatch.setattr(refitter, "refit", lambda: calls.append(1))
+        
+        refitter.start(interval=0.01)
+        for _ in range(200):
+            if calls:
+                break
+            refitter._stop.wait(0.01)
+        refitter.stop()
+        
+        assert calls
+        assert refitter._thread is None
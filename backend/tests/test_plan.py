@@ -0,0 +1,91 @@
+"""Tests for multi-day plan generation."""
+
+from collections import Counter
+
+from fastapi.testclient import TestClient
+
+from app import app
+from core.admission import recommend_admission
+from services.playlist import PlaylistGenerator
+
+client = TestClient(app)
+
+PLAN_REQUEST = {
+    "mood": "calm",
+    "available_minutes": 60,
+    "interests": ["lifestyle", "learning"],
+    "limit": 3,
+    "days": 7
+}
+
+
+class TestGeneratePlan:
+    """Test building several days' playlists in one pass."""
+    
+    def test_days_do_not_repeat_items(self):
+        """Test every day fits the time and no item appears twice."""
+        plan = PlaylistGenerator().generate_plan("calm", 60, ["lifestyle", "learning"], days=7, limit=3)
+        
+        assert [day["day"] for day in plan["days"]] == list(range(1, 8))
+        item_ids = [item["item_id"] for day in plan["days"] for item in day["playlist"]]
+        assert len(item_ids) == len(set(item_ids)) == plan["total_items"]
+        for day in plan["days"]:
+            assert 0 < len(day["playlist"]) <= 3
+            assert day["total_duration"] <= 60
+    
+    def test_domains_balanced_across_days(self):
+        """Test each domain leads some day and appears in similar numbers."""
+        plan = PlaylistGenerator().generate_plan("energized", 120, ["lifestyle", "learning"], days=6, limit=3)
+        
+        domains = Counter(item["domain"] for day in plan["days"] for item in day["playlist"])
+        assert set(domains) == {"workout", "recipe", "course"}
+        assert max(domains.values()) - min(domains.values()) <= len(plan["days"])
+        assert {day["playlist"][0]["domain"] for day in plan["days"]} == set(domains)
+    
+    def test_scores_each_mood_once(self, monkeypatch):
+        """Test days sharing a mood share one ranking."""
+        generator = PlaylistGenerator()
+        calls = []
+        rank = generator.recommendation_engine.get_ranked_recommendations
+        monkeypatch.setattr(generator.recommendation_engine, "get_ranked_recommendations",
+                            lambda **kwargs: calls.append(kwargs["mood"]) or rank(**kwargs))
+        
+        plan = generator.generate_plan("calm", 30, ["lifestyle"], days=4, limit=2,
+                                       day_moods=["calm", "tired", "calm", "tired"])
+        assert sorted(calls) == ["calm", "tired"]
+        assert [day["mood"] for day in plan["days"]] == ["calm", "tired", "calm", "tired"]
+        item_ids = [item["item_id"] for day in plan["days"] for item in day["playlist"]]
+        assert len(item_ids) == len(set(item_ids))
+
+
+class TestPlanEndpoint:
+    """Test the /api/plan endpoint."""
+    
+    def test_plan(self):
+        """Test a week's plan is returned in one call."""
+        response = client.post("/api/plan", json=PLAN_REQUEST)
+        assert response.status_code == 200
+        
+        data = response.json()
+        assert len(data["days"]) == 7
+        assert data["degraded"] is False
+    
+    def test_invalid_plan(self):
+        """Test invalid days and day moods are rejected."""
+        assert client.post("/api/plan", json=dict(PLAN_REQUEST, days=0)).status_code == 400
+        assert client.post("/api/plan", json=dict(PLAN_REQUEST, days=30)).status_code == 400
+        assert client.post("/api/plan", json=dict(PLAN_REQUEST, day_moods=["calm"])).status_code == 400
+        assert client.post("/api/plan", json=dict(PLAN_REQUEST, mood="bored")).status_code == 400
+    
+    def test_shed_plan(self, monkeypatch):
+        """Test a plan shed under overload asks the client to retry."""
+        monkeypatch.setattr(recommend_admission, "max_in_flight", 1)
+        monkeypatch.setattr(recommend_admission, "max_queue", 0)
+        recommend_admission.acquire()
+        try:
+            response = client.post("/api/plan", json=PLAN_REQUEST)
+        finally:
+            recommend_admission.release()
+        
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
@@ -0,0 +1,98 @@
+"""Tests for the on-demand profiling endpoints."""
+
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+from app import app
+from core.config import settings
+from core.profiling import profiler
+
+client = TestClient(app)
+
+ADMIN_HEADERS = {"X-Admin-Token": "secret-token"}
+
+RECOMMEND_REQUEST = {"mood": "happy", "available_minutes": 30, "interests": ["lifestyle"]}
+
+
+@pytest.fixture
+def admin(monkeypatch, tmp_path):
+    """Enable admin endpoints and write profiles to a temporary directory."""
+    monkeypatch.setattr(settings, "admin_token", "secret-token")
+    monkeypatch.setattr(settings, "profile_dir", str(tmp_path))
+    yield tmp_path
+    profiler.stop()
+
+
+class TestProfilingAccess:
+    """Test admin access control."""
+    
+    def test_disabled_without_token(self):
+        """Test admin endpoints are hidden when no token is configured."""
+        response = client.get("/api/admin/profile")
+        
+        assert response.status_code == 404
+    
+    def test_rejects_wrong_token(self, admin):
+        """Test a wrong admin token is rejected."""
+        response = client.get("/api/admin/profile", headers={"X-Admin-Token": "wrong"})
+        
+        assert response.status_code == 403
+    
+    def test_requires_bounds(self, admin):
+        """Test a session needs a request count or duration."""
+        response = client.post("/api/admin/profile", json={"mode": "cprofile"},
+                               headers=ADMIN_HEADERS)
+        
+        assert response.status_code == 400
+
+
+class TestProfilingSessions:
+    """Test profiling sessions end to end."""
+    
+    def test_cprofile_next_requests(self, admin):
+        """Test cProfile covers the next N requests and writes its output."""
+        response = client.post("/api/admin/profile", json={"mode": "cprofile", "requests": 2},
+                               headers=ADMIN_HEADERS)
+        assert response.status_code == 200
+        
+        conflict = client.post("/api/admin/profile", json={"mode": "sampler", "requests": 1},
+                               headers=ADMIN_HEADERS)
+        assert conflict.status_code == 409
+        
+        for _ in range(2):
+            client.post("/api/recommend", json=RECOMMEND_REQUEST)
+        
+        status = client.get("/api/admin/profile", headers=ADMIN_HEADERS).json()
+        assert status["active"] is None
+        result = status["last_result"]
+        assert result["profiled_requests"] == 2
+        
+        for path in result["files"].values():
+            assert os.path.exists(path)
+        with open(result["files"]["collapsed"]) as f:
+            first_line = f.readline().strip()
+        stack, _, value = first_line.rpartition(" ")
+        assert stack and int(value) > 0
+        with open(result["files"]["summary"]) as f:
+            assert "function calls" in f.read()
+    
+    def test_sampler_stopped_manually(self, admin):
+        """Test the sampler writes a summary when stopped."""
+        response = client.post("/api/admin/profile", json={"mode": "sampler", "seconds": 30},
+                               headers=ADMIN_HEADERS)
+        assert response.status_code == 200
+        
+        client.post("/api/recommend", json=RECOMMEND_REQUEST)
+        
+        response = client.delete("/api/admin/profile", headers=ADMIN_HEADERS)
+        result = response.json()["result"]
+        
+        assert result["mode"] == "sampler"
+        assert os.path.exists(result["files"]["collapsed"])
+        with open(result["files"]["summary"]) as f:
+            assert "samples" in f.read()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,61 @@
+"""Tests for the ranked list store used for cursor pagination."""
+
+from services.ranked_lists import RankedListStore, decode_cursor
+
+
+def _items(count):
+    """Build a ranked list of placeholder items."""
+    return [{'item_id': f"item_{i}"} for i in range(count)]
+
+
+class TestRankedListStore:
+    """Test storing and paging ranked lists."""
+    
+    def test_pages_cover_list_in_order(self):
+        """Test following cursors returns every item once, in rank order."""
+        store = RankedListStore(ttl=60, max_entries=10)
+        cursor = store.put(_items(7))
+        
+        seen = []
+        while cursor:
+            items, cursor, remaining = store.page(cursor, 3)
+            seen.extend(items)
+        
+        assert seen == _items(7)
+        assert remaining == 0
+    
+    def test_same_cursor_returns_same_page(self):
+        """Test retrying a cursor is idempotent."""
+        store = RankedListStore(ttl=60, max_entries=10)
+        cursor = store.put(_items(5))
+        
+        assert store.page(cursor, 2) == store.page(cursor, 2)
+    
+    def test_expired_list_is_dropped(self):
+        """Test cursors stop working after the TTL."""
+        store = RankedListStore(ttl=-1, max_entries=10)
+        cursor = store.put(_items(5))
+        
+        assert store.page(cursor, 2) is None
+        assert len(store) == 0
+    
+    def test_least_recently_used_list_is_evicted(self):
+        """Test the store stays bounded, evicting the least recently used list."""
+        store = RankedListStore(ttl=60, max_entries=2)
+        first = store.put(_items(3))
+        second = store.put(_items(3))
+        store.page(first, 1)
+        third = store.put(_items(3))
+        
+        assert len(store) == 2
+        assert store.page(second, 1) is None
+        assert store.page(first, 1) is not None
+        assert store.page(third, 1) is not None
+    
+    def test_malformed_cursor(self):
+        """Test malformed cursors are rejected."""
+        store = RankedListStore(ttl=60, max_entries=2)
+        
+        assert decode_cursor("no-offset") is None
+        assert store.page("abc.-1", 2) is None
+        assert store.page("unknown.0", 2) is None
@@ -0,0 +1,135 @@
+"""Tests for catalog search."""
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from app import app
+from core.metrics import CACHE_REQUESTS
+from services.data_loader import DataLoader
+from services.search import CatalogSearch, tokenize
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def search(tmp_path):
+    """Search over a small catalog written to a temporary directory."""
+    pd.DataFrame([
+        {"id": 1, "title": "Morning Yoga Flow", "type": "Yoga", "duration_min": 20,
+         "difficulty": "beginner", "mood_tag": "calm", "tags": "yoga,stretching",
+         "image": "", "description": "Gentle stretches to start the day"},
+        {"id": 2, "title": "Power Cardio", "type": "Cardio", "duration_min": 45,
+         "difficulty": "advanced", "mood_tag": "energized", "tags": "cardio,intense",
+         "image": "", "description": "Intense cardio with a short yoga cool down"},
+        {"id": 3, "title": "Evening Yoga", "type": "Yoga", "duration_min": 60,
+         "difficulty": "beginner", "mood_tag": "tired", "tags": "yoga,relaxing",
+         "image": "", "description": "Slow yoga before bed"},
+    ]).to_csv(tmp_path / "workouts.csv", index=False)
+    pd.DataFrame([
+        {"id": 1, "title": "Yoga Bowl", "ingredients": "oats", "cook_time_min": 10,
+         "mood_tag": "calm", "tags": "breakfast,quick", "image": "",
+         "description": "Oat bowl to eat after yoga"},
+    ]).to_csv(tmp_path / "recipes.csv", index=False)
+    pd.DataFrame(columns=["id", "title", "topic", "duration_min", "difficulty", "mood_tag",
+                          "tags", "image", "description"]).to_csv(tmp_path / "courses.csv", index=False)
+    return CatalogSearch(DataLoader(data_dir=str(tmp_path)), cache_size=2)
+
+
+class TestCatalogSearch:
+    """Test indexing and ranking."""
+    
+    def test_tokenize(self):
+        """Test text is split into lowercase alphanumeric terms."""
+        assert tokenize("Mac & Cheese, 20-min!") == ["mac", "cheese", "20", "min"]
+        assert tokenize(None) == []
+    
+    def test_ranks_matches(self, search):
+        """Test items with the term in their title rank above description-only matches."""
+        result = search.search("yoga")
+        
+        ids = [item["item_id"] for item in result["results"]]
+        assert result["total_matches"] == 4
+        assert set(ids[:3]) == {"workout_1", "workout_3", "recipe_1"}
+        assert ids[-1] == "workout_2"
+        scores = [item["score"] for item in result["results"]]
+        assert scores == sorted(scores, reverse=True)
+        assert result["results"][0]["domain"] == "workout"
+    
+    def test_scores_add_across_terms(self, search):
+        """Test an item matching more query terms ranks first."""
+        result = search.search("yoga cardio")
+        assert result["results"][0]["item_id"] == "workout_2"
+    
+    def test_filters_and_limit(self, search):
+        """Test domain and duration filters apply before the top k are taken."""
+        assert [item["item_id"] for item in search.search("yoga", domain="recipe")["results"]] == ["recipe_1"]
+        
+        result = search.search("yoga", min_minutes=30, max_minutes=60, limit=1)
+        assert result["total_matches"] == 2
+        assert result["count"] == 1
+        assert result["results"][0]["item_id"] == "workout_3"
+    
+    def test_unknown_terms(self, search):
+        """Test a query of unindexed terms matches nothing."""
+        result = search.search("zumba")
+        assert result["results"] == []
+        assert result["total_matches"] == 0
+    
+    def test_query_vectors_cached(self, search):
+        """Test repeated queries reuse their cached vector, in LRU order."""
+        hits = CACHE_REQUESTS.get(cache="search_query", result="hit")
+        search.search("Yoga")
+        search.search("yoga!")
+        assert CACHE_REQUESTS.get(cache="search_query", result="hit") == hits + 1
+        
+        search.search("cardio")
+        search.search("bowl")
+        assert [text for _, text in search._queries] == ["cardio", "bowl"]
+    
+    def test_rebuilds_on_catalog_change(self, search):
+        """Test a new catalog version rebuilds the index."""
+        index = search.ensure_index()
+        assert search.ensure_index() is index
+        
+        search.data_loader.version = "changed"
+        assert search.ensure_index() is not index
+    
+    def test_vectors_of_old_index_not_reused(self, search):
+        """Test a vector cached by a search still holding the old index misses on the new one."""
+        old = search.ensure_index()
+        search.data_loader.version = "changed"
+        new = search.ensure_index()
+        
+        # A slow search of the old index caches its vector after the rebuild
+        search._query_vector(old, "yoga")
+        misses = CACHE_REQUESTS.get(cache="search_query", result="miss")
+        search._query_vector(new, "yoga")
+        
+        assert CACHE_REQUESTS.get(cache="search_query", result="miss") == misses + 1
+        assert set(search._queries) == {(old.version, "yoga"), (new.version, "yoga")}
+
+
+class TestSearchAPI:
+    """Test the search endpoint."""
+    
+    def test_search(self):
+        """Test searching the bundled catalog."""
+        response = client.get("/api/search", params={"q": "yoga", "limit": 3})
+        assert response.status_code == 200
+        
+        data = response.json()
+        assert data["query"] == "yoga"
+        assert 0 < data["count"] <= 3
+        assert data["total_matches"] >= data["count"]
+        assert "ETag" in response.headers
+        
+        cached = client.get("/api/search", params={"q": "yoga", "limit": 3},
+                            headers={"If-None-Match": response.headers["ETag"]})
+        assert cached.status_code == 304
+    
+    def test_invalid_parameters(self):
+        """Test invalid parameters are rejected."""
+        for params in [{"q": " "}, {"q": "x" * 201}, {"q": "yoga", "domain": "book"},
+                       {"q": "yoga", "max_minutes": -1}, {"q": "yoga", "limit": 51}]:
+            assert client.get("/api/search", params=params).status_code == 400
@@ -0,0 +1,110 @@
+"""Tests for per-session seen and disliked item filters."""
+
+import pytest
+from sqlmodel import Session
+from models.feedback import Feedback, create_db_and_tables, engine
+from services.data_loader import DataLoader
+from services.recommender import RecommendationEngine
+from services.seen_filter import (BloomFilter, RotatingBloomFilter, SeenFilterStore,
+                                  exclude_seen, item_hashes)
+
+
+@pytest.fixture(scope="module")
+def loader():
+    """Load the bundled catalog once."""
+    return DataLoader()
+
+
+def _ids(prefix, count):
+    """Build distinct item IDs."""
+    return [f"{prefix}_{i}" for i in range(count)]
+
+
+class TestBloomFilter:
+    """Test the filters' error bounds."""
+    
+    def test_no_false_negatives_and_bounded_false_positives(self):
+        """Test added items are always found and others rarely are."""
+        bloom = BloomFilter(1000, 0.01)
+        added = item_hashes(_ids("added", 1000))
+        bloom.add(*added)
+        
+        assert bloom.contains(*added).all()
+        assert bloom.contains(*item_hashes(_ids("other", 20000))).mean() < 0.02
+    
+    def test_rotation_keeps_recent_items(self):
+        """Test a full generation rotates out the oldest items only."""
+        bloom = RotatingBloomFilter(100, 0.01)
+        bloom.add(*item_hashes(_ids("old", 100)))
+        bloom.add(*item_hashes(_ids("mid", 100)))
+        bloom.add(*item_hashes(_ids("new", 50)))
+        
+        assert len(bloom) == 150
+        assert bloom.contains(*item_hashes(_ids("mid", 100) + _ids("new", 50))).all()
+        assert bloom.contains(*item_hashes(_ids("old", 100))).mean() < 0.05
+
+
+class TestSeenFilterStore:
+    """Test recording and excluding seen items."""
+    
+    def test_memory_bound_evicts_least_recently_used(self):
+        """Test the store keeps only as many sessions as fit its budget."""
+        store = SeenFilterStore(capacity=100, error_rate=0.01)
+        store._loaded = True
+        store.max_bytes = 2 * store.session_bytes
+        store.record_served("s1", ["a"])
+        store.record_served("s2", ["a"])
+        store.get("s1")
+        store.record_served("s3", ["a"])
+        
+        assert len(store) == 2
+        assert store.get("s2") is None
+        assert store.get("s1") is not None
+    
+    def test_disliked_excluded_and_seen_backfilled(self):
+        """Test dislikes are always dropped and seen items only fill gaps."""
+        store = SeenFilterStore(capacity=100, error_rate=0.01)
+        store._loaded = True
+        store.record_served("s1", ["a", "b"])
+        store.record_feedback("s1", "c", "dislike")
+        items = [{'item_id': item_id} for item_id in ["a", "b", "c", "d"]]
+        h1, h2 = item_hashes(item['item_id'] for item in items)
+        
+        def kept(limit):
+            return [item['item_id'] for item in exclude_seen(items, h1, h2, store.get("s1"), limit)]
+        
+        assert kept(1) == ["d"]
+        assert kept(3) == ["d", "a", "b"]
+        assert kept(4) == ["d", "a", "b"]
+    
+    def test_rebuild_from_feedback_table(self):
+        """Test filters come back from stored feedback after a restart."""
+        create_db_and_tables()
+        with Session(engine) as session:
+            session.add(Feedback(item_id="workout_3", domain="workout", action="dislike",
+                                 user_session="rebuild_user"))
+            session.commit()
+        
+        store = SeenFilterStore()
+        session_filter = store.get("rebuild_user")
+        
+        assert session_filter is not None
+        assert session_filter.disliked.contains(*item_hashes(["workout_3"])).all()
+
+
+class TestEngineFiltering:
+    """Test the engine leaves out seen items."""
+    
+    def test_served_items_not_repeated(self, loader):
+        """Test items served to a session are replaced by unseen ones."""
+        store = SeenFilterStore()
+        store._loaded = True
+        engine = RecommendationEngine(loader=loader, seen=store)
+        first = engine.get_recommendations("calm", 60, ["lifestyle"], limit=4, user_session="s1")
+        store.record_served("s1", [rec['item_id'] for rec in first])
+        
+        second = engine.get_recommendations("calm", 60, ["lifestyle"], limit=4, user_session="s1")
+        
+        assert len(second) == len(first)
+        assert not {rec['item_id'] for rec in first} & {rec['item_id'] for rec in second}
+        assert engine.get_recommendations("calm", 60, ["lifestyle"], limit=4) == first
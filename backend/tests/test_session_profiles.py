@@ -0,0 +1,125 @@
+"""Tests for per-session preference profiles."""
+
+import sys
+import threading
+
+import pytest
+from services.data_loader import DataLoader
+from services.mood_mapper import TagMatrix
+from services.recommender import RecommendationEngine
+from services.session_profiles import PROFILE_BYTES, TAG_BYTES, SessionProfileStore
+
+
+@pytest.fixture(scope="module")
+def loader():
+    """Load the bundled catalog once."""
+    return DataLoader()
+
+
+class TestSessionProfileStore:
+    """Test recording feedback into profiles."""
+    
+    def test_votes_decay_with_half_life(self):
+        """Test a vote counts half as much after one half-life."""
+        store = SessionProfileStore(max_bytes=10000, half_life=100)
+        store.record("s1", ["yoga"], "like", now=0)
+        store.record("s1", ["hiit"], "dislike", now=100)
+        
+        late = SessionProfileStore(max_bytes=10000, half_life=100)
+        late.record("s1", ["yoga"], "like", now=100)
+        vector = store.get_vector("s1", now=100)
+        
+        assert vector["yoga"] == pytest.approx(late.get_vector("s1", now=200)["yoga"])
+        assert vector["hiit"] < 0 < vector["yoga"] < 1
+    
+    def test_long_idle_profile_rescales(self):
+        """Test votes stay finite after the scale factor underflows."""
+        store = SessionProfileStore(max_bytes=10000, half_life=1)
+        store.record("s1", ["yoga"], "like", now=0)
+        store.record("s1", ["yoga"], "like", now=100)
+        
+        assert store.get_vector("s1", now=100)["yoga"] == pytest.approx(0.7616, abs=1e-3)
+    
+    def test_memory_bound_evicts_least_recently_used(self):
+        """Test the store evicts the least recently used profiles past its budget."""
+        store = SessionProfileStore(max_bytes=2 * (PROFILE_BYTES + TAG_BYTES), half_life=100)
+        store.record("s1", ["yoga"], "like", now=0)
+        store.record("s2", ["yoga"], "like", now=0)
+        store.get_vector("s1", now=0)
+        store.record("s3", ["yoga"], "like", now=0)
+        
+        assert len(store) == 2
+        assert store.bytes <= store.max_bytes
+        assert store.get_vector("s2") is None
+        assert store.get_vector("s1") is not None
+    
+    def test_vectors_read_while_recording(self):
+        """Test reading a vector while the same profile gains tags never fails mid-iteration."""
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        store = SessionProfileStore(max_bytes=10 ** 9, half_life=100)
+        store.record("s1", ["yoga"], "like", now=0)
+        errors = []
+        
+        def read():
+            try:
+                for _ in range(500):
+                    store.get_vector("s1", now=1)
+            except RuntimeError as e:
+                errors.append(e)
+        
+        reader = threading.Thread(target=read)
+        try:
+            reader.start()
+            for i in range(5000):
+                store.record("s1", [f"tag{i}"], "like", now=0)
+            reader.join()
+        finally:
+            sys.setswitchinterval(switch_interval)
+        
+        assert errors == []
+    
+    def test_select_rows(self):
+        """Test selecting scattered rows of a tag matrix."""
+        matrix = TagMatrix.from_lists([["a", "b"], [], ["c"], ["a", "c", "d"]])
+        batch = matrix.select([3, 1, 0])
+        
+        assert batch.dot({"a": 1, "d": 2}).tolist() == [3, 0, 1]
+        assert batch.row_lengths.tolist() == [3, 0, 2]
+
+
+class TestSessionRerank:
+    """Test the engine reranks candidates by session profile."""
+    
+    def test_cold_session_is_unchanged(self, loader):
+        """Test a session without feedback gets the anonymous results."""
+        engine = RecommendationEngine(loader=loader, profiles=SessionProfileStore())
+        
+        assert (engine.get_recommendations("calm", 60, ["lifestyle"], user_session="new")
+                == engine.get_recommendations("calm", 60, ["lifestyle"]))
+    
+    def test_liked_tags_move_up(self, loader):
+        """Test liking an item's tags raises similar items and dislikes lower them."""
+        profiles = SessionProfileStore()
+        engine = RecommendationEngine(loader=loader, profiles=profiles)
+        baseline = engine.get_ranked_recommendations("calm", 60, ["lifestyle"], 30)
+        middle = len(baseline) // 2
+        liked = loader.get_item_by_id(baseline[middle]['item_id'])
+        profiles.record("fan", list(liked['tags_list']), "like")
+        profiles.record("critic", list(liked['tags_list']), "dislike")
+        
+        def position(user_session):
+            ranked = engine.get_ranked_recommendations("calm", 60, ["lifestyle"], 30, user_session)
+            return [rec['item_id'] for rec in ranked].index(liked['item_id'])
+        
+        assert position("fan") < middle < position("critic")
+    
+    def test_item_tags_from_row_index(self, loader):
+        """Test feedback finds an item's tags by ID, whatever domain it names."""
+        engine = RecommendationEngine(loader=loader, profiles=SessionProfileStore())
+        expected = list(loader.get_item_by_id("course_2")['tags_list'])
+        
+        assert engine.get_item_tags("course_2", "course") == expected
+        assert engine.get_item_tags("course_2", "workout") == expected
+        assert engine.get_item_tags("course_2") == expected
+        assert engine.get_item_tags("missing_1", "course") is None
@@ -0,0 +1,126 @@
+"""Tests for sharded scatter-gather scoring."""
+
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from core.config import settings
+from services.catalog_store import publish_snapshot
+from services.data_loader import DataLoader
+from services.recommender import RecommendationEngine
+from services.sharding import local_top_k, merge_top_k, partition
+
+SCENARIOS = list(itertools.product(
+    ["calm", "energized", "tired"], [10, 60], [["lifestyle"], ["lifestyle", "learning"]]
+))
+
+
+@pytest.fixture(scope="module")
+def single_engine():
+    """Build an in-process engine over the bundled catalog."""
+    engine = RecommendationEngine(loader=DataLoader())
+    engine._ensure_initialized()
+    return engine
+
+
+class TestMerge:
+    """Test partitioning and the top-k merge."""
+    
+    def test_partition_covers_all_rows(self):
+        """Test ranges are contiguous and cover every row."""
+        ranges = partition(10, 3)
+        
+        assert ranges == [(0, 3), (3, 6), (6, 10)]
+        assert partition(2, 4) == [(0, 0), (0, 1), (1, 1), (1, 2)]
+    
+    def test_merge_matches_stable_sort(self):
+        """Test merged shard results equal a stable sort of all items, ties included."""
+        scores = [0.5, 0.9, 0.5, 0.7, 0.9, 0.5, 0.1, 0.7]
+        items = [{'item_id': i, 'content_score': score} for i, score in enumerate(scores)]
+        expected = sorted(items, key=lambda x: x['content_score'], reverse=True)[:5]
+        
+        shard_results = [local_top_k(items[start:stop], start, 5) for start, stop in partition(len(items), 3)]
+        
+        assert merge_top_k(shard_results, 5) == expected
+
+
+class TestShardedEngine:
+    """Test the engine gives identical results when sharded."""
+    
+    def test_sharded_matches_single_process(self, single_engine):
+        """Test scatter-gather scoring returns the same recommendations."""
+        sharded = RecommendationEngine(loader=single_engine.data_loader)
+        sharded._ensure_initialized()
+        sharded.start_shards(3)
+        try:
+            assert sharded.shard_pool is not None
+            for mood, minutes, interests in SCENARIOS:
+                assert (sharded.get_recommendations(mood, minutes, interests, limit=8)
+                        == single_engine.get_recommendations(mood, minutes, interests, limit=8))
+        finally:
+            sharded.stop_shards()
+    
+    def test_timed_out_replies_are_not_reused(self, single_engine, monkeypatch):
+        """Test replies left unread by a timed-out request do not answer the next one."""
+        sharded = RecommendationEngine(loader=single_engine.data_loader)
+        sharded._ensure_initialized()
+        sharded.start_shards(2)
+        try:
+            # No shard can reply within a zero timeout; scoring falls back in process
+            monkeypatch.setattr(settings, "scoring_shard_timeout", 0)
+            sharded.get_recommendations("energized", 60, ["lifestyle"], limit=8)
+            monkeypatch.setattr(settings, "scoring_shard_timeout", 30.0)
+            
+            assert sharded.shard_pool is not None
+            for mood, minutes, interests in SCENARIOS:
+                assert (sharded.get_recommendations(mood, minutes, interests, limit=8)
+                        == single_engine.get_recommendations(mood, minutes, interests, limit=8))
+        finally:
+            sharded.stop_shards()
+    
+    def test_concurrent_requests_get_their_own_replies(self, single_engine):
+        """Test requests in flight together each get the replies to their own request."""
+        sharded = RecommendationEngine(loader=single_engine.data_loader)
+        sharded._ensure_initialized()
+        sharded.start_shards(2)
+        try:
+            expected = [single_engine.get_recommendations(mood, minutes, interests, limit=8)
+                        for mood, minutes, interests in SCENARIOS]
+            pool, failures = sharded.shard_pool, []
+            top_k = pool.top_k
+            
+            def recording_top_k(*args):
+                try:
+                    return top_k(*args)
+                except Exception as e:
+                    failures.append(e)
+                    raise
+            
+            pool.top_k = recording_top_k
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                results = list(executor.map(
+                    lambda scenario: sharded.get_recommendations(*scenario, limit=8), SCENARIOS * 3
+                ))
+            
+            assert results == expected * 3
+            assert failures == []
+            assert pool._pending == {}
+        finally:
+            sharded.stop_shards()
+    
+    def test_snapshot_shards_match_single_process(self, single_engine, tmp_path, monkeypatch):
+        """Test shards attached to a shared snapshot return the same recommendations."""
+        loader = single_engine.data_loader
+        publish_snapshot(loader.processed_data, loader.version, str(tmp_path))
+        monkeypatch.setattr(settings, "catalog_snapshot_dir", str(tmp_path))
+        monkeypatch.setattr(settings, "scoring_shards", 2)
+        
+        sharded = RecommendationEngine(loader=DataLoader())
+        sharded._ensure_initialized()
+        try:
+            assert sharded.shard_pool is not None
+            for mood, minutes, interests in SCENARIOS:
+                assert (sharded.get_recommendations(mood, minutes, interests, limit=8)
+                        == single_engine.get_recommendations(mood, minutes, interests, limit=8))
+        finally:
+            sharded.stop_shards()
@@ -0,0 +1,111 @@
+"""Tests for lazy startup and prebuilt model artifacts."""
+
+import subprocess
+import sys
+import threading
+
+from benchmarks.startup import BACKEND_DIR, parse_importtime
+from core.config import settings
+from services.data_loader import DataLoader
+from services.recommender import RecommendationEngine
+
+
+class TestLazyImports:
+    """Test importing the app has no heavy side effects."""
+    
+    def test_app_import_skips_data_stack(self):
+        """Test importing the app loads neither pandas nor scikit-learn."""
+        result = subprocess.run(
+            [sys.executable, "-c", "import sys, app; print(sorted({'pandas', 'sklearn'} & set(sys.modules)))"],
+            cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        )
+        
+        assert result.stdout.strip().splitlines()[-1] == "[]"
+    
+    def test_data_loads_on_first_use(self):
+        """Test a lazy loader reads the files only when data is requested."""
+        loader = DataLoader(autoload=False)
+        assert loader.processed_data == {}
+        assert loader.version
+        
+        assert not loader.get_data("workouts").empty
+        assert set(loader.processed_data) == {"workouts", "recipes", "courses"}
+    
+    def test_parse_importtime(self):
+        """Test import times are summed per top-level package."""
+        output = "\n".join([
+            "import time: self [us] | cumulative | imported package",
+            "import time:       100 |        100 |   pandas.core",
+            "import time:        50 |        150 | pandas",
+            "import time:        20 |         20 | app",
+        ])
+        
+        assert parse_importtime(output) == {"pandas": 150, "app": 20}
+
+
+class TestLazyInitialization:
+    """Test models initialize once however many threads ask."""
+    
+    def test_concurrent_first_use_initializes_once(self, monkeypatch):
+        """Test threads racing on a new engine build its models once."""
+        engine = RecommendationEngine(loader=DataLoader())
+        calls = []
+        initialize = engine._initialize_models
+        monkeypatch.setattr(engine, "_initialize_models", lambda: (calls.append(1), initialize()))
+        
+        barrier = threading.Barrier(4)
+        
+        def first_use():
+            barrier.wait()
+            engine._ensure_initialized()
+        
+        threads = [threading.Thread(target=first_use) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert len(calls) == 1
+        assert engine.item_features
+
+
+class TestModelArtifacts:
+    """Test serving from prebuilt scoring features."""
+    
+    def test_artifact_round_trip(self, tmp_path, monkeypatch):
+        """Test a saved artifact is loaded instead of rebuilding the models."""
+        path = str(tmp_path / "content_models.json")
+        monkeypatch.setattr(settings, "model_artifact_path", path)
+        loader = DataLoader()
+        built = RecommendationEngine(loader=loader)
+        built.save_artifacts()
+        
+        served = RecommendationEngine(loader=loader)
+        served._ensure_initialized()
+        
+        assert served.content_matrices == {}
+        assert served.item_features.keys() == built.item_features.keys()
+        assert (served.get_recommendations("calm", 60, ["lifestyle", "learning"])
+                == built.get_recommendations("calm", 60, ["lifestyle", "learning"]))
+    
+    def test_preprocess_version_changes_catalog_version(self, monkeypatch):
+        """Test artifacts built by an older preprocessing no longer match the catalog."""
+        import services.data_loader
+        
+        loader = DataLoader(autoload=False)
+        monkeypatch.setattr(services.data_loader, "PREPROCESS_VERSION", services.data_loader.PREPROCESS_VERSION + 1)
+        
+        assert loader._compute_version() != loader.version
+    
+    def test_stale_artifact_is_rebuilt(self, tmp_path, monkeypatch):
+        """Test an artifact from another catalog version is ignored."""
+        path = str(tmp_path / "content_models.json")
+        monkeypatch.setattr(settings, "model_artifact_path", path)
+        loader = DataLoader()
+        RecommendationEngine(loader=loader).save_artifacts()
+        loader.version = "other"
+        
+        engine = RecommendationEngine(loader=loader)
+        engine._ensure_initialized()
+        
+        assert engine.content_matrices
@@ -0,0 +1,99 @@
+"""Tests for request tracing."""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from app import app
+from core.config import settings
+from core.tracing import ChromeTraceExporter, TracingMiddleware, span, traced
+
+
+def read_trace_events(path):
+    """Parse an append-only Chrome trace file."""
+    with open(path) as f:
+        content = f.read().rstrip().rstrip(",")
+    return json.loads(content + "]")
+
+
+class TestSpans:
+    """Test span helpers outside of a trace."""
+    
+    def test_span_is_noop_without_trace(self):
+        """Test spans do nothing when the request is not traced."""
+        with span("outside", key="value") as current:
+            current.set_attribute("other", 1)
+        
+        assert span("a") is span("b")
+    
+    def test_traced_preserves_return_value(self):
+        """Test the decorator is transparent when tracing is off."""
+        
+        @traced()
+        def add(a, b):
+            return a + b
+        
+        assert add(2, 3) == 5
+        assert add.__name__ == "add"
+
+
+class TestTracingMiddleware:
+    """Test traces recorded by the middleware."""
+    
+    def setup_method(self):
+        """Enable tracing with sampling turned off."""
+        self._enabled = settings.tracing_enabled
+        self._rate = settings.tracing_sample_rate
+        settings.tracing_enabled = True
+        settings.tracing_sample_rate = 0.0
+    
+    def teardown_method(self):
+        """Restore tracing settings."""
+        settings.tracing_enabled = self._enabled
+        settings.tracing_sample_rate = self._rate
+    
+    def test_forced_trace_records_spans(self, tmp_path):
+        """Test a forced trace writes nested spans for the pipeline."""
+        path = str(tmp_path / "traces.json")
+        exporter = ChromeTraceExporter(path)
+        client = TestClient(TracingMiddleware(app, exporter))
+        
+        response = client.post(
+            "/api/recommend",
+            json={"mood": "happy", "available_minutes": 30, "interests": ["lifestyle"]},
+            headers={"X-Trace-Sample": "1"}
+        )
+        exporter.close()
+        
+        assert response.status_code == 200
+        trace_id = response.headers["x-trace-id"]
+        
+        events = read_trace_events(path)
+        names = {event["name"] for event in events}
+        assert "POST /api/recommend" in names
+        assert {"scoring", "enrichment", "curation", "serialization"} <= names
+        assert "score_domain" in names
+        assert "DataLoader.get_items_by_ids" in names
+        
+        span_ids = {event["args"]["span_id"] for event in events}
+        for event in events:
+            assert event["ph"] == "X"
+            assert event["args"]["trace_id"] == trace_id
+            parent = event["args"]["parent_id"]
+            assert parent is None or parent in span_ids
+    
+    def test_unsampled_request_is_not_traced(self, tmp_path):
+        """Test requests outside the sample are not exported."""
+        path = str(tmp_path / "traces.json")
+        exporter = ChromeTraceExporter(path)
+        client = TestClient(TracingMiddleware(app, exporter))
+        
+        response = client.get("/api/health")
+        exporter.close()
+        
+        assert "x-trace-id" not in response.headers
+        assert read_trace_events(path) == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])